@@ -0,0 +1,22 @@
+"""
+Script for setting the displayname of the assets saved before it was recorded
+"""
+from django.core.management.base import BaseCommand, CommandError
+from xmodule.contentstore.django import contentstore
+from xmodule.course_module import CourseDescriptor
+
+
+class Command(BaseCommand):
+    """
+    Sets the displayname of the assets which have none to their name, so that they sort by it
+    in the asset library. Can pass an optional course_id to only change the assets of that course.
+    """
+    help = '''Sets the displayname of the assets which have none to their name. Can pass an optional course_id.'''
+
+    def handle(self, *args, **options):
+        if len(args) > 1:
+            raise CommandError("backfill_asset_displaynames requires one or no arguments: |<course_id>|")
+
+        location = CourseDescriptor.id_to_location(args[0]) if args else None
+        count = contentstore().set_missing_displaynames(location)
+        self.stdout.write("Set the displayname of {0} assets\n".format(count))
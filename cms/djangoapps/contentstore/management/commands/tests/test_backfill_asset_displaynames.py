@@ -0,0 +1,27 @@
+"""
+Tests for backfill_asset_displaynames.
+"""
+from StringIO import StringIO
+from django.core.management import call_command
+from contentstore.tests.utils import CourseTestCase
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
+
+
+class BackfillAssetDisplaynamesTestCase(CourseTestCase):
+    """
+    Tests setting the displayname of the assets which have none.
+    """
+    def setUp(self):
+        super(BackfillAssetDisplaynamesTestCase, self).setUp()
+        for name in ('asset-1.txt', 'asset-2.txt'):
+            location = StaticContent.compute_location(self.course.location.org, self.course.location.course, name)
+            contentstore().save(StaticContent(location, name, 'text/plain', name))
+        contentstore().fs_files.update({'_id.name': 'asset-2.txt'}, {'$unset': {'displayname': True}})
+
+    def test_backfill(self):
+        out = StringIO()
+        call_command('backfill_asset_displaynames', self.course.location.course_id, stdout=out)
+        self.assertIn('1 assets', out.getvalue())
+        for name in ('asset-1.txt', 'asset-2.txt'):
+            self.assertEqual(name, contentstore().fs_files.find_one({'_id.name': name})['displayname'])
@@ -0,0 +1,90 @@
+"""
+Models for contentstore
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class CourseImport(models.Model):
+    """
+    Tracks the import of a course from an uploaded tar.gz file, which is done in the
+    background by contentstore.tasks.import_course.
+    """
+    # The stages of an import, in order
+    EXTRACTING = 1
+    VALIDATING = 2
+    IMPORTING_STATIC = 3
+    IMPORTING_MODULES = 4
+    IMPORTING_DRAFTS = 5
+    DONE = 6
+
+    STAGES = (
+        (EXTRACTING, 'extracting'),
+        (VALIDATING, 'validating'),
+        (IMPORTING_STATIC, 'importing static content'),
+        (IMPORTING_MODULES, 'importing modules'),
+        (IMPORTING_DRAFTS, 'importing drafts'),
+        (DONE, 'done'),
+    )
+
+    course_id = models.CharField(max_length=255, db_index=True)
+    filename = models.CharField(max_length=255)
+    user = models.ForeignKey(User)
+
+    stage = models.IntegerField(choices=STAGES, default=EXTRACTING)
+    failed = models.BooleanField(default=False)
+    # For a failed import, the HTTP status and JSON body of the response reporting the failure
+    error_status = models.IntegerField(null=True, blank=True)
+    error_details = models.TextField(blank=True)
+
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def latest(cls, course_id, filename):
+        """
+        Returns the latest CourseImport of filename into the course course_id, or None if there is none.
+        """
+        course_imports = cls.objects.filter(course_id=course_id, filename=filename).order_by('-id')[:1]
+        return course_imports[0] if course_imports else None
+
+    @property
+    def archive_name(self):
+        """
+        The name under which the uploaded file is kept in the contentstore until the import is over,
+        so that whichever worker runs the import can get it.
+        """
+        return u'course_imports/{0}/{1}'.format(self.id, self.filename)
+
+    @property
+    def status_stage(self):
+        """
+        The stage of the import as shown on the import page: 1 while extracting, 2 while validating,
+        3 while importing, and 4 once done.
+        """
+        if self.stage == self.DONE:
+            return 4
+        return min(self.stage, 3)
+
+    def set_stage(self, stage):
+        """
+        Records that the import has reached `stage`.
+        """
+        self.stage = stage
+        self.save()
+
+    def fail(self, status, **details):
+        """
+        Records that the import failed at its current stage, to be reported with the HTTP `status`,
+        and the error `details`, such as ErrMsg.
+        """
+        details['Stage'] = self.status_stage
+        self.failed = True
+        self.error_status = status
+        self.error_details = json.dumps(details)
+        self.save()
+
+    def __unicode__(self):
+        return u"[CourseImport] {}: {} ({})".format(self.course_id, self.filename, self.get_stage_display())
@@ -0,0 +1,218 @@
+"""
+This module contains celery task functions for importing and exporting courses in the background.
+"""
+import os
+import shutil
+import tarfile
+import tempfile
+
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousOperation
+from django.utils.translation import ugettext as _
+from path import path
+
+from xmodule.contentstore.django import contentstore
+from xmodule.course_module import CourseDescriptor
+from xmodule.modulestore import Location
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_exporter import export_to_tarball
+from xmodule.modulestore.xml_importer import (
+    import_from_xml, IMPORT_STAGE_STATIC, IMPORT_STAGE_MODULES, IMPORT_STAGE_DRAFTS
+)
+
+from contentstore.models import CourseImport
+from extract_tar import safetar_extractall
+from student import auth
+from student.roles import CourseInstructorRole, CourseStaffRole
+
+log = get_task_logger(__name__)
+
+# Export status values, as returned by get_export_status
+EXPORT_STATUS_NONE = 0
+EXPORT_STATUS_EXPORTING = 1
+EXPORT_STATUS_DONE = 2
+EXPORT_STATUS_FAILED = -1
+
+# How long the status of an export is kept, in seconds
+EXPORT_STATUS_TIMEOUT = 60 * 60 * 24
+
+
+def _export_status_cache_key(course_location):
+    """
+    Returns the cache key for the export status of the course at course_location.
+    """
+    return u'course_export_status.{}'.format(course_location.course_id)
+
+
+def get_export_status(course_location):
+    """
+    Returns a dict with the 'status' of the last background export of the course at course_location,
+    and for a failed export, the 'error' message.
+    """
+    return cache.get(_export_status_cache_key(course_location), {'status': EXPORT_STATUS_NONE})
+
+
+def set_export_status(course_location, status, error=None):
+    """
+    Records the status of the background export of the course at course_location.
+    """
+    export_status = {'status': status}
+    if error is not None:
+        export_status['error'] = error
+    cache.set(_export_status_cache_key(course_location), export_status, EXPORT_STATUS_TIMEOUT)
+
+
+def course_export_name(course_location):
+    """
+    Returns the name of the archive saved in the contentstore by the background export of the course
+    at course_location.
+    """
+    return u'course_exports/{0.org}-{0.course}-{0.name}.tar.gz'.format(course_location)
+
+
+@task()  # pylint: disable=E1102
+def export_course(course_location_url):
+    """
+    Exports the course at course_location_url to a tar.gz archive, saved in the contentstore as
+    course_export_name so that any web node can serve it, recording its progress with set_export_status.
+    """
+    course_location = Location(course_location_url)
+    set_export_status(course_location, EXPORT_STATUS_EXPORTING)
+
+    # each export writes a file of its own, and only replaces the previous archive once it is complete
+    export_file = tempfile.NamedTemporaryFile(prefix=u'{}.'.format(course_location.name), suffix='.tar.gz')
+    try:
+        export_to_tarball(
+            modulestore('direct'), contentstore(), course_location, export_file, course_location.name, modulestore()
+        )
+        export_file.flush()
+        export_file.seek(0)
+        contentstore().save_archive(course_export_name(course_location), export_file)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception(u'There was an error exporting course %s', course_location)
+        set_export_status(course_location, EXPORT_STATUS_FAILED, unicode(exc))
+    else:
+        set_export_status(course_location, EXPORT_STATUS_DONE)
+    finally:
+        export_file.close()
+
+
+def course_import_dir(course_location):
+    """
+    Returns the directory under which the tar.gz files to import into the course at course_location
+    are uploaded and extracted. Each import is extracted into a directory of its own within it.
+    """
+    return path(settings.GITHUB_REPO_ROOT) / u'{0.org}-{0.course}-{0.name}'.format(course_location)
+
+
+def _get_dir_for_fname(directory, filename):
+    """
+    Returns the dirpath for the first file found in the directory
+    with the given name.  If there is no file in the directory with
+    the specified name, return None.
+    """
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        if filename in filenames:
+            return path(dirpath)
+    return None
+
+
+@task(acks_late=True)  # pylint: disable=E1102
+def import_course(course_import_id):
+    """
+    Imports the course from the tar.gz file uploaded for the CourseImport course_import_id,
+    recording each stage it reaches.
+
+    The task is only acknowledged once it finishes, so if the worker running it dies, it is run
+    again, and picks up from the last stage recorded.
+    """
+    course_import = CourseImport.objects.get(id=course_import_id)
+    if course_import.failed or course_import.stage == CourseImport.DONE:
+        return
+
+    course_location = CourseDescriptor.id_to_location(course_import.course_id)
+    data_dir = course_import_dir(course_location)
+    course_dir = data_dir / unicode(course_import.id)
+    import_stages = {
+        IMPORT_STAGE_STATIC: CourseImport.IMPORTING_STATIC,
+        IMPORT_STAGE_MODULES: CourseImport.IMPORTING_MODULES,
+        IMPORT_STAGE_DRAFTS: CourseImport.IMPORTING_DRAFTS,
+    }
+
+    if course_import.stage != CourseImport.EXTRACTING and not course_dir.isdir():
+        # the import was interrupted on another worker, so its files have to be extracted again here
+        course_import.set_stage(CourseImport.EXTRACTING)
+
+    try:
+        if course_import.stage == CourseImport.EXTRACTING:
+            course_dir.makedirs_p()
+            tar_path = course_dir / course_import.filename
+            archive = contentstore().get_archive(course_import.archive_name)
+            try:
+                with open(tar_path, 'wb') as tar_file:
+                    shutil.copyfileobj(archive, tar_file)
+            finally:
+                archive.close()
+
+            tar_file = tarfile.open(tar_path)
+            try:
+                safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
+            except SuspiciousOperation as exc:
+                course_import.fail(
+                    400,
+                    ErrMsg='Unsafe tar file. Aborting import.',
+                    SuspiciousFileOperationMsg=exc.args[0],
+                )
+                return
+            finally:
+                tar_file.close()
+            course_import.set_stage(CourseImport.VALIDATING)
+
+        if course_import.stage == CourseImport.VALIDATING:
+            # find the 'course.xml' file
+            dirpath = _get_dir_for_fname(course_dir, "course.xml")
+            if not dirpath:
+                course_import.fail(415, ErrMsg=_('Could not find the course.xml file in the package.'))
+                return
+
+            log.debug(u'found course.xml at %s', dirpath)
+
+            if dirpath != course_dir:
+                for fname in os.listdir(dirpath):
+                    shutil.move(dirpath / fname, course_dir)
+            course_import.set_stage(CourseImport.IMPORTING_STATIC)
+
+        # Re-importing is idempotent, and unchanged static content is skipped, so an
+        # interrupted import simply starts over from the static content.
+        _module_store, course_items = import_from_xml(
+            modulestore('direct'),
+            data_dir,
+            [course_dir.basename()],
+            load_error_modules=False,
+            static_content_store=contentstore(),
+            target_location_namespace=course_location,
+            draft_store=modulestore(),
+            stage_callback=lambda stage: course_import.set_stage(import_stages[stage]),
+        )
+
+        new_location = course_items[0].location
+        log.debug(u'new course at %s', new_location)
+
+        user = course_import.user
+        auth.add_users(user, CourseInstructorRole(new_location), user)
+        auth.add_users(user, CourseStaffRole(new_location), user)
+        log.debug(u'created all course groups at %s', new_location)
+
+        course_import.set_stage(CourseImport.DONE)
+
+    # Record errors with the stage at which they occurred.
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception(u'There was an error importing course %s', course_import.course_id)
+        course_import.fail(400, ErrMsg=str(exc))
+
+    finally:
+        shutil.rmtree(course_dir, ignore_errors=True)
+        contentstore().delete_archive(course_import.archive_name)
@@ -3,6 +3,8 @@ from functools import partial
 import math
 import json
 
+import dateutil.parser
+from django.core.cache import cache
 from django.http import HttpResponseBadRequest
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
@@ -32,6 +34,13 @@ from .access import has_course_access
 
 __all__ = ['assets_handler']
 
+# The fields of an asset which the asset library shows
+ASSET_PAGE_FIELDS = ['displayname', 'uploadDate', 'thumbnail_location', 'locked']
+
+# How long the number of assets in a course is cached for. It is also cleared whenever an asset
+# is uploaded or deleted here.
+ASSET_COUNT_CACHE_TIMEOUT = 5 * 60
+
 
 @login_required
 @ensure_csrf_cookie
@@ -49,6 +58,8 @@ def assets_handler(request, tag=None, package_id=None, branch=None, version_guid
             page_size: the number of items per page (defaults to 50)
             sort: the asset field to sort by (defaults to "date_added")
             direction: the sort direction (defaults to "descending")
+            after, before: the nextCursor and prevCursor of the previously returned page, which make
+                reading the page next to it quick however deep it is
     POST
         json: create (or update?) an asset. The only updating that can be done is changing the lock state.
     PUT
@@ -107,17 +118,21 @@ def _assets_json(request, location):
         requested_sort = 'displayname'
     sort = [(requested_sort, sort_direction)]
 
+    old_location = loc_mapper().translate_locator_to_location(location)
+    course_reference = StaticContent.compute_location(old_location.org, old_location.course, old_location.name)
+    total_count = _get_asset_count(course_reference)
+
     current_page = max(requested_page, 0)
+    # If the query is beyond the final page, then query the final page so that at least one asset is returned
+    if requested_page > 0 and current_page * requested_page_size >= total_count:
+        current_page = max(int(math.floor((total_count - 1) / requested_page_size)), 0)
     start = current_page * requested_page_size
-    assets, total_count = _get_assets_for_page(request, location, current_page, requested_page_size, sort)
-    end = start + len(assets)
 
-    # If the query is beyond the final page, then re-query the final page so that at least one asset is returned
-    if requested_page > 0 and start >= total_count:
-        current_page = int(math.floor((total_count - 1) / requested_page_size))
-        start = current_page * requested_page_size
-        assets, total_count = _get_assets_for_page(request, location, current_page, requested_page_size, sort)
-        end = start + len(assets)
+    assets = _get_assets_for_page(
+        course_reference, current_page, requested_page_size, sort,
+        request.REQUEST.get('after'), request.REQUEST.get('before'),
+    )
+    end = start + len(assets)
 
     asset_json = []
     for asset in assets:
@@ -128,7 +143,7 @@ def _assets_json(request, location):
         thumbnail_location = Location(_thumbnail_location) if _thumbnail_location is not None else None
 
         asset_locked = asset.get('locked', False)
-        asset_json.append(_get_asset_json(asset['displayname'], asset['uploadDate'], asset_location, thumbnail_location, asset_locked))
+        asset_json.append(_get_asset_json(asset.get('displayname') or asset_id['name'], asset['uploadDate'], asset_location, thumbnail_location, asset_locked))
 
     return JsonResponse({
         'start': start,
@@ -138,21 +153,86 @@ def _assets_json(request, location):
         'totalCount': total_count,
         'assets': asset_json,
         'sort': requested_sort,
+        'nextCursor': _page_cursor(current_page + 1, sort, assets[-1]) if assets else None,
+        'prevCursor': _page_cursor(current_page - 1, sort, assets[0]) if assets else None,
     })
 
 
-def _get_assets_for_page(request, location, current_page, page_size, sort):
+def _get_assets_for_page(course_reference, current_page, page_size, sort, after=None, before=None):
     """
     Returns the list of assets for the specified page and page size.
+
+    after and before are the cursors the previous request returned from the last and first assets of
+    its page. If one of them leads to this page, the page is read from the index straight after or
+    before that asset, rather than by skipping the assets of all the pages before it.
     """
-    start = current_page * page_size
+    store = contentstore()
+
+    after_asset = _asset_from_cursor(after, current_page, sort)
+    if after_asset is not None:
+        return store.get_content_page_for_course(
+            course_reference, page_size, sort, after=after_asset, fields=ASSET_PAGE_FIELDS
+        )
+
+    before_asset = _asset_from_cursor(before, current_page, sort)
+    if before_asset is not None:
+        reverse_sort = [(field, -direction) for field, direction in sort]
+        assets = store.get_content_page_for_course(
+            course_reference, page_size, reverse_sort, after=before_asset, fields=ASSET_PAGE_FIELDS
+        )
+        return assets[::-1]
+
+    return store.get_content_page_for_course(
+        course_reference, page_size, sort, start=current_page * page_size, fields=ASSET_PAGE_FIELDS
+    )
 
-    old_location = loc_mapper().translate_locator_to_location(location)
 
-    course_reference = StaticContent.compute_location(old_location.org, old_location.course, old_location.name)
-    return contentstore().get_all_content_for_course(
-        course_reference, start=start, maxresults=page_size, sort=sort
-    )
+def _get_asset_count(course_reference):
+    """
+    Returns the number of assets in the course, which is cached.
+    """
+    cache_key = _asset_count_cache_key(course_reference)
+    count = cache.get(cache_key)
+    if count is None:
+        count = contentstore().count_content_for_course(course_reference)
+        cache.set(cache_key, count, ASSET_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def _asset_count_cache_key(course_reference):
+    """
+    Returns the cache key of the number of assets in the course.
+    """
+    return u'contentstore.asset_count.{0.org}/{0.course}'.format(course_reference)
+
+
+def _page_cursor(page, sort, asset):
+    """
+    Returns the cursor which leads to page from the asset next to it in the sort order.
+    """
+    sort_field = sort[0][0]
+    value = asset.get(sort_field)
+    if sort_field == 'uploadDate' and value is not None:
+        value = value.isoformat()
+    return json.dumps([page, sort, value, asset['_id']['name']])
+
+
+def _asset_from_cursor(cursor, page, sort):
+    """
+    Returns the asset, with just its sort field and name, which the cursor made by _page_cursor
+    points from, if the cursor leads to page in the same sort order. Otherwise returns None.
+    """
+    try:
+        cursor_page, cursor_sort, value, name = json.loads(cursor)
+    except (TypeError, ValueError):
+        return None
+    if cursor_page != page or cursor_sort != [list(pair) for pair in sort]:
+        return None
+
+    sort_field = sort[0][0]
+    if sort_field == 'uploadDate' and value is not None:
+        value = dateutil.parser.parse(value)
+    return {sort_field: value, '_id': {'name': name}}
 
 
 @require_POST
@@ -209,6 +289,7 @@ def _upload_asset(request, location):
     # then commit the content
     contentstore().save(content)
     del_cached_content(content.location)
+    cache.delete(_asset_count_cache_key(content.location))
 
     # readback the saved content - we need the database timestamp
     readback = contentstore().find(content.location)
@@ -267,6 +348,7 @@ def _update_asset(request, location, asset_id):
         contentstore().delete(content.get_id())
         # remove from cache
         del_cached_content(content.location)
+        cache.delete(_asset_count_cache_key(content.location))
         return JsonResponse()
 
     elif request.method in ('PUT', 'POST'):
@@ -13,11 +13,11 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from edxmako.shortcuts import render_to_response
 
 from util.date_utils import get_default_time_display
+from xmodule import block_registry
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.django import loc_mapper
 from xmodule.modulestore.locator import BlockUsageLocator
 
-from xblock.core import XBlock
 from xblock.django.request import webob_to_django_response, django_to_webob_request
 from xblock.exceptions import NoSuchHandlerError
 from xblock.fields import Scope
@@ -50,7 +50,7 @@ OPEN_ENDED_COMPONENT_TYPES = ["combinedopenended", "peergrading"]
 NOTE_COMPONENT_TYPES = ['notes']
 
 if settings.FEATURES.get('ALLOW_ALL_ADVANCED_COMPONENTS'):
-    ADVANCED_COMPONENT_TYPES = sorted(set(name for name, class_ in XBlock.load_classes()) - set(COMPONENT_TYPES))
+    ADVANCED_COMPONENT_TYPES = sorted(set(name for name, class_ in block_registry.block_classes()) - set(COMPONENT_TYPES))
 else:
 
     ADVANCED_COMPONENT_TYPES = [
@@ -142,7 +142,7 @@ def _load_mixed_class(category):
     """
     Load an XBlock by category name, and apply all defined mixins
     """
-    component_class = XBlock.load_class(category, select=settings.XBLOCK_SELECT_FUNCTION)
+    component_class = block_registry.load_class(category, select=settings.XBLOCK_SELECT_FUNCTION)
     mixologist = Mixologist(settings.XBLOCK_MIXINS)
     return mixologist.mix(component_class)
 
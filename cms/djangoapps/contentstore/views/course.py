@@ -26,7 +26,7 @@ from xmodule.tabs import PDFTextbookTabs
 
 from xmodule.modulestore.exceptions import (
     ItemNotFoundError, InvalidLocationError)
-from xmodule.modulestore import Location
+from xmodule.modulestore import Location, MONGO_MODULESTORE_TYPE
 
 from contentstore.course_info_model import get_course_updates, update_course_updates, delete_course_update
 from contentstore.utils import (
@@ -57,6 +57,7 @@ from student.roles import CourseInstructorRole, CourseStaffRole, CourseCreatorRo
 from student import auth
 
 from microsite_configuration import microsite
+from course_summaries.models import get_course_summaries
 
 __all__ = ['course_info_handler', 'course_handler', 'course_info_update_handler',
            'settings_handler',
@@ -167,7 +168,13 @@ def _accessible_courses_list(request):
     """
     List all courses available to the logged in user by iterating through all the courses
     """
-    courses = modulestore('direct').get_courses()
+    if settings.FEATURES.get('ENABLE_COURSE_SUMMARIES'):
+        courses = [
+            summary for summary in get_course_summaries()
+            if summary.modulestore_type == MONGO_MODULESTORE_TYPE
+        ]
+    else:
+        courses = modulestore('direct').get_courses()
 
     # filter out courses that we don't have access too
     def course_filter(course):
@@ -292,6 +299,17 @@ def course_index(request, package_id, branch, version_guid, block):
     lms_link = get_lms_link_for_item(course.location)
     sections = course.get_children()
 
+    # translate the locations of the whole outline at once, so that rendering it finds them all cached
+    outline = [course]
+    for section in sections:
+        outline.append(section)
+        for subsection in section.get_children():
+            outline.append(subsection)
+            outline.extend(subsection.get_children())
+    loc_mapper().translate_locations(
+        course.location.course_id, [item.location for item in outline], False, True
+    )
+
     return render_to_response('overview.html', {
         'context_course': course,
         'lms_link': lms_link,
@@ -2,43 +2,42 @@
 These views handle all actions in Studio related to import and exporting of
 courses
 """
+import json
 import logging
 import os
-import tarfile
-import shutil
 import re
-from tempfile import mkdtemp
-from path import path
 
-from django.conf import settings
 from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
 from django_future.csrf import ensure_csrf_cookie
 from django.core.servers.basehttp import FileWrapper
 from django.core.files.temp import NamedTemporaryFile
-from django.core.exceptions import SuspiciousOperation, PermissionDenied
-from django.http import HttpResponseNotFound
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import HttpResponseNotFound, Http404
 from django.views.decorators.http import require_http_methods, require_GET
 from django.utils.translation import ugettext as _
 
 from edxmako.shortcuts import render_to_response
 
-from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.contentstore.django import contentstore
-from xmodule.modulestore.xml_exporter import export_to_xml
+from xmodule.modulestore.xml_exporter import export_to_tarball
 from xmodule.modulestore.django import modulestore, loc_mapper
-from xmodule.exceptions import SerializationError
+from xmodule.exceptions import SerializationError, NotFoundError
 
 from xmodule.modulestore.locator import BlockUsageLocator
 from .access import has_course_access
 
 from util.json_request import JsonResponse
-from extract_tar import safetar_extractall
-from student.roles import CourseInstructorRole, CourseStaffRole
-from student import auth
+from contentstore.models import CourseImport
+from contentstore.tasks import (
+    import_course, course_import_dir,
+    export_course, get_export_status, set_export_status, course_export_name,
+    EXPORT_STATUS_EXPORTING, EXPORT_STATUS_DONE
+)
 
 
-__all__ = ['import_handler', 'import_status_handler', 'export_handler']
+__all__ = ['import_handler', 'import_status_handler', 'export_handler', 'export_status_handler']
 
 
 log = logging.getLogger(__name__)
@@ -71,9 +70,9 @@ def import_handler(request, tag=None, package_id=None, branch=None, version_guid
         if request.method == 'GET':
             raise NotImplementedError('coming soon')
         else:
-            data_root = path(settings.GITHUB_REPO_ROOT)
-            course_subdir = "{0}-{1}-{2}".format(old_location.org, old_location.course, old_location.name)
-            course_dir = data_root / course_subdir
+            # chunks are put together in a directory of the user's own, so that uploads by different
+            # users of files with the same name cannot mix
+            upload_dir = course_import_dir(old_location) / u'upload-{}'.format(request.user.id)
 
             filename = request.FILES['course-data'].name
             if not filename.endswith('.tar.gz'):
@@ -84,10 +83,10 @@ def import_handler(request, tag=None, package_id=None, branch=None, version_guid
                     },
                     status=415
                 )
-            temp_filepath = course_dir / filename
+            temp_filepath = upload_dir / filename
 
-            if not course_dir.isdir():
-                os.mkdir(course_dir)
+            if not upload_dir.isdir():
+                upload_dir.makedirs_p()
 
             logging.debug('importing course to {0}'.format(temp_filepath))
 
@@ -104,7 +103,13 @@ def import_handler(request, tag=None, package_id=None, branch=None, version_guid
                 mode = "wb+"
             else:
                 mode = "ab+"
-                size = os.path.getsize(temp_filepath)
+                if not temp_filepath.isfile() and int(content_range['stop']) == int(content_range['end']) - 1:
+                    # The last request sometimes comes twice (see below), the second time after the
+                    # first handed the file over to the import.
+                    course_import = CourseImport.latest(old_location.course_id, filename)
+                    if course_import is not None:
+                        return _course_import_response(course_import)
+                size = os.path.getsize(temp_filepath) if temp_filepath.isfile() else 0
                 # Check to make sure we haven't missed a chunk
                 # This shouldn't happen, even if different instances are handling
                 # the same session, but it's always better to catch errors earlier.
@@ -124,7 +129,10 @@ def import_handler(request, tag=None, package_id=None, branch=None, version_guid
                 # The last request sometimes comes twice. This happens because
                 # nginx sends a 499 error code when the response takes too long.
                 elif size > int(content_range['stop']) and size == int(content_range['end']):
-                    return JsonResponse({'ImportStatus': 1})
+                    course_import = CourseImport.latest(old_location.course_id, filename)
+                    if course_import is None:
+                        return JsonResponse({'ImportStatus': 1})
+                    return _course_import_response(course_import)
 
             with open(temp_filepath, mode) as temp_file:
                 for chunk in request.FILES['course-data'].chunks():
@@ -147,109 +155,22 @@ def import_handler(request, tag=None, package_id=None, branch=None, version_guid
 
             else:   # This was the last chunk.
 
-                # Use sessions to keep info about import progress
-                session_status = request.session.setdefault("import_status", {})
-                key = location.package_id + filename
-                session_status[key] = 1
-                request.session.modified = True
-
-                # Do everything from now on in a try-finally block to make sure
-                # everything is properly cleaned up.
+                # Import in the background, keeping track of its progress in a CourseImport. The
+                # worker doing the import may be on another host, so it gets the file from the contentstore.
+                course_import = _create_course_import(old_location.course_id, filename, request.user)
                 try:
-
-                    tar_file = tarfile.open(temp_filepath)
-                    try:
-                        safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
-                    except SuspiciousOperation as exc:
-                        return JsonResponse(
-                            {
-                                'ErrMsg': 'Unsafe tar file. Aborting import.',
-                                'SuspiciousFileOperationMsg': exc.args[0],
-                                'Stage': 1
-                            },
-                            status=400
-                        )
-                    finally:
-                        tar_file.close()
-
-                    session_status[key] = 2
-                    request.session.modified = True
-
-                    # find the 'course.xml' file
-                    def get_all_files(directory):
-                        """
-                        For each file in the directory, yield a 2-tuple of (file-name,
-                        directory-path)
-                        """
-                        for dirpath, _dirnames, filenames in os.walk(directory):
-                            for filename in filenames:
-                                yield (filename, dirpath)
-
-                    def get_dir_for_fname(directory, filename):
-                        """
-                        Returns the dirpath for the first file found in the directory
-                        with the given name.  If there is no file in the directory with
-                        the specified name, return None.
-                        """
-                        for fname, dirpath in get_all_files(directory):
-                            if fname == filename:
-                                return dirpath
-                        return None
-
-                    fname = "course.xml"
-
-                    dirpath = get_dir_for_fname(course_dir, fname)
-
-                    if not dirpath:
-                        return JsonResponse(
-                            {
-
-                                'ErrMsg': _('Could not find the course.xml file in the package.'),
-                                'Stage': 2
-                            },
-                            status=415
-                        )
-
-                    logging.debug('found course.xml at {0}'.format(dirpath))
-
-                    if dirpath != course_dir:
-                        for fname in os.listdir(dirpath):
-                            shutil.move(dirpath / fname, course_dir)
-
-                    _module_store, course_items = import_from_xml(
-                        modulestore('direct'),
-                        settings.GITHUB_REPO_ROOT,
-                        [course_subdir],
-                        load_error_modules=False,
-                        static_content_store=contentstore(),
-                        target_location_namespace=old_location,
-                        draft_store=modulestore()
-                    )
-
-                    new_location = course_items[0].location
-                    logging.debug('new course at {0}'.format(new_location))
-
-                    session_status[key] = 3
-                    request.session.modified = True
-
-                    auth.add_users(request.user, CourseInstructorRole(new_location), request.user)
-                    auth.add_users(request.user, CourseStaffRole(new_location), request.user)
-                    logging.debug('created all course groups at {0}'.format(new_location))
-
-                # Send errors to client with stage at which error occurred.
-                except Exception as exception:   # pylint: disable=W0703
-                    return JsonResponse(
-                        {
-                            'ErrMsg': str(exception),
-                            'Stage': session_status[key]
-                        },
-                        status=400
-                    )
-
+                    with open(temp_filepath, 'rb') as temp_file:
+                        contentstore().save_archive(course_import.archive_name, temp_file)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.exception(u'There was an error saving the upload of %s', course_import)
+                    course_import.fail(400, ErrMsg=str(exc))
+                    return _course_import_response(course_import)
                 finally:
-                    shutil.rmtree(course_dir)
+                    os.remove(temp_filepath)
+                import_course.delay(course_import.id)
 
-                return JsonResponse({'Status': 'OK'})
+                # The import may already be over (e.g. if it failed early on, or tasks run eagerly)
+                return _course_import_response(CourseImport.objects.get(id=course_import.id))
     elif request.method == 'GET':  # assume html
         course_module = modulestore().get_item(old_location)
         return render_to_response('import.html', {
@@ -268,36 +189,75 @@ def import_status_handler(request, tag=None, package_id=None, branch=None, versi
     """
     Returns an integer corresponding to the status of a file import. These are:
 
-        0 : No status info found (import done or upload still in progress)
+        0 : No status info found (upload still in progress)
         1 : Extracting file
         2 : Validating.
         3 : Importing to mongo
+        4 : Done
+
+    If the import failed, the response also has the ErrMsg, and the Stage at which it failed.
 
+    The import is the one whose ImportId the upload of the last chunk returned, given as the import_id
+    GET parameter. Without it, the import is the latest of the file.
     """
     location = BlockUsageLocator(package_id=package_id, branch=branch, version_guid=version_guid, block_id=block)
     if not has_course_access(request.user, location):
         raise PermissionDenied()
 
-    try:
-        session_status = request.session["import_status"]
-        status = session_status[location.package_id + filename]
-    except KeyError:
-        status = 0
+    old_location = loc_mapper().translate_locator_to_location(location)
+    import_id = request.GET.get('import_id')
+    if import_id:
+        try:
+            course_import = CourseImport.objects.get(id=import_id, course_id=old_location.course_id)
+        except (CourseImport.DoesNotExist, ValueError):
+            course_import = None
+    else:
+        course_import = CourseImport.latest(old_location.course_id, filename)
+    if course_import is None:
+        return JsonResponse({"ImportStatus": 0})
+
+    response = {"ImportStatus": course_import.status_stage}
+    if course_import.failed:
+        response.update(json.loads(course_import.error_details))
+    return JsonResponse(response)
 
-    return JsonResponse({"ImportStatus": status})
+
+@transaction.commit_on_success
+def _create_course_import(course_id, filename, user):
+    """
+    Creates the CourseImport for an import, committing it so that the task doing the import can see it.
+    """
+    return CourseImport.objects.create(course_id=course_id, filename=filename, user=user)
+
+
+def _course_import_response(course_import):
+    """
+    Returns the response to the upload of the last chunk of the file for course_import, with the
+    ImportId to ask import_status_handler about.
+    """
+    if course_import.failed:
+        response = json.loads(course_import.error_details)
+        response['ImportId'] = course_import.id
+        return JsonResponse(response, status=course_import.error_status)
+    elif course_import.stage == CourseImport.DONE:
+        return JsonResponse({'Status': 'OK', 'ImportId': course_import.id})
+    return JsonResponse({'ImportStatus': course_import.status_stage, 'ImportId': course_import.id})
 
 
 @ensure_csrf_cookie
 @login_required
-@require_http_methods(("GET",))
+@require_http_methods(("GET", "POST"))
 def export_handler(request, tag=None, package_id=None, branch=None, version_guid=None, block=None):
     """
     The restful handler for exporting a course.
 
     GET
         html: return html page for import page
-        application/x-tgz: return tar.gz file containing exported course
+        application/x-tgz: return tar.gz file containing exported course. With ?exported=1, return
+            the tar.gz file written by the last background export instead.
         json: not supported
+    POST
+        json: start exporting the course in the background. Its progress is returned by export_status_handler.
 
     Note that there are 2 ways to request the tar.gz file. The request header can specify
     application/x-tgz via HTTP_ACCEPT, or a query parameter can be used (?_accept=application/x-tgz).
@@ -316,17 +276,35 @@ def export_handler(request, tag=None, package_id=None, branch=None, version_guid
     requested_format = request.REQUEST.get('_accept', request.META.get('HTTP_ACCEPT', 'text/html'))
 
     export_url = location.url_reverse('export') + '?_accept=application/x-tgz'
+    if request.method == 'POST':
+        if 'application/json' not in requested_format:
+            return HttpResponse(status=406)
+        set_export_status(old_location, EXPORT_STATUS_EXPORTING)
+        export_course.delay(old_location.url())
+        return JsonResponse({'ExportStatus': EXPORT_STATUS_EXPORTING})
+
+    if 'application/x-tgz' in requested_format and request.GET.get('exported'):
+        if get_export_status(old_location)['status'] != EXPORT_STATUS_DONE:
+            raise Http404
+        export_name = course_export_name(old_location)
+        try:
+            archive = contentstore().get_archive(export_name)
+        except NotFoundError:
+            raise Http404
+        response = HttpResponse(FileWrapper(archive), content_type='application/x-tgz')
+        response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(export_name)
+        response['Content-Length'] = archive.length
+        return response
+
     if 'application/x-tgz' in requested_format:
         name = old_location.name
         export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-        root_dir = path(mkdtemp())
 
         try:
-            export_to_xml(modulestore('direct'), contentstore(), old_location, root_dir, name, modulestore())
-
             logging.debug('tar file being generated at {0}'.format(export_file.name))
-            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-                tar_file.add(root_dir / name, arcname=name)
+            export_to_tarball(modulestore('direct'), contentstore(), old_location, export_file, name, modulestore())
+            export_file.flush()
+            export_file.seek(0)
         except SerializationError, e:
             logging.exception('There was an error exporting course {0}. {1}'.format(course_module.location, unicode(e)))
             unit = None
@@ -366,8 +344,6 @@ def export_handler(request, tag=None, package_id=None, branch=None, version_guid
                 'course_home_url': location.url_reverse("course"),
                 'export_url': export_url
             })
-        finally:
-            shutil.rmtree(root_dir / name)
 
         wrapper = FileWrapper(export_file)
         response = HttpResponse(wrapper, content_type='application/x-tgz')
@@ -384,3 +360,31 @@ def export_handler(request, tag=None, package_id=None, branch=None, version_guid
     else:
         # Only HTML or x-tgz request formats are supported (no JSON).
         return HttpResponse(status=406)
+
+
+@require_GET
+@ensure_csrf_cookie
+@login_required
+def export_status_handler(request, tag=None, package_id=None, branch=None, version_guid=None, block=None):
+    """
+    Returns the status of the background export of a course, as started by a POST to export_handler:
+
+        ExportStatus:
+            0 : No status info found (no export started, or its status has expired)
+            1 : Exporting
+            2 : Done. ExportOutput is the url of the tar.gz file.
+            -1 : Failed. ExportError is the error message.
+    """
+    location = BlockUsageLocator(package_id=package_id, branch=branch, version_guid=version_guid, block_id=block)
+    if not has_course_access(request.user, location):
+        raise PermissionDenied()
+
+    old_location = loc_mapper().translate_locator_to_location(location)
+    export_status = get_export_status(old_location)
+
+    response = {'ExportStatus': export_status['status']}
+    if 'error' in export_status:
+        response['ExportError'] = export_status['error']
+    if export_status['status'] == EXPORT_STATUS_DONE:
+        response['ExportOutput'] = location.url_reverse('export') + '?_accept=application/x-tgz&exported=1'
+    return JsonResponse(response)
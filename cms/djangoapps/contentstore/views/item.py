@@ -10,6 +10,7 @@ from functools import partial
 from static_replace import replace_static_urls
 from xmodule_modifiers import wrap_xblock
 
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseBadRequest, HttpResponse, Http404
@@ -309,9 +310,11 @@ def _save_item(request, usage_loc, item_location, data=None, children=None, meta
 
     if children is not None:
         children_ids = [
-            loc_mapper().translate_locator_to_location(BlockUsageLocator(child_locator)).url()
-            for child_locator
-            in children
+            child_location.url()
+            for child_location
+            in loc_mapper().translate_locators_to_locations(
+                [BlockUsageLocator(child_locator) for child_locator in children]
+            )
         ]
         existing_item.children = children_ids
 
@@ -341,7 +344,9 @@ def _save_item(request, usage_loc, item_location, data=None, children=None, meta
                     field.write_to(existing_item, value)
 
         if existing_item.category == 'video':
-            manage_video_subtitles_save(existing_item, request.user, old_metadata, generate_translation=True)
+            manage_video_subtitles_save(
+                existing_item, request.user, old_metadata, generate_translation=True, cache=cache
+            )
 
     # commit to datastore
     store.update_item(existing_item, request.user.id)
@@ -10,6 +10,7 @@ from datetime import datetime
 from io import BytesIO
 from pytz import UTC
 import json
+from urllib import urlencode
 from contentstore.tests.utils import CourseTestCase
 from contentstore.views import assets
 from xmodule.contentstore.content import StaticContent
@@ -93,6 +94,69 @@ class PaginationTestCase(AssetsTestCase):
         self.assert_correct_asset_response(self.url + "?page_size=2&page=2", 2, 1, 3)
         self.assert_correct_asset_response(self.url + "?page_size=3&page=1", 0, 3, 3)
 
+    def test_cursors(self):
+        self.upload_asset("asset-1")
+        self.upload_asset("asset-2")
+        self.upload_asset("asset-3")
+        url = self.url + "?page_size=2&sort=display_name&direction=asc"
+
+        first_page = json.loads(self.client.get(url, HTTP_ACCEPT='application/json').content)
+        self.assertEquals(['asset-1.txt', 'asset-2.txt'], [asset['display_name'] for asset in first_page['assets']])
+
+        # The page after is read from where the first one ended
+        second_page = json.loads(self.client.get(
+            url + "&page=1&" + urlencode({'after': first_page['nextCursor']}), HTTP_ACCEPT='application/json'
+        ).content)
+        self.assertEquals(2, second_page['start'])
+        self.assertEquals(['asset-3.txt'], [asset['display_name'] for asset in second_page['assets']])
+
+        # and the page before from where the second one started
+        resp = self.client.get(
+            url + "&page=0&" + urlencode({'before': second_page['prevCursor']}), HTTP_ACCEPT='application/json'
+        )
+        self.assertEquals(first_page['assets'], json.loads(resp.content)['assets'])
+
+        # A cursor which doesn't lead to the requested page is ignored
+        resp = self.client.get(
+            url + "&page=0&" + urlencode({'after': first_page['nextCursor']}), HTTP_ACCEPT='application/json'
+        )
+        self.assertEquals(first_page['assets'], json.loads(resp.content)['assets'])
+
+    def test_cursors_without_displayname(self):
+        self.upload_asset("asset-1")
+        self.upload_asset("asset-2")
+        self.upload_asset("asset-3")
+        # assets saved before the displayname was recorded have none
+        contentstore().fs_files.update(
+            {'_id.name': 'asset-2.txt'}, {'$unset': {'displayname': True}}
+        )
+        # until they are backfilled, they sort before the others, by name
+        self.assertEquals(
+            ['asset-2.txt', 'asset-1.txt', 'asset-3.txt'], self.page_through_display_names('asc')
+        )
+        self.assertEquals(
+            ['asset-3.txt', 'asset-1.txt', 'asset-2.txt'], self.page_through_display_names('desc')
+        )
+        # and paging through them leaves them as they are
+        self.assertNotIn('displayname', contentstore().fs_files.find_one({'_id.name': 'asset-2.txt'}))
+
+    def page_through_display_names(self, direction):
+        """
+        Returns the display names of the three assets of the course, got a page of one at a time
+        sorted by display name in direction.
+        """
+        url = self.url + "?page_size=1&sort=display_name&direction=" + direction
+        names = []
+        page = json.loads(self.client.get(url, HTTP_ACCEPT='application/json').content)
+        names.extend(asset['display_name'] for asset in page['assets'])
+        for page_number in (1, 2):
+            page = json.loads(self.client.get(
+                url + "&page={}&".format(page_number) + urlencode({'after': page['nextCursor']}),
+                HTTP_ACCEPT='application/json'
+            ).content)
+            names.extend(asset['display_name'] for asset in page['assets'])
+        return names
+
     def assert_correct_asset_response(self, url, expected_start, expected_length, expected_total):
         resp = self.client.get(url, HTTP_ACCEPT='application/json')
         json_response = json.loads(resp.content)
@@ -6,9 +6,11 @@ import shutil
 import tarfile
 import tempfile
 import copy
+from StringIO import StringIO
 from path import path
 import json
 import logging
+from mock import patch
 from uuid import uuid4
 from pymongo import MongoClient
 
@@ -17,7 +19,10 @@ from django.test.utils import override_settings
 from django.conf import settings
 from xmodule.modulestore.django import loc_mapper
 
-from xmodule.contentstore.django import _CONTENTSTORE
+from xmodule.contentstore.django import _CONTENTSTORE, contentstore
+from xmodule.exceptions import NotFoundError
+from contentstore.models import CourseImport
+from contentstore.tasks import course_export_name
 from xmodule.modulestore.tests.factories import ItemFactory
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
@@ -106,6 +111,68 @@ class ImportTestCase(CourseTestCase):
             resp = self.client.post(self.url, args)
 
         self.assertEquals(resp.status_code, 200)
+        self.assertEquals(json.loads(resp.content)['Status'], 'OK')
+        # `import_status` reports the finished import
+        resp_status = self.client.get(
+            self.new_location.url_reverse(
+                'import_status',
+                os.path.split(self.good_tar)[1]
+            )
+        )
+        self.assertEquals(json.loads(resp_status.content)["ImportStatus"], 4)
+
+    def test_import_on_another_host(self):
+        """
+        Check that the import gets the uploaded file from the contentstore, rather than from the
+        directory the upload was written to, which a worker on another host does not have.
+        """
+        worker_dir = path(tempfile.mkdtemp(dir=self.content_dir))
+        with patch('contentstore.tasks.course_import_dir', return_value=worker_dir):
+            with open(self.good_tar) as gtar:
+                resp = self.client.post(self.url, {"name": self.good_tar, "course-data": [gtar]})
+
+        self.assertEquals(resp.status_code, 200)
+        self.assertEquals(json.loads(resp.content)['Status'], 'OK')
+        # the import cleans up after itself
+        self.assertEquals(worker_dir.listdir(), [])
+        course_import = CourseImport.objects.get(id=json.loads(resp.content)['ImportId'])
+        with self.assertRaises(NotFoundError):
+            contentstore().get_archive(course_import.archive_name)
+
+    def test_import_leaves_other_imports(self):
+        """
+        Check that an import only removes its own files, not those of another import of the course
+        running at the same time.
+        """
+        import_dir = path(tempfile.mkdtemp(dir=self.content_dir))
+        other_import_dir = import_dir / 'other'
+        other_import_dir.makedirs()
+        (other_import_dir / 'course.xml').touch()
+        with patch('contentstore.tasks.course_import_dir', return_value=import_dir):
+            with open(self.good_tar) as gtar:
+                resp = self.client.post(self.url, {"name": self.good_tar, "course-data": [gtar]})
+
+        self.assertEquals(json.loads(resp.content)['Status'], 'OK')
+        self.assertEquals(import_dir.listdir(), [other_import_dir])
+        self.assertTrue((other_import_dir / 'course.xml').exists())
+
+    def test_status_of_given_import(self):
+        """
+        Check that `import_status` reports the import the upload started, even once the
+        same file is uploaded again.
+        """
+        with open(self.good_tar) as gtar:
+            resp = self.client.post(self.url, {"name": self.good_tar, "course-data": [gtar]})
+        import_id = json.loads(resp.content)['ImportId']
+
+        filename = os.path.split(self.good_tar)[1]
+        CourseImport.objects.create(course_id=self.course.location.course_id, filename=filename, user=self.user)
+        status_url = self.new_location.url_reverse('import_status', filename)
+
+        resp_status = self.client.get(status_url, {'import_id': import_id})
+        self.assertEquals(json.loads(resp_status.content)["ImportStatus"], 4)
+        resp_status = self.client.get(status_url)
+        self.assertEquals(json.loads(resp_status.content)["ImportStatus"], 1)
 
     ## Unsafe tar methods #####################################################
     # Each of these methods creates a tarfile with a single type of unsafe
@@ -248,6 +315,36 @@ class ExportTestCase(CourseTestCase):
         self.assertEquals(resp.status_code, 200)
         self.assertTrue(resp.get('Content-Disposition').startswith('attachment'))
 
+    def test_export_background(self):
+        """
+        Export in the background, poll its status and get the tar.gz file.
+        """
+        resp = self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEquals(resp.status_code, 200)
+
+        location = loc_mapper().translate_location(self.course.location.course_id, self.course.location, False, True)
+        resp = self.client.get(location.url_reverse('export_status/', ''))
+        export_status = json.loads(resp.content)
+        self.assertEquals(export_status['ExportStatus'], 2)
+
+        resp = self.client.get(export_status['ExportOutput'])
+        self._verify_export_succeeded(resp)
+        with tarfile.open(fileobj=StringIO(resp.content)) as tar_file:
+            self.assertIn('Robot_Super_Course/course.xml', tar_file.getnames())
+
+    def test_export_background_again(self):
+        """
+        Exporting in the background again replaces the archive in the contentstore.
+        """
+        for __ in range(2):
+            resp = self.client.post(self.url, HTTP_ACCEPT='application/json')
+            self.assertEquals(resp.status_code, 200)
+
+        export_name = course_export_name(self.course.location)
+        self.assertEquals(contentstore().archive_files.find({'filename': export_name}).count(), 1)
+        resp = self.client.get(self.url + '?_accept=application/x-tgz&exported=1')
+        self._verify_export_succeeded(resp)
+
     def test_export_failure_top_level(self):
         """
         Export failure.
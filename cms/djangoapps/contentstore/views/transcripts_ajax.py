@@ -12,6 +12,7 @@ import json
 import requests
 
 from django.http import HttpResponse, Http404
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
@@ -516,7 +517,7 @@ def save_transcripts(request):
         item.save_with_metadata(request.user)  # item becomes updated with new values
 
         if new_sub:
-            manage_video_subtitles_save(item, request.user)
+            manage_video_subtitles_save(item, request.user, cache=cache)
         else:
             # If `new_sub` is empty, it means that user explicitly does not want to use
             # transcripts for current video ids and we remove all transcripts from storage.
@@ -6,7 +6,7 @@ from __future__ import absolute_import
 import logging
 import mimetypes
 
-from xblock.core import XBlock
+from xmodule import block_registry
 
 from django.conf import settings
 from django.http import Http404, HttpResponse
@@ -20,7 +20,7 @@ def xblock_resource(request, block_type, uri):  # pylint: disable=unused-argumen
     Return a package resource for the specified XBlock.
     """
     try:
-        xblock_class = XBlock.load_class(block_type, settings.XBLOCK_SELECT_FUNCTION)
+        xblock_class = block_registry.load_class(block_type, select=settings.XBLOCK_SELECT_FUNCTION)
         content = xblock_class.open_local_resource(uri)
     except IOError:
         log.info('Failed to load xblock resource', exc_info=True)
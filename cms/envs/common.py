@@ -96,6 +96,15 @@ FEATURES = {
 
     # Prevent concurrent logins per user
     'PREVENT_CONCURRENT_LOGINS': False,
+
+    # List courses from their summaries instead of loading every course from the modulestore.
+    # Run the refresh_course_summaries command before turning this on.
+    'ENABLE_COURSE_SUMMARIES': False,
+
+    # Do the heavy initialization of the application (XBlock classes, mako templates, modulestores)
+    # in the wsgi module, for a server which loads the application before forking its workers.
+    # See util/prefork.py for the gunicorn settings to run with.
+    'PREFORK_STARTUP': False,
 }
 ENABLE_JASMINE = False
 
@@ -494,6 +503,9 @@ INSTALLED_APPS = (
     # for managing course modes
     'course_modes',
 
+    # for listing courses
+    'course_summaries',
+
     # Dark-launching languages
     'dark_lang',
 
@@ -17,6 +17,9 @@ define(["backbone.paginator", "js/models/asset"], function(BackbonePaginator, As
             'page_size': function() { return this.perPage; },
             'sort': function() { return this.sortField; },
             'direction': function() { return this.sortDirection; },
+            // The cursors of the current page let the server read the pages next to it without skipping
+            'after': function() { return this.nextCursor || ''; },
+            'before': function() { return this.prevCursor || ''; },
             'format': 'json'
         },
 
@@ -30,6 +33,8 @@ define(["backbone.paginator", "js/models/asset"], function(BackbonePaginator, As
             this.totalPages = Math.max(totalPages, 1); // Treat an empty collection as having 1 page...
             this.currentPage = currentPage;
             this.start = start;
+            this.nextCursor = response.nextCursor;
+            this.prevCursor = response.prevCursor;
             return response.assets;
         }
     });
@@ -50,11 +50,19 @@ define(
         var getStatus = function (url, timeout, stage) {
             var currentStage = stage || 0;
             if (CourseImport.stopGetStatus) { return ;}
+            if (currentStage == 4) {
+                CourseImport.displayFinishedImport();
+                return;
+            }
             updateStage(currentStage);
-            if (currentStage == 3 ) { return ;}
             var time = timeout || 1000;
             $.getJSON(url,
                 function (data) {
+                    if (data.hasOwnProperty("ErrMsg")) {
+                        CourseImport.stopGetStatus = true;
+                        CourseImport.stageError(data.Stage, data.ErrMsg);
+                        return;
+                    }
                     setTimeout(function () {
                         getStatus(url, time, data.ImportStatus);
                     }, time);
@@ -115,9 +123,16 @@ define(
              */
             startServerFeedback: function (url){
                 this.stopGetStatus = false;
+                this.displayStatus();
+                getStatus(url, 500, 0);
+            },
+
+            /**
+             * Makes the status list visible, without asking for status updates.
+             */
+            displayStatus: function () {
                 $('div.wrapper-status').removeClass('is-hidden');
                 $('.status-info').show();
-                getStatus(url, 500, 0);
             },
 
 
@@ -5,8 +5,19 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cms.envs.aws")
 import cms.startup as startup
 startup.run()
 
+from django.conf import settings
+from django_startup import startup_step, log_startup_report
+
+if settings.FEATURES.get('PREFORK_STARTUP'):
+    # Do the heavy initialization here, once in the master process of a server which loads the
+    # application before forking its workers (see util.prefork)
+    from util.prefork import preload
+    preload()
+
 # This application object is used by the development server
 # as well as any WSGI server configured to use this file.
 from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
+with startup_step('wsgi application'):
+    application = get_wsgi_application()
 
+log_startup_report()
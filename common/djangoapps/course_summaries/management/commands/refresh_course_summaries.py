@@ -0,0 +1,35 @@
+"""
+Rebuild the summaries of all the courses in the modulestore.
+
+Courses in Mongo are summarized whenever they are changed, but XML courses and courses created
+before the summaries existed are only summarized by running:
+
+./manage.py lms refresh_course_summaries
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
+
+from course_summaries.models import CourseSummary, COURSE_SUMMARIES_CACHE_KEY
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the course summaries from the modulestore
+    """
+    help = "Rebuild the summaries of all the courses in the modulestore"
+
+    def handle(self, *args, **options):
+        store = modulestore()
+        course_ids = set()
+        for course in store.get_courses():
+            if isinstance(course, ErrorDescriptor):
+                continue
+            CourseSummary.from_course(store, course).save()
+            course_ids.add(course.id)
+
+        CourseSummary.objects.exclude(course_id__in=course_ids).delete()
+        cache.delete(COURSE_SUMMARIES_CACHE_KEY)
+        self.stdout.write("Summarized {} courses\n".format(len(course_ids)))
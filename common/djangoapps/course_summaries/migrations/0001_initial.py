@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'CourseSummary'
+        db.create_table('course_summaries_coursesummary', (
+            ('course_id', self.gf('django.db.models.fields.CharField')(primary_key=True, max_length=255)),
+            ('org', self.gf('django.db.models.fields.CharField')(max_length=255, db_index=True)),
+            ('number', self.gf('django.db.models.fields.CharField')(max_length=255, db_index=True)),
+            ('modulestore_type', self.gf('django.db.models.fields.CharField')(max_length=32)),
+            ('display_name', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('display_organization', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('display_coursenumber', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('short_description', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('start', self.gf('django.db.models.fields.DateTimeField')(null=True)),
+            ('end', self.gf('django.db.models.fields.DateTimeField')(null=True)),
+            ('advertised_start', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('announcement', self.gf('django.db.models.fields.DateTimeField')(null=True)),
+            ('enrollment_start', self.gf('django.db.models.fields.DateTimeField')(null=True)),
+            ('enrollment_end', self.gf('django.db.models.fields.DateTimeField')(null=True)),
+            ('enrollment_domain', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('days_early_for_beta', self.gf('django.db.models.fields.FloatField')(null=True)),
+            ('ispublic', self.gf('django.db.models.fields.NullBooleanField')(null=True, blank=True)),
+            ('is_new', self.gf('django.db.models.fields.NullBooleanField')(null=True, blank=True)),
+            ('course_image', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('static_asset_path', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('data_dir', self.gf('django.db.models.fields.TextField')(null=True)),
+            ('modified', self.gf('django.db.models.fields.DateTimeField')(auto_now=True, blank=True)),
+        ))
+        db.send_create_signal('course_summaries', ['CourseSummary'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'CourseSummary'
+        db.delete_table('course_summaries_coursesummary')
+
+
+    models = {
+        'course_summaries.coursesummary': {
+            'Meta': {'ordering': "('number',)", 'object_name': 'CourseSummary'},
+            'advertised_start': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'announcement': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'primary_key': 'True'}),
+            'course_image': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'data_dir': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'days_early_for_beta': ('django.db.models.fields.FloatField', [], {'null': 'True'}),
+            'display_coursenumber': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'display_name': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'display_organization': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'end': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'enrollment_domain': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'enrollment_end': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'enrollment_start': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'is_new': ('django.db.models.fields.NullBooleanField', [], {'blank': 'True', 'null': 'True'}),
+            'ispublic': ('django.db.models.fields.NullBooleanField', [], {'blank': 'True', 'null': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'}),
+            'modulestore_type': ('django.db.models.fields.CharField', [], {'max_length': '32'}),
+            'number': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'max_length': '255'}),
+            'org': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'max_length': '255'}),
+            'short_description': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'start': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'static_asset_path': ('django.db.models.fields.TextField', [], {'null': 'True'})
+        }
+    }
+
+    complete_apps = ['course_summaries']
@@ -0,0 +1,260 @@
+"""
+Summaries of the courses in the modulestore, so that courses can be listed without loading
+every CourseDescriptor.
+"""
+import logging
+from datetime import datetime
+from math import exp
+
+import dateutil.parser
+from django.core.cache import cache
+from django.db import models
+from django.dispatch import receiver
+from django.utils.timezone import UTC
+from django.utils.translation import ugettext as _
+
+from util.date_utils import strftime_localized
+from xmodule.course_module import CourseDescriptor, CourseFields
+from xmodule.error_module import ErrorDescriptor
+from xmodule.fields import Date
+from xmodule.modulestore.django import modulestore_update_signal
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+log = logging.getLogger(__name__)
+
+# The cache key of the list of all the course summaries, and how long it is cached for
+COURSE_SUMMARIES_CACHE_KEY = 'course_summaries.all'
+COURSE_SUMMARIES_CACHE_TIMEOUT = 60 * 60
+
+
+class CourseSummary(models.Model):
+    """
+    The fields of a course which are needed to list it, and to check whether a user can see it.
+
+    A CourseSummary has the same attributes as a CourseDescriptor for those fields, so that it
+    can be used in place of one on the course listing pages, and passed to has_access.
+    """
+    course_id = models.CharField(max_length=255, primary_key=True)
+    org = models.CharField(max_length=255, db_index=True)
+    number = models.CharField(max_length=255, db_index=True)
+
+    # The type of modulestore the course is in (see get_modulestore_type)
+    modulestore_type = models.CharField(max_length=32)
+
+    display_name = models.TextField(null=True)
+    display_organization = models.TextField(null=True)
+    display_coursenumber = models.TextField(null=True)
+    # The raw html of the course's short_description about page
+    short_description = models.TextField(null=True)
+
+    start = models.DateTimeField(null=True)
+    end = models.DateTimeField(null=True)
+    advertised_start = models.TextField(null=True)
+    announcement = models.DateTimeField(null=True)
+    enrollment_start = models.DateTimeField(null=True)
+    enrollment_end = models.DateTimeField(null=True)
+    enrollment_domain = models.TextField(null=True)
+    days_early_for_beta = models.FloatField(null=True)
+    ispublic = models.NullBooleanField()
+    is_new = models.NullBooleanField()
+
+    course_image = models.TextField(null=True)
+    static_asset_path = models.TextField(null=True)
+    data_dir = models.TextField(null=True)
+
+    modified = models.DateTimeField(auto_now=True)
+
+    # The access checks look at the tags of a descriptor's class
+    _class_tags = frozenset()
+
+    class Meta:  # pylint: disable=missing-docstring
+        ordering = ('number',)
+
+    def __unicode__(self):
+        return self.course_id
+
+    @classmethod
+    def refresh(cls, store, course_id):
+        """
+        Updates the summary of the course course_id from the modulestore store, or removes it if
+        the course is no longer there.
+        """
+        course = store.get_course(course_id)
+        if course is None or isinstance(course, ErrorDescriptor):
+            cls.objects.filter(course_id=course_id).delete()
+        else:
+            cls.from_course(store, course).save()
+        cache.delete(COURSE_SUMMARIES_CACHE_KEY)
+
+    @classmethod
+    def from_course(cls, store, course):
+        """
+        Returns the (unsaved) summary of the CourseDescriptor course, from the modulestore store.
+        """
+        about_location = course.location.replace(category='about', name='short_description')
+        try:
+            short_description = store.get_instance(course.id, about_location).data
+        except ItemNotFoundError:
+            short_description = None
+
+        return cls(
+            course_id=course.id,
+            org=course.location.org,
+            number=course.location.course,
+            modulestore_type=store.get_modulestore_type(course.id),
+            display_name=course.display_name,
+            display_organization=course.display_organization,
+            display_coursenumber=course.display_coursenumber,
+            short_description=short_description,
+            start=course.start,
+            end=course.end,
+            advertised_start=course.advertised_start,
+            announcement=course.announcement,
+            enrollment_start=course.enrollment_start,
+            enrollment_end=course.enrollment_end,
+            enrollment_domain=course.enrollment_domain,
+            days_early_for_beta=course.days_early_for_beta,
+            ispublic=getattr(course, 'ispublic', None),
+            is_new=course.is_new,
+            course_image=course.course_image,
+            static_asset_path=course.static_asset_path,
+            data_dir=getattr(course, 'data_dir', None),
+        )
+
+    @property
+    def id(self):  # pylint: disable=invalid-name
+        """The course_id of the course, like CourseDescriptor.id"""
+        return self.course_id
+
+    @property
+    def location(self):
+        """The Location of the course"""
+        return CourseDescriptor.id_to_location(self.course_id)
+
+    @property
+    def display_name_with_default(self):
+        """
+        Return the display name of the course, or its url name if it doesn't have one.
+        """
+        if self.display_name is None:
+            return self.location.name.replace('_', ' ')
+        return self.display_name
+
+    @property
+    def display_org_with_default(self):
+        """
+        Return the display organization of the course, or its org if it doesn't have one.
+        """
+        return self.display_organization or self.org
+
+    @property
+    def display_number_with_default(self):
+        """
+        Return the display course number of the course, or its number if it doesn't have one.
+        """
+        return self.display_coursenumber or self.number
+
+    def has_ended(self):
+        """
+        Returns True if the course has an end date, and it has passed.
+        """
+        return self.end is not None and datetime.now(UTC()) > self.end
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Checks if neither the start date nor the advertised start date of the course have been set.
+        """
+        return self.advertised_start is None and self.start == CourseFields.start.default
+
+    @property
+    def start_date_text(self):
+        """
+        Returns the text for the start date of the course, as CourseDescriptor.start_date_text does.
+        """
+        if self.advertised_start is not None:
+            try:
+                advertised_start = Date().from_json(self.advertised_start)
+            except ValueError:
+                advertised_start = None
+            if advertised_start is None:
+                return self.advertised_start.title()
+            return strftime_localized(advertised_start, "SHORT_DATE")
+        elif self.start_date_is_still_default:
+            # Translators: TBD stands for 'To Be Determined' and is used when a course
+            # does not yet have an announced start date.
+            return _('TBD')
+        else:
+            return strftime_localized(self.start, "SHORT_DATE")
+
+    @property
+    def is_newish(self):
+        """
+        Returns whether the course is flagged as new, or if it isn't flagged, whether it was
+        announced in the last month or hasn't started yet, as CourseDescriptor.is_newish does.
+        """
+        if self.is_new is not None:
+            return self.is_new
+        announcement, start, now = self._sorting_dates()
+        if announcement and (now - announcement).days < 30:
+            return True
+        return (now - start).days < 1
+
+    @property
+    def sorting_score(self):
+        """
+        Returns how "new" the course is, the lower the newer, as CourseDescriptor.sorting_score does.
+        """
+        announcement, start, now = self._sorting_dates()
+        scale = 300.0  # about a year
+        if announcement:
+            return -exp(-(now - announcement).days / scale)
+        return exp((now - start).days / scale)
+
+    def _sorting_dates(self):
+        """
+        Returns the announcement date, (advertised) start date and current time, for is_newish
+        and sorting_score.
+        """
+        try:
+            start = dateutil.parser.parse(self.advertised_start)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=UTC())
+        except (ValueError, AttributeError):
+            start = self.start
+        return self.announcement, start, datetime.now(UTC())
+
+
+def get_course_summaries():
+    """
+    Returns the CourseSummary of every course, sorted by course number.
+    """
+    summaries = cache.get(COURSE_SUMMARIES_CACHE_KEY)
+    if summaries is None:
+        summaries = list(CourseSummary.objects.all())
+        cache.set(COURSE_SUMMARIES_CACHE_KEY, summaries, COURSE_SUMMARIES_CACHE_TIMEOUT)
+    return summaries
+
+
+@receiver(modulestore_update_signal)
+def refresh_course_summaries(sender, modulestore, course_id, location, **kwargs):  # pylint: disable=unused-argument
+    """
+    Refreshes the summary of a course whenever the course, or one of its about pages, is written to
+    the modulestore.
+    """
+    if location.category == 'course':
+        course_ids = [location.course_id]
+    elif location.category == 'about':
+        # about pages don't say which run of the course they belong to
+        course_ids = list(CourseSummary.objects.filter(
+            org=location.org, number=location.course
+        ).values_list('course_id', flat=True))
+    else:
+        return
+
+    for summary_course_id in course_ids:
+        try:
+            CourseSummary.refresh(modulestore, summary_course_id)
+        except Exception:  # pylint: disable=broad-except
+            # a stale summary mustn't stop the course from being saved
+            log.exception(u"Could not refresh the summary of course %s", summary_course_id)
@@ -0,0 +1,57 @@
+"""
+Tests for the course summaries
+"""
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from courseware.tests.tests import TEST_DATA_MONGO_MODULESTORE
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from course_summaries.models import CourseSummary, get_course_summaries
+
+
+@override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
+class CourseSummaryTest(ModuleStoreTestCase):
+    """
+    Test that the course summaries follow the courses in the modulestore
+    """
+    def setUp(self):
+        cache.clear()
+        self.course = CourseFactory.create(org='SummaryX', number='S101', display_name='Summary Course')
+
+    def test_summary_created(self):
+        summary = CourseSummary.objects.get(course_id=self.course.id)
+        self.assertEqual('SummaryX', summary.org)
+        self.assertEqual('S101', summary.display_number_with_default)
+        self.assertEqual('Summary Course', summary.display_name_with_default)
+        self.assertEqual(self.course.location, summary.location)
+        self.assertEqual(self.course.start_date_is_still_default, summary.start_date_is_still_default)
+        self.assertEqual(self.course.is_newish, summary.is_newish)
+
+    def test_summary_refreshed(self):
+        self.course.display_name = 'Renamed Course'
+        modulestore().update_item(self.course)
+        ItemFactory.create(
+            parent_location=self.course.location,
+            category='about',
+            display_name='short_description',
+            data='<p>Short and sweet</p>',
+        )
+
+        summary = CourseSummary.objects.get(course_id=self.course.id)
+        self.assertEqual('Renamed Course', summary.display_name)
+        self.assertEqual('<p>Short and sweet</p>', summary.short_description)
+
+    def test_summary_removed(self):
+        modulestore().delete_item(self.course.location)
+        self.assertFalse(CourseSummary.objects.filter(course_id=self.course.id).exists())
+
+    def test_summaries_cached(self):
+        self.assertEqual([self.course.id], [summary.id for summary in get_course_summaries()])
+        with self.assertNumQueries(0):
+            get_course_summaries()
+
+        CourseFactory.create(org='SummaryX', number='S102', display_name='Another Course')
+        self.assertEqual(2, len(get_course_summaries()))
@@ -1,7 +1,11 @@
 import threading
 
+from celery.signals import task_prerun, task_postrun
+
 _request_cache_threadlocal = threading.local()
 _request_cache_threadlocal.data = {}
+# Whether a request (or celery task), at the end of which the request cache is cleared, is running
+_request_cache_threadlocal.active = False
 
 class RequestCache(object):
     @classmethod
@@ -13,8 +17,42 @@ class RequestCache(object):
 
     def process_request(self, request):
         self.clear_request_cache()
+        _request_cache_threadlocal.active = True
         return None
 
     def process_response(self, request, response):
         self.clear_request_cache()
-        return response
\ No newline at end of file
+        _request_cache_threadlocal.active = False
+        return response
+
+
+@task_prerun.connect
+def clear_request_cache_for_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Start each celery task with an empty request cache, as each request does, so that
+    what is cached for one task isn't served, stale, to the ones after it.
+
+    The request cache of whatever the task runs within (a request, when tasks run eagerly)
+    is put back once the task is over.
+    """
+    if not hasattr(_request_cache_threadlocal, 'outer'):
+        _request_cache_threadlocal.outer = []
+    _request_cache_threadlocal.outer.append((
+        getattr(_request_cache_threadlocal, 'data', {}),
+        getattr(_request_cache_threadlocal, 'active', False),
+    ))
+    _request_cache_threadlocal.data = {}
+    _request_cache_threadlocal.active = True
+
+
+@task_postrun.connect
+def restore_request_cache_after_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Drop what a celery task cached once it is over, as it is once a request is over.
+    """
+    outer = getattr(_request_cache_threadlocal, 'outer', None)
+    if outer:
+        _request_cache_threadlocal.data, _request_cache_threadlocal.active = outer.pop()
+    else:
+        _request_cache_threadlocal.data = {}
+        _request_cache_threadlocal.active = False
@@ -22,7 +22,8 @@ from collections import defaultdict
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db import models, IntegrityError
+from django.core.cache import cache
+from django.db import models, transaction, IntegrityError
 from django.db.models import Count
 from django.db.models.signals import post_save
 from django.dispatch import receiver, Signal
@@ -61,6 +62,33 @@ class AnonymousUserId(models.Model):
     unique_together = (user, course_id)
 
 
+# Anonymous user ids never change, so the cached mapping can be kept for a long time
+ANONYMOUS_USER_ID_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# How many AnonymousUserIds are created per query by cache_anonymous_ids_for_course
+ANONYMOUS_USER_ID_BULK_CREATE_SIZE = 500
+
+
+def _anonymous_id_digest(user_id, course_id):
+    """
+    Returns the anonymous id of the user with id user_id in the course course_id.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    hasher.update(str(user_id))
+    hasher.update(course_id)
+    return hasher.hexdigest()
+
+
+def _anonymous_id_cache_key(anonymous_user_id):
+    """
+    Returns the cache key mapping anonymous_user_id to the id of its user. Finding it in the cache
+    also means that the AnonymousUserId was stored.
+    """
+    return u'student.anonymous_user_id.{}'.format(anonymous_user_id)
+
+
 def anonymous_id_for_user(user, course_id):
     """
     Return a unique id for a (user, course) pair, suitable for inserting
@@ -76,33 +104,32 @@ def anonymous_id_for_user(user, course_id):
     if cached_id is not None:
         return cached_id
 
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(str(user.id))
-    hasher.update(course_id)
-    digest = hasher.hexdigest()
+    digest = _anonymous_id_digest(user.id, course_id)
 
-    try:
-        anonymous_user_id, created = AnonymousUserId.objects.get_or_create(
-            defaults={'anonymous_user_id': digest},
-            user=user,
-            course_id=course_id
-        )
-        if anonymous_user_id.anonymous_user_id != digest:
-            log.error(
-                "Stored anonymous user id {stored!r} for user {user!r} "
-                "in course {course!r} doesn't match computed id {digest!r}".format(
-                    user=user,
-                    course=course_id,
-                    stored=anonymous_user_id.anonymous_user_id,
-                    digest=digest
-                )
+    # Only store the id the first time it is needed
+    if cache.get(_anonymous_id_cache_key(digest)) is None:
+        try:
+            anonymous_user_id, created = AnonymousUserId.objects.get_or_create(
+                defaults={'anonymous_user_id': digest},
+                user=user,
+                course_id=course_id
             )
-    except IntegrityError:
-        # Another thread has already created this entry, so
-        # continue
-        pass
+            if anonymous_user_id.anonymous_user_id != digest:
+                log.error(
+                    "Stored anonymous user id {stored!r} for user {user!r} "
+                    "in course {course!r} doesn't match computed id {digest!r}".format(
+                        user=user,
+                        course=course_id,
+                        stored=anonymous_user_id.anonymous_user_id,
+                        digest=digest
+                    )
+                )
+            else:
+                cache.set(_anonymous_id_cache_key(digest), user.id, ANONYMOUS_USER_ID_CACHE_TIMEOUT)
+        except IntegrityError:
+            # Another thread has already created this entry, so
+            # continue
+            pass
 
     if not hasattr(user, '_anonymous_id'):
         user._anonymous_id = {}
@@ -112,6 +139,59 @@ def anonymous_id_for_user(user, course_id):
     return digest
 
 
+def cache_anonymous_ids_for_course(course_id):
+    """
+    Stores and caches, in bulk, the anonymous ids of all the students enrolled in course_id,
+    both for the course itself and per-student (i.e. for the course_id ''), so that working
+    through all the students of the course (e.g. to grade them) doesn't have to create or
+    look up their ids one at a time.
+    """
+    user_ids = list(CourseEnrollment.objects.filter(
+        course_id=course_id, is_active=True
+    ).values_list('user_id', flat=True))
+
+    for anonymous_course_id in (course_id, ''):
+        stored_user_ids = set(AnonymousUserId.objects.filter(
+            course_id=anonymous_course_id,
+            user__courseenrollment__course_id=course_id,
+            user__courseenrollment__is_active=True,
+        ).values_list('user_id', flat=True))
+
+        missing = [
+            AnonymousUserId(
+                user_id=user_id,
+                course_id=anonymous_course_id,
+                anonymous_user_id=_anonymous_id_digest(user_id, anonymous_course_id)
+            )
+            for user_id in user_ids if user_id not in stored_user_ids
+        ]
+        for start in xrange(0, len(missing), ANONYMOUS_USER_ID_BULK_CREATE_SIZE):
+            batch = missing[start:start + ANONYMOUS_USER_ID_BULK_CREATE_SIZE]
+            try:
+                with transaction.commit_on_success():
+                    AnonymousUserId.objects.bulk_create(batch)
+            except IntegrityError:
+                # Some of them were created concurrently, so fall back to creating them one by one
+                for anonymous_user_id in batch:
+                    try:
+                        AnonymousUserId.objects.get_or_create(
+                            defaults={'anonymous_user_id': anonymous_user_id.anonymous_user_id},
+                            user_id=anonymous_user_id.user_id,
+                            course_id=anonymous_course_id
+                        )
+                    except IntegrityError:
+                        # Created since, e.g. if the get was answered by a lagging read replica
+                        pass
+
+        cache.set_many(
+            dict(
+                (_anonymous_id_cache_key(_anonymous_id_digest(user_id, anonymous_course_id)), user_id)
+                for user_id in user_ids
+            ),
+            ANONYMOUS_USER_ID_CACHE_TIMEOUT
+        )
+
+
 def user_by_anonymous_id(id):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -124,11 +204,17 @@ def user_by_anonymous_id(id):
     if id is None:
         return None
 
+    user_id = cache.get(_anonymous_id_cache_key(id))
     try:
-        return User.objects.get(anonymoususerid__anonymous_user_id=id)
+        if user_id is not None:
+            return User.objects.get(id=user_id)
+        user = User.objects.get(anonymoususerid__anonymous_user_id=id)
     except ObjectDoesNotExist:
         return None
 
+    cache.set(_anonymous_id_cache_key(id), user.id, ANONYMOUS_USER_ID_CACHE_TIMEOUT)
+    return user
+
 
 class UserStanding(models.Model):
     """
@@ -30,7 +30,10 @@ from courseware.tests.tests import TEST_DATA_MIXED_MODULESTORE
 from mock import Mock, patch, sentinel
 from textwrap import dedent
 
-from student.models import anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user
+from student.models import (
+    anonymous_id_for_user, user_by_anonymous_id, cache_anonymous_ids_for_course,
+    AnonymousUserId, CourseEnrollment, unique_id_for_user
+)
 from student.views import (process_survey_link, _cert_info, password_reset, password_reset_confirm_wrapper,
                            change_enrollment, complete_course_mode_info, token, course_from_id)
 from student.tests.factories import UserFactory, CourseModeFactory
@@ -588,6 +591,23 @@ class AnonymousLookupTable(TestCase):
         real_user = user_by_anonymous_id(anonymous_id)
         self.assertEqual(self.user, real_user)
 
+    def test_cache_anonymous_ids_for_course(self):
+        cache.clear()
+        users = [self.user, UserFactory()]
+        for user in users:
+            CourseEnrollment.enroll(user, self.course.id)
+
+        cache_anonymous_ids_for_course(self.course.id)
+        self.assertEqual(AnonymousUserId.objects.filter(user__in=users).count(), 4)
+
+        for user in users:
+            # A fresh User doesn't have the ids cached on it
+            user = User.objects.get(id=user.id)
+            with self.assertNumQueries(0):
+                anonymous_ids = [anonymous_id_for_user(user, course_id) for course_id in (self.course.id, '')]
+            for anonymous_id in anonymous_ids:
+                self.assertEqual(user, user_by_anonymous_id(anonymous_id))
+
 
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 class Token(ModuleStoreTestCase):
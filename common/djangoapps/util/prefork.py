@@ -0,0 +1,92 @@
+"""
+Initialization which a server can do once in its master process before forking its workers,
+rather than again in every worker.
+
+With the PREFORK_STARTUP feature on, the wsgi modules of the LMS and Studio call preload(). Run
+gunicorn with a config file containing:
+
+    preload_app = True
+
+    def post_fork(server, worker):
+        from util.prefork import after_fork
+        after_fork()
+
+so that the wsgi module, and so preload(), runs once in the master, and every worker drops the
+connections it inherited and opens its own when it first needs them.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_connection
+
+from django_startup import startup_step
+from edxmako import LOOKUP
+from xmodule import block_registry
+from xmodule.modulestore.django import modulestore, close_existing_modulestore_connections
+
+log = logging.getLogger(__name__)
+
+
+def preload():
+    """
+    Does the import-heavy initialization of the application: scans the entry points of the XBlock
+    classes, compiles the mako templates and creates the modulestores. Then closes the connections
+    this opened.
+    """
+    with startup_step('XBlock entry points'):
+        block_registry.block_classes()
+        block_registry.block_types_with_children()
+
+    with startup_step('mako templates'):
+        compiled = compile_mako_templates()
+    log.info(u"Compiled %d mako templates", compiled)
+
+    for store_name in settings.MODULESTORE:
+        with startup_step(u'modulestore {}'.format(store_name)):
+            modulestore(store_name)
+
+    close_connections()
+
+
+def after_fork():
+    """
+    Closes the connections a worker inherited from the process it was forked from.
+    """
+    close_connections()
+
+
+def close_connections():
+    """
+    Closes the connections to the databases and the cache. They are reopened when next used.
+    """
+    close_existing_modulestore_connections()
+    close_connection()
+    if hasattr(cache, 'close'):
+        cache.close()
+
+
+def compile_mako_templates():
+    """
+    Compiles every mako template of the template lookups, into the lookups themselves, which forked
+    workers inherit, and into MAKO_MODULE_DIR, which MakoLoader loads compiled templates from too.
+
+    Returns how many templates were compiled.
+    """
+    compiled = 0
+    for namespace, lookup in LOOKUP.items():
+        for directory in lookup.directories:
+            for root, __, filenames in os.walk(directory):
+                for filename in filenames:
+                    if not filename.endswith('.html'):
+                        continue
+                    uri = os.path.relpath(os.path.join(root, filename), directory)
+                    try:
+                        lookup.get_template(uri)
+                    except Exception:  # pylint: disable=broad-except
+                        # Not every .html file in a template directory is a mako template
+                        log.debug(u"Could not compile template %s of %s", uri, namespace, exc_info=True)
+                    else:
+                        compiled += 1
+    return compiled
@@ -1,9 +1,130 @@
 """ Utility functions related to database queries """
+import logging
+import threading
+from functools import wraps
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, DatabaseError, DEFAULT_DB_ALIAS
+
+log = logging.getLogger(__name__)
+
+# The name of the read replica database, if there is one
+READ_REPLICA = 'read_replica'
+
+# How long, in seconds, the result of checking how far behind the read replica is gets cached for
+READ_REPLICA_LAG_CHECK_INTERVAL = 30
+
+# Whether the reads of the current thread are routed to the read replica, for each read_from_replica
+# block it is in
+_routing = threading.local()
+
+
+def _read_replica_lag():
+    """
+    Returns how many seconds the read replica is behind its primary, 0 if it isn't replicating
+    from one, or None if that can't be worked out.
+
+    Raises DatabaseError if replication is broken.
+    """
+    cursor = connections[READ_REPLICA].cursor()
+    try:
+        cursor.execute("SHOW SLAVE STATUS")
+    except DatabaseError:
+        # Not MySQL, or not allowed to see the replication status
+        return None
+    row = cursor.fetchone()
+    if row is None:
+        return 0
+
+    status = dict(zip([column[0] for column in cursor.description], row))
+    if status.get('Seconds_Behind_Master') is None:
+        raise DatabaseError("Replication to the read replica is not running")
+    return status['Seconds_Behind_Master']
+
+
+def read_replica_available():
+    """
+    Returns whether there is a database called 'read_replica', which is no more than
+    settings.READ_REPLICA_MAX_LAG seconds behind the primary.
+    """
+    if READ_REPLICA not in settings.DATABASES:
+        return False
+
+    cache_key = 'util.query.read_replica_available'
+    available = cache.get(cache_key)
+    if available is None:
+        try:
+            lag = _read_replica_lag()
+        except DatabaseError:
+            log.exception("Could not check the read replica, reading from the primary")
+            available = False
+        else:
+            available = lag is None or lag <= getattr(settings, 'READ_REPLICA_MAX_LAG', 60)
+            if not available:
+                log.warning("The read replica is %s seconds behind, reading from the primary", lag)
+        cache.set(cache_key, available, READ_REPLICA_LAG_CHECK_INTERVAL)
+    return available
 
 
 def use_read_replica_if_available(queryset):
     """
-    If there is a database called 'read_replica', use that database for the queryset.
+    If there is a database called 'read_replica', use that database for the queryset,
+    unless it is lagging too far behind the primary.
     """
-    return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
\ No newline at end of file
+    return queryset.using(READ_REPLICA) if read_replica_available() else queryset
+
+
+class read_from_replica(object):  # pylint: disable=invalid-name
+    """
+    Context manager, or decorator, which routes all the reads done inside it to the read
+    replica, as long as there is one which isn't lagging too far behind (see
+    read_replica_available). Writes still go to the primary.
+
+    It is meant for read-only views and tasks, like reports, which can cope with slightly
+    stale data: anything written inside it can't be expected to be read back.
+
+    Requires ReadReplicaRouter to be in settings.DATABASE_ROUTERS.
+    """
+    def __enter__(self):
+        _routing.__dict__.setdefault('stack', []).append(read_replica_available())
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _routing.stack.pop()
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):  # pylint: disable=missing-docstring
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class ReadReplicaRouter(object):
+    """
+    Database router sending the reads done inside read_from_replica to the read replica.
+    """
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        stack = getattr(_routing, 'stack', None)
+        if stack and stack[-1]:
+            return READ_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        # Objects read from the replica are saved to the primary
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == READ_REPLICA:  # pylint: disable=protected-access
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        # The replica has the same data as the primary
+        databases = (DEFAULT_DB_ALIAS, READ_REPLICA)
+        if obj1._state.db in databases and obj2._state.db in databases:  # pylint: disable=protected-access
+            return True
+        return None
+
+    def allow_syncdb(self, db, model):  # pylint: disable=unused-argument
+        if db == READ_REPLICA:
+            return False
+        return None
@@ -0,0 +1,30 @@
+"""
+Tests for the initialization done before forking in util.prefork
+"""
+from mock import patch
+
+from django.conf import settings
+from django.test import TestCase
+
+from edxmako import LOOKUP
+from util.prefork import compile_mako_templates, preload
+
+
+class PreforkTest(TestCase):
+    """
+    Test the initialization done before forking
+    """
+    def test_compile_mako_templates(self):
+        self.assertGreater(compile_mako_templates(), 0)
+        # The compiled templates are kept by the lookups, which forked workers inherit
+        self.assertTrue(LOOKUP['main']._collection)  # pylint: disable=protected-access
+
+    @patch('util.prefork.compile_mako_templates', return_value=0)
+    @patch('util.prefork.close_existing_modulestore_connections')
+    @patch('util.prefork.modulestore')
+    def test_preload(self, mock_modulestore, mock_close, mock_compile):
+        preload()
+        self.assertTrue(mock_compile.called)
+        self.assertEqual(len(settings.MODULESTORE), mock_modulestore.call_count)
+        # Connections opened while preloading aren't kept for the workers to share
+        self.assertTrue(mock_close.called)
@@ -0,0 +1,60 @@
+"""
+Tests for the read replica routing in util.query
+"""
+from mock import patch, Mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase
+
+from util.query import read_from_replica, read_replica_available, ReadReplicaRouter, READ_REPLICA
+
+DATABASES_WITH_REPLICA = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3'},
+    READ_REPLICA: {'ENGINE': 'django.db.backends.sqlite3'},
+}
+
+
+class ReadReplicaTest(TestCase):
+    """
+    Test routing reads to the read replica
+    """
+    def setUp(self):
+        cache.clear()
+        self.router = ReadReplicaRouter()
+
+    def test_no_replica(self):
+        self.assertFalse(read_replica_available())
+        with read_from_replica():
+            self.assertIsNone(self.router.db_for_read(User))
+
+    @patch('util.query._read_replica_lag', Mock(return_value=5))
+    def test_routing(self):
+        with self.settings(DATABASES=DATABASES_WITH_REPLICA):
+            self.assertIsNone(self.router.db_for_read(User))
+            with read_from_replica():
+                self.assertEqual(READ_REPLICA, self.router.db_for_read(User))
+                self.assertIsNone(self.router.db_for_write(User))
+            self.assertIsNone(self.router.db_for_read(User))
+
+            @read_from_replica()
+            def read():
+                """Read inside the decorator"""
+                return self.router.db_for_read(User)
+            self.assertEqual(READ_REPLICA, read())
+
+    def test_lagging_replica(self):
+        with self.settings(DATABASES=DATABASES_WITH_REPLICA, READ_REPLICA_MAX_LAG=60):
+            with patch('util.query._read_replica_lag', Mock(return_value=120)):
+                with read_from_replica():
+                    self.assertIsNone(self.router.db_for_read(User))
+
+            cache.clear()
+            with patch('util.query._read_replica_lag', Mock(side_effect=DatabaseError)):
+                self.assertFalse(read_replica_available())
+
+    def test_write_replica_objects_to_primary(self):
+        user = User(username='replica')
+        user._state.db = READ_REPLICA  # pylint: disable=protected-access
+        self.assertEqual('default', self.router.db_for_write(User, instance=user))
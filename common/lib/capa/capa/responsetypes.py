@@ -1688,9 +1688,29 @@ class CodeResponse(LoncapaResponse):
 
     def update_score(self, score_msg, oldcmap, queuekey):
         """Updates the user's score based on the returned message from the grader."""
-        (valid_score_msg, correct, points, msg) = self._parse_score_msg(score_msg)
+        correctness = self.apply_score_msg(
+            oldcmap, self.answer_id, score_msg, queuekey, self.capa_system.i18n.ugettext
+        )
+        if correctness is not None:
+            # TODO: Find out how this is used elsewhere, if any
+            self.context['correct'] = correctness
 
-        _ = self.capa_system.i18n.ugettext
+        return oldcmap
+
+    @classmethod
+    def apply_score_msg(cls, cmap, answer_id, score_msg, queuekey, ugettext):
+        """
+        Applies the grader's reply `score_msg` to the entry of `answer_id` in the CorrectMap `cmap`, if
+        that entry is waiting for the reply to the submission queued with `queuekey`.
+
+        This needs nothing from the problem itself, so that the LMS can apply a reply to the stored
+        correct map without loading the problem.
+
+        Returns the correctness of the reply, or None if the reply is invalid, in which case the
+        entry's msg is set to an error message translated with `ugettext`.
+        """
+        _ = ugettext
+        (valid_score_msg, correct, points, msg) = cls._parse_score_msg(score_msg)
 
         dog_stats_api.increment(xqueue_interface.XQUEUE_METRIC_NAME, tags=[
             'action:update_score',
@@ -1702,33 +1722,30 @@ class CodeResponse(LoncapaResponse):
         if not valid_score_msg:
             # Translators: 'grader' refers to the edX automatic code grader.
             error_msg = _('Invalid grader reply. Please contact the course staff.')
-            oldcmap.set(self.answer_id, msg=error_msg)
-            return oldcmap
+            cmap.set(answer_id, msg=error_msg)
+            return None
 
         correctness = 'correct' if correct else 'incorrect'
 
-        # TODO: Find out how this is used elsewhere, if any
-        self.context['correct'] = correctness
-
-        # Replace 'oldcmap' with new grading results if queuekey matches.  If queuekey
+        # Replace 'cmap' with new grading results if queuekey matches.  If queuekey
         # does not match, we keep waiting for the score_msg whose key actually
         # matches
-        if oldcmap.is_right_queuekey(self.answer_id, queuekey):
+        if cmap.is_right_queuekey(answer_id, queuekey):
             # Sanity check on returned points
             if points < 0:
                 points = 0
             # Queuestate is consumed
-            oldcmap.set(
-                self.answer_id, npoints=points, correctness=correctness,
+            cmap.set(
+                answer_id, npoints=points, correctness=correctness,
                 msg=msg.replace('&nbsp;', '&#160;'), queuestate=None)
         else:
             log.debug(
                 'CodeResponse: queuekey %s does not match for answer_id=%s.',
                 queuekey,
-                self.answer_id
+                answer_id
             )
 
-        return oldcmap
+        return correctness
 
     def get_answers(self):
         anshtml = '<span class="code-answer"><pre><code>%s</code></pre></span>' % self.answer
@@ -1741,7 +1758,8 @@ class CodeResponse(LoncapaResponse):
         """
         return {self.answer_id: self.initial_display}
 
-    def _parse_score_msg(self, score_msg):
+    @staticmethod
+    def _parse_score_msg(score_msg):
         """
          Grader reply is a JSON-dump of the following dict
            { 'correct': True/False,
@@ -2,9 +2,47 @@
 Automatic execution of startup modules in Django apps.
 """
 
+from contextlib import contextmanager
 from importlib import import_module
+import logging
+import os
+import time
+
 from django.conf import settings
 
+log = logging.getLogger(__name__)
+
+# The (name, start time, seconds) of each step of startup timed by startup_step, in the order they
+# finished. Steps can be nested.
+STARTUP_TIMES = []
+
+
+@contextmanager
+def startup_step(name):
+    """
+    Context manager timing the step of startup called name, for the report of log_startup_report.
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        STARTUP_TIMES.append((name, start, time.time() - start))
+
+
+def log_startup_report():
+    """
+    Logs how long each step of startup timed so far took, slowest first.
+    """
+    if not STARTUP_TIMES:
+        return
+    started = min(start for __, start, __ in STARTUP_TIMES)
+    finished = max(start + seconds for __, start, seconds in STARTUP_TIMES)
+    lines = [u"Startup steps took {:.2f}s (pid {}):".format(finished - started, os.getpid())]
+    for name, __, seconds in sorted(STARTUP_TIMES, key=lambda step: step[2], reverse=True):
+        lines.append(u"  {:8.3f}s  {}".format(seconds, name))
+    log.info(u"\n".join(lines))
+
+
 def autostartup():
     """
     Execute app.startup:run() for all installed django apps
@@ -12,10 +50,12 @@ def autostartup():
     for app in settings.INSTALLED_APPS:
         # See if there's a startup module in each app.
         try:
-            mod = import_module(app + '.startup')
+            with startup_step(app + '.startup import'):
+                mod = import_module(app + '.startup')
         except ImportError:
             continue
 
         # If the module has a run method, run it.
         if hasattr(mod, 'run'):
-            mod.run()
+            with startup_step(app + '.startup'):
+                mod.run()
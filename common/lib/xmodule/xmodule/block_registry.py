@@ -0,0 +1,101 @@
+"""
+A process-wide registry of the installed XBlock classes, and of what they can do.
+
+Finding XBlock classes means iterating over the pkg_resources entry points of every installed
+distribution, which is slow, and used to happen on hot paths such as computing the inheritance
+tree of a course. The registry does it once per process, and again only after reload() is called,
+for instance once plugins have been installed or removed.
+"""
+import threading
+
+from xblock.core import XBlock
+from xblock.plugin import PluginMissingError
+
+_LOCK = threading.RLock()
+
+# The (block type, class) of every installed XBlock, once they have been found
+_BLOCK_CLASSES = []
+
+# The class of each (block type, select function) looked up so far
+_SELECTED_CLASSES = {}
+
+# The frozensets of block types found so far by _block_types_matching, by their keys
+_BLOCK_TYPES = {}
+
+
+def block_classes():
+    """
+    Returns the list of (block type, class) of every installed XBlock, as XBlock.load_classes()
+    yields them.
+    """
+    if not _BLOCK_CLASSES:
+        with _LOCK:
+            if not _BLOCK_CLASSES:
+                _BLOCK_CLASSES[:] = list(XBlock.load_classes())
+    return _BLOCK_CLASSES
+
+
+def load_class(block_type, default=None, select=None):
+    """
+    Returns the class of block_type, as XBlock.load_class(block_type, default, select) does.
+
+    Only the classes found for a block type are remembered, so a block type which isn't installed
+    is looked for again each time.
+    """
+    key = (block_type, select)
+    class_ = _SELECTED_CLASSES.get(key)
+    if class_ is None:
+        try:
+            class_ = XBlock.load_class(block_type, select=select)
+        except PluginMissingError:
+            if default is None:
+                raise
+            return default
+        _SELECTED_CLASSES[key] = class_
+    return class_
+
+
+def block_types_with_children():
+    """
+    Returns the frozenset of the block types whose classes have children.
+    """
+    return _block_types_matching('has_children', lambda class_: getattr(class_, 'has_children', False))
+
+
+def block_types_with_score():
+    """
+    Returns the frozenset of the block types whose classes are scored.
+    """
+    return _block_types_matching('has_score', lambda class_: getattr(class_, 'has_score', False))
+
+
+def block_types_tagged(tag):
+    """
+    Returns the frozenset of the block types whose classes are tagged with tag, like the ones
+    XBlock.load_tagged_classes(tag) yields.
+    """
+    return _block_types_matching(
+        ('tag', tag),
+        lambda class_: tag in class_._class_tags  # pylint: disable=protected-access
+    )
+
+
+def _block_types_matching(key, predicate):
+    """
+    Returns the frozenset of the block types whose classes match predicate, remembered by key.
+    """
+    block_types = _BLOCK_TYPES.get(key)
+    if block_types is None:
+        block_types = frozenset(block_type for block_type, class_ in block_classes() if predicate(class_))
+        _BLOCK_TYPES[key] = block_types
+    return block_types
+
+
+def reload():  # pylint: disable=redefined-builtin
+    """
+    Forgets every XBlock class found so far, so that they are found again when next needed.
+    """
+    with _LOCK:
+        del _BLOCK_CLASSES[:]
+        _SELECTED_CLASSES.clear()
+        _BLOCK_TYPES.clear()
@@ -7,7 +7,7 @@ from pkg_resources import resource_string
 
 from .capa_base import CapaMixin, CapaFields, ComplexEncoder
 from .progress import Progress
-from xmodule.x_module import XModule, module_attr
+from xmodule.x_module import XModule, module_attr, HANDLER_STATE_SELF
 from xmodule.raw_module import RawDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
 
@@ -22,6 +22,7 @@ class CapaModule(CapaMixin, XModule):
     CapaModule.__init__ takes the same arguments as xmodule.x_module:XModule.__init__
     """
     icon_class = 'problem'
+    default_handler_state = HANDLER_STATE_SELF
 
     js = {
         'coffee': [
@@ -192,6 +192,40 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_content_page_for_course(self, location, maxresults, sort, start=0, after=None, fields=None):
+        '''
+        Returns a list of up to maxresults of the static assets of a course, sorted by sort, a list of
+        one (field, direction) pair, starting either after the asset `after` or after skipping `start`
+        assets. If fields is given, only those fields of the assets are returned.
+        '''
+        raise NotImplementedError
+
+    def count_content_for_course(self, location):
+        '''
+        Returns the number of static assets of a course.
+        '''
+        raise NotImplementedError
+
+    def save_archive(self, name, archive_file):
+        '''
+        Saves the contents of the file archive_file as the archive called name, replacing any earlier
+        archive of that name. Archives (such as the tar.gz files of course imports and exports) are kept
+        apart from static assets, in the store every host shares.
+        '''
+        raise NotImplementedError
+
+    def get_archive(self, name):
+        '''
+        Returns a file object for reading the archive called name. Raises NotFoundError if there is none.
+        '''
+        raise NotImplementedError
+
+    def delete_archive(self, name):
+        '''
+        Deletes the archive called name, if there is one.
+        '''
+        raise NotImplementedError
+
     def generate_thumbnail(self, content, tempfile_path=None):
         thumbnail_content = None
         # use a naming convention to associate originals with the thumbnail
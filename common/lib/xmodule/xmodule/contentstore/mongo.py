@@ -11,8 +11,15 @@ import logging
 from .content import StaticContent, ContentStore, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from fs.osfs import OSFS
+from cStringIO import StringIO
+import calendar
 import os
 import json
+import tarfile
+import time
+
+# The fields the assets of a course are sorted by in the asset library
+ASSET_SORT_FIELDS = ('uploadDate', 'displayname')
 
 
 class MongoContentStore(ContentStore):
@@ -40,6 +47,24 @@ class MongoContentStore(ContentStore):
 
         self.fs_files = _db[bucket + ".files"]  # the underlying collection GridFS uses
 
+        # archives are kept in a bucket of their own, so they are never taken for assets
+        self.archives = gridfs.GridFS(_db, bucket + '.archives')
+        self.archive_files = _db[bucket + '.archives.files']
+
+        # Index the assets of each course in the orders the asset library pages through them, so that
+        # neither sorting nor paging (see get_content_page_for_course) has to scan a course's assets
+        for sort_field in ASSET_SORT_FIELDS:
+            self.fs_files.ensure_index(
+                [
+                    ('_id.org', pymongo.ASCENDING),
+                    ('_id.course', pymongo.ASCENDING),
+                    ('_id.category', pymongo.ASCENDING),
+                    (sort_field, pymongo.ASCENDING),
+                    ('_id.name', pymongo.ASCENDING),
+                ],
+                background=True,
+            )
+
     def save(self, content):
         content_id = content.get_id()
 
@@ -128,18 +153,56 @@ class MongoContentStore(ContentStore):
         directory as the other policy files.
         """
         policy = {}
-        assets, __ = self.get_all_content_for_course(course_location)
-
-        for asset in assets:
-            asset_location = Location(asset['_id'])
-            self.export(asset_location, output_directory)
-            for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize']:
-                    policy.setdefault(asset_location.name, {})[attr] = value
+        for asset in self.fs_files.find(location_to_query(self._course_filter(course_location))):
+            self.export(Location(asset['_id']), output_directory)
+            self._add_asset_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f)
 
+    def export_all_for_course_to_tar(self, course_location, tar_file, output_directory, assets_policy_file):
+        """
+        Like export_all_for_course, but adding the assets and the policy file to the open tarfile.TarFile
+        `tar_file`, streaming each asset from GridFS rather than reading it into memory.
+
+        :param course_location: the Location of type 'course'
+        :param tar_file: the tarfile.TarFile to add to
+        :param output_directory: the directory in the archive under which to put all the asset files
+        :param assets_policy_file: the name in the archive of the policy file
+        """
+        policy = {}
+        for asset in self.fs_files.find(location_to_query(self._course_filter(course_location))):
+            asset_location = Location(asset['_id'])
+            directory = output_directory
+            if asset.get('import_path') is not None:
+                directory = directory + '/' + os.path.dirname(asset['import_path'])
+
+            tar_info = tarfile.TarInfo(os.path.normpath(directory + '/' + asset['displayname']).encode('utf-8'))
+            tar_info.size = asset['length']
+            tar_info.mtime = calendar.timegm(asset['uploadDate'].utctimetuple())
+            handle = self.get_stream(asset_location)
+            try:
+                tar_file.addfile(tar_info, handle)
+            finally:
+                self.close_stream(handle)
+            self._add_asset_policy(policy, asset)
+
+        policy = json.dumps(policy)
+        tar_info = tarfile.TarInfo(assets_policy_file)
+        tar_info.size = len(policy)
+        tar_info.mtime = time.time()
+        tar_file.addfile(tar_info, StringIO(policy))
+
+    def _add_asset_policy(self, policy, asset):
+        """
+        Adds the policy exported for the given asset, all of its attributes other than the ones GridFS sets,
+        to the dict policy.
+        """
+        asset_location = Location(asset['_id'])
+        for attr, value in asset.iteritems():
+            if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize']:
+                policy.setdefault(asset_location.name, {})[attr] = value
+
     def get_all_content_thumbnails_for_course(self, location):
         return self._get_all_content_for_course(location, get_thumbnails=True)[0]
 
@@ -168,8 +231,7 @@ class MongoContentStore(ContentStore):
 
             ]
         '''
-        course_filter = Location(XASSET_LOCATION_TAG, category="asset" if not get_thumbnails else "thumbnail",
-                                 course=location.course, org=location.org)
+        course_filter = self._course_filter(location, get_thumbnails)
         # 'borrow' the function 'location_to_query' from the Mongo modulestore implementation
         if maxresults > 0:
             items = self.fs_files.find(
@@ -181,6 +243,117 @@ class MongoContentStore(ContentStore):
         count = items.count()
         return list(items), count
 
+    def get_content_page_for_course(self, location, maxresults, sort, start=0, after=None, fields=None):
+        """
+        Returns a list of up to maxresults of the static assets of a course, sorted by sort, a list of
+        one (field, direction) pair. Assets with the same value of the field are sorted by name.
+
+        The page starts either after the asset `after`, a dict with at least the sort field and the
+        name in the _id of an asset, or after skipping `start` assets. Starting after an asset uses
+        the course's index on the sort field rather than skipping through it, so a page is as quick
+        to get however deep it is.
+
+        Assets without the sort field come before all the others when sorting ascending, and after
+        them when descending.
+
+        If fields is given, only those fields (and _id) of the assets are returned.
+        """
+        sort_field, direction = sort[0]
+        sort = [(sort_field, direction), ('_id.name', direction)]
+        query = location_to_query(self._course_filter(location))
+        if after is None:
+            return list(self.fs_files.find(query, fields=fields, skip=start, limit=maxresults, sort=sort))
+
+        # assets with no value of the sort field (such as ones saved before their displayname was
+        # recorded) sort before all the others, so the page may run from them on to the rest
+        items = []
+        for condition in self._conditions_after(sort_field, direction, after):
+            if len(items) >= maxresults:
+                break
+            condition.update(query)
+            items.extend(self.fs_files.find(
+                condition, fields=fields, limit=maxresults - len(items), sort=sort
+            ))
+        return items
+
+    @staticmethod
+    def _conditions_after(sort_field, direction, after):
+        """
+        Returns the queries, in sort order, of the assets which come after the asset `after` when
+        sorted by sort_field in direction and then by name.
+
+        Each query puts a range on the sort field alone, which is what lets the index seek to the page.
+        """
+        value, name = after[sort_field], after['_id']['name']
+        if direction == pymongo.ASCENDING:
+            operator, bound = '$gt', '$gte'
+        else:
+            operator, bound = '$lt', '$lte'
+
+        if value is None:
+            conditions = [{sort_field: None, '_id.name': {operator: name}}]
+            if direction == pymongo.ASCENDING:
+                conditions.append({sort_field: {'$ne': None}})
+            return conditions
+
+        conditions = [{
+            sort_field: {bound: value},
+            '$or': [
+                {sort_field: {operator: value}},
+                {sort_field: value, '_id.name': {operator: name}},
+            ],
+        }]
+        if direction == pymongo.DESCENDING:
+            conditions.append({sort_field: None})
+        return conditions
+
+    def set_missing_displaynames(self, location=None):
+        """
+        Sets the displayname of the assets which have none (they were saved before it was recorded)
+        to their name, and returns how many there were. If location is given, only the assets of its
+        course are changed.
+        """
+        query = {'_id.category': 'asset', 'displayname': None}
+        if location is not None:
+            query.update(location_to_query(self._course_filter(location)))
+        count = 0
+        for asset in self.fs_files.find(query, fields=['_id']):
+            self.fs_files.update({'_id': asset['_id']}, {'$set': {'displayname': asset['_id']['name']}})
+            count += 1
+        return count
+
+    def save_archive(self, name, archive_file):
+        archive_id = self.archives.put(archive_file, filename=name)
+        # readers get the last version saved, so only ever remove older ones
+        upload_date = self.archive_files.find_one({'_id': archive_id})['uploadDate']
+        older = {'filename': name, '_id': {'$ne': archive_id}, 'uploadDate': {'$lte': upload_date}}
+        for archive in self.archive_files.find(older, fields=['_id']):
+            self.archives.delete(archive['_id'])
+
+    def get_archive(self, name):
+        try:
+            return self.archives.get_last_version(name)
+        except NoFile:
+            raise NotFoundError()
+
+    def delete_archive(self, name):
+        for archive in self.archive_files.find({'filename': name}, fields=['_id']):
+            self.archives.delete(archive['_id'])
+
+    def count_content_for_course(self, location):
+        """
+        Returns the number of static assets of a course.
+        """
+        return self.fs_files.find(location_to_query(self._course_filter(location))).count()
+
+    @staticmethod
+    def _course_filter(location, get_thumbnails=False):
+        """
+        Returns the Location matching the assets (or thumbnails) of the course of location.
+        """
+        return Location(XASSET_LOCATION_TAG, category="asset" if not get_thumbnails else "thumbnail",
+                        course=location.course, org=location.org)
+
     def set_attr(self, location, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -1,5 +1,7 @@
 import copy
 from fs.errors import ResourceNotFoundError
+import hashlib
+import json
 import logging
 import os
 import sys
@@ -58,6 +60,14 @@ class HtmlModule(HtmlFields, XModule):
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
         return self.data
 
+    def student_view_cache_version(self):
+        """
+        The html is the same for every user, unless it includes their id.
+        """
+        if "%%USER_ID%%" in self.data:
+            return None
+        return hashlib.md5(json.dumps([self.data, self.display_name_with_default])).hexdigest()
+
 
 class HtmlDescriptor(HtmlFields, XmlDescriptor, EditingDescriptor):
     """
@@ -13,9 +13,9 @@ from abc import ABCMeta, abstractmethod
 from xblock.plugin import default_select
 
 from .exceptions import InvalidLocationError, InsufficientSpecificationError
+from xmodule import block_registry
 from xmodule.errortracker import make_error_tracker
 from xblock.runtime import Mixologist
-from xblock.core import XBlock
 
 log = logging.getLogger('edx.modulestore')
 
@@ -550,6 +550,15 @@ class ModuleStoreReadBase(ModuleStoreRead):
         """
         raise NotImplementedError
 
+    def update_items(self, xblocks, user_id=None, allow_not_found=False):
+        """
+        Update the persisted repr of each of the given xblocks, as update_item does.
+
+        Stores which can write many xblocks more efficiently than one at a time override this.
+        """
+        for xblock in xblocks:
+            self.update_item(xblock, user_id, allow_not_found=allow_not_found)
+
     def delete_item(self, location, user_id=None, delete_all_versions=False, delete_children=False, force=False):
         """
         Delete an item from persistence. Pass the user's unique id which the persistent store
@@ -585,7 +594,7 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
         """
         if fields is None:
             return {}
-        cls = self.mixologist.mix(XBlock.load_class(category, select=prefer_xmodules))
+        cls = self.mixologist.mix(block_registry.load_class(category, select=prefer_xmodules))
         result = collections.defaultdict(dict)
         for field_name, value in fields.iteritems():
             field = getattr(cls, field_name)
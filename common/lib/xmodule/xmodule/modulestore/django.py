@@ -28,6 +28,9 @@ _MODULESTORES = {}
 
 FUNCTION_KEYS = ['render_template']
 
+# Sent by every modulestore created here when it writes to an item
+modulestore_update_signal = Signal(providing_args=['modulestore', 'course_id', 'location'])
+
 
 def load_function(path):
     """
@@ -66,7 +69,7 @@ def create_modulestore_instance(engine, doc_store_config, options, i18n_service=
     return class_(
         metadata_inheritance_cache_subsystem=metadata_inheritance_cache,
         request_cache=request_cache,
-        modulestore_update_signal=Signal(providing_args=['modulestore', 'course_id', 'location']),
+        modulestore_update_signal=modulestore_update_signal,
         xblock_mixins=getattr(settings, 'XBLOCK_MIXINS', ()),
         xblock_select=getattr(settings, 'XBLOCK_SELECT_FUNCTION', None),
         doc_store_config=doc_store_config,
@@ -145,6 +148,25 @@ def loc_mapper():
     return _loc_singleton
 
 
+def close_existing_modulestore_connections():
+    """
+    Close the database connections of the modulestores, and of the loc mapper, created so far.
+    pymongo reconnects them when they are next used.
+
+    A server which creates the modulestores before forking its workers calls this first, so that
+    each worker opens connections of its own rather than sharing the sockets of its parent.
+    """
+    for store in _MODULESTORES.itervalues():
+        if hasattr(store, 'close_all_connections'):
+            store.close_all_connections()
+        elif hasattr(store, 'database'):
+            store.database.connection.close()
+        elif hasattr(store, 'db'):
+            store.db.connection.close()
+    if _loc_singleton is not None:
+        _loc_singleton.db.connection.close()
+
+
 def clear_existing_modulestores():
     """
     Clear the existing modulestore instances, causing
@@ -11,6 +11,10 @@ from xmodule.modulestore.locator import BlockUsageLocator, CourseLocator
 from xmodule.modulestore import Location
 import urllib
 
+# How long, in seconds, the absence of a mapping is cached for. It's kept short because the mapping
+# can be added by another process, which won't know to drop this process' cache entries.
+MISSING_CACHE_TIMEOUT = 60
+
 
 class LocMapperStore(object):
     '''
@@ -117,6 +121,14 @@ class LocMapperStore(object):
             location_update = {'lower_id': location_id_lower, 'lower_course_id': package_id.lower()}
             self.location_map.update({'_id': location_id}, {'$set': location_update})
 
+        if block_map:
+            # forget that any of the newly mapped blocks were missing
+            entry = {
+                '_id': location_id, 'course_id': package_id, 'draft_branch': draft_branch,
+                'prod_branch': prod_branch, 'block_map': block_map,
+            }
+            cache_keys = self._block_map_cache_entries(self._generate_location_course_id(location_id), entry)
+            self.cache.delete_many([self._missing_cache_key(key) for key in cache_keys])
         return package_id
 
     def translate_location(self, old_style_course_id, location, published=True,
@@ -152,55 +164,31 @@ class LocMapperStore(object):
         if cached_value:
             return cached_value
 
-        maps = self.location_map.find(location_id)
-        maps = list(maps)
-        if len(maps) == 0:
-            if add_entry_if_missing:
-                # create a new map
-                course_location = location.replace(category='course', name=location_id['_id']['name'])
-                self.create_map_entry(course_location)
-                entry = self.location_map.find_one(location_id)
-            else:
-                raise ItemNotFoundError(location)
-        elif len(maps) == 1:
-            entry = maps[0]
-        else:
-            # find entry w/o name, if any; otherwise, pick arbitrary
-            entry = maps[0]
-            for item in maps:
-                if 'name' not in item['_id']:
-                    entry = item
-                    break
+        cache_key = self._location_cache_key(old_style_course_id, location)
+        if not add_entry_if_missing and self.cache.get(self._missing_cache_key(cache_key)):
+            raise ItemNotFoundError(location)
 
-        block_id = entry['block_map'].get(self.encode_key_for_mongo(location.name))
-        if block_id is None:
-            if add_entry_if_missing:
-                block_id = self._add_to_block_map(
-                    location, location_id, entry['block_map'], passed_block_id
-                )
-            else:
-                raise ItemNotFoundError(location)
-        elif isinstance(block_id, dict):
-            # jump_to_id uses a None category.
-            if location.category is None:
-                if len(block_id) == 1:
-                    # unique match (most common case)
-                    block_id = block_id.values()[0]
-                else:
-                    raise InvalidLocationError()
-            elif location.category in block_id:
-                block_id = block_id[location.category]
-            elif add_entry_if_missing:
-                block_id = self._add_to_block_map(location, location_id, entry['block_map'])
-            else:
-                raise ItemNotFoundError(location)
-        else:
-            raise InvalidLocationError()
+        entry = self._find_map_entry(location_id, location, add_entry_if_missing)
+        if entry is None:
+            self.cache.set(self._missing_cache_key(cache_key), True, MISSING_CACHE_TIMEOUT)
+            raise ItemNotFoundError(location)
 
-        published_usage = BlockUsageLocator(
-            package_id=entry['course_id'], branch=entry['prod_branch'], block_id=block_id)
-        draft_usage = BlockUsageLocator(
-            package_id=entry['course_id'], branch=entry['draft_branch'], block_id=block_id)
+        block_id = self._lookup_block_id(location, entry['block_map'])
+        is_new = block_id is None
+        if is_new and add_entry_if_missing:
+            block_id = self._add_to_block_map(
+                location, location_id, entry['block_map'], passed_block_id
+            )
+        elif is_new:
+            self.cache.set(self._missing_cache_key(cache_key), True, MISSING_CACHE_TIMEOUT)
+            raise ItemNotFoundError(location)
+
+        published_usage, draft_usage = self._usages_for_block_id(entry, block_id)
+        if is_new:
+            # forget that it was missing
+            self.cache.delete_many([
+                self._missing_cache_key(key) for key in (cache_key, unicode(published_usage), unicode(draft_usage))
+            ])
         if published:
             result = published_usage
         else:
@@ -209,6 +197,79 @@ class LocMapperStore(object):
         self._cache_location_map_entry(old_style_course_id, location, published_usage, draft_usage)
         return result
 
+    def translate_locations(self, old_style_course_id, locations, published=True, add_entry_if_missing=True):
+        """
+        Translate the given module locations, which must all be in the same course, to Locators as
+        translate_location does, but reading the course's mapping entry at most once for all of them. As the
+        whole entry is read anyway, the translations of all the blocks in it are cached at the same time.
+
+        Returns the list of the Locators in the same order as locations. When add_entry_if_missing is False,
+        the locations without a mapping are None in that list rather than raising ItemNotFoundError.
+
+        :param old_style_course_id: the course_id used in old mongo not the new one (optional, will use
+        the first location)
+        :param locations: a list of Locations of modules in the course
+        :param published: a boolean to indicate whether the caller wants the draft or published branch.
+        :param add_entry_if_missing: a boolean as to whether to create map entries for the locations which
+        aren't in the map.
+        """
+        if not locations:
+            return []
+        location_id = self._interpret_location_course_id(old_style_course_id, locations[0])
+        if old_style_course_id is None:
+            old_style_course_id = self._generate_location_course_id(location_id)
+
+        cache_keys = [self._location_cache_key(old_style_course_id, location) for location in locations]
+        lookup_keys = list(cache_keys)
+        if not add_entry_if_missing:
+            lookup_keys.extend(self._missing_cache_key(cache_key) for cache_key in cache_keys)
+        usages = self.cache.get_many(lookup_keys)
+
+        unresolved = [
+            (cache_key, location) for cache_key, location in zip(cache_keys, locations)
+            if cache_key not in usages and self._missing_cache_key(cache_key) not in usages
+        ]
+        if unresolved:
+            entry = self._find_map_entry(location_id, locations[0], add_entry_if_missing)
+            if entry is None:
+                missing = [cache_key for cache_key, __ in unresolved]
+            else:
+                setmany = self._block_map_cache_entries(old_style_course_id, entry)
+                missing = []
+                # the cache keys of the blocks added to the map
+                added_keys = set()
+                for cache_key, location in unresolved:
+                    block_id = self._lookup_block_id(location, entry['block_map'])
+                    is_new = block_id is None
+                    if is_new and not add_entry_if_missing:
+                        missing.append(cache_key)
+                        continue
+                    elif is_new:
+                        block_id = self._assign_block_id(location, entry['block_map'])
+                    published_usage, draft_usage = self._usages_for_block_id(entry, block_id)
+                    entries = self._location_map_cache_entries(
+                        old_style_course_id, location, published_usage, draft_usage
+                    )
+                    if is_new:
+                        added_keys.update(entries)
+                    setmany.update(entries)
+                    usages[cache_key] = (published_usage, draft_usage)
+
+                if added_keys:
+                    # one write for all the blocks added to the map
+                    self.location_map.update(location_id, {'$set': {'block_map': entry['block_map']}})
+                    self.cache.delete_many([self._missing_cache_key(key) for key in added_keys])
+                self.cache.set_many(setmany)
+
+            if missing:
+                self.cache.set_many(
+                    dict((self._missing_cache_key(cache_key), True) for cache_key in missing),
+                    MISSING_CACHE_TIMEOUT
+                )
+
+        index = 0 if published else 1
+        return [usages[cache_key][index] if cache_key in usages else None for cache_key in cache_keys]
+
     def translate_locator_to_location(self, locator, get_course=False, lower_only=False):
         """
         Returns an old style Location for the given Locator if there's an appropriate entry in the
@@ -233,6 +294,9 @@ class LocMapperStore(object):
             cached_value = self._get_location_from_cache(locator)
         if cached_value:
             return cached_value
+        missing_key = self._missing_cache_key(unicode(locator))
+        if not get_course and self.cache.get(missing_key):
+            return None
 
         # This does not require that the course exist in any modulestore
         # only that it has a mapping entry.
@@ -284,8 +348,62 @@ class LocMapperStore(object):
                         result = location
             if result is not None:
                 return result
+        if not get_course:
+            self.cache.set(missing_key, True, MISSING_CACHE_TIMEOUT)
         return None
 
+    def translate_locators_to_locations(self, locators):
+        """
+        Returns the old style Locations of the given BlockUsageLocators as translate_locator_to_location
+        does, but reading the mapping entries of each course at most once for all of them, and caching the
+        translations of all the blocks in those entries.
+
+        Returns the list of the Locations in the same order as locators, with None for the locators which
+        aren't in the map.
+
+        :param locators: a list of BlockUsageLocators
+        """
+        cache_keys = [unicode(locator) for locator in locators]
+        locations = self.cache.get_many(
+            cache_keys + [self._missing_cache_key(cache_key) for cache_key in cache_keys]
+        )
+        unresolved = [
+            locator for cache_key, locator in zip(cache_keys, locators)
+            if cache_key not in locations and self._missing_cache_key(cache_key) not in locations
+        ]
+        setmany = {}
+        missing = []
+        for package_id in set(locator.package_id for locator in unresolved):
+            # as in translate_locator_to_location, the first entry which maps a block_id wins
+            block_locations = {}
+            for candidate in self.location_map.find({'course_id': package_id}):
+                candidate_entries = self._block_map_cache_entries(
+                    self._generate_location_course_id(candidate['_id']), candidate
+                )
+                setmany.update(candidate_entries)
+                for old_name, cat_to_usage in candidate['block_map'].iteritems():
+                    if not isinstance(cat_to_usage, dict):
+                        continue
+                    for category, block_id in cat_to_usage.iteritems():
+                        block_locations.setdefault(block_id, Location(
+                            'i4x', candidate['_id']['org'], candidate['_id']['course'],
+                            category, self.decode_key_from_mongo(old_name), None
+                        ))
+
+            for locator in unresolved:
+                if locator.package_id != package_id:
+                    continue
+                if locator.block_id in block_locations:
+                    locations[unicode(locator)] = block_locations[locator.block_id]
+                else:
+                    missing.append(self._missing_cache_key(unicode(locator)))
+
+        if setmany:
+            self.cache.set_many(setmany)
+        if missing:
+            self.cache.set_many(dict((key, True) for key in missing), MISSING_CACHE_TIMEOUT)
+        return [locations.get(cache_key) for cache_key in cache_keys]
+
     def translate_location_to_course_locator(self, old_style_course_id, location, published=True, lower_only=False):
         """
         Used when you only need the CourseLocator and not a full BlockUsageLocator. Probably only
@@ -320,8 +438,60 @@ class LocMapperStore(object):
         else:
             return draft_course_locator
 
+    def _find_map_entry(self, location_id, location, add_entry_if_missing):
+        """
+        Returns the map entry matching location_id, preferring the entry w/o a name if more than one matches.
+        If there's none, creates one for location's course if add_entry_if_missing, otherwise returns None.
+        """
+        maps = list(self.location_map.find(location_id))
+        if len(maps) == 0:
+            if not add_entry_if_missing:
+                return None
+            # create a new map
+            course_location = location.replace(category='course', name=location_id['_id']['name'])
+            self.create_map_entry(course_location)
+            return self.location_map.find_one(location_id)
+        # find entry w/o name, if any; otherwise, pick arbitrary
+        for item in maps:
+            if 'name' not in item['_id']:
+                return item
+        return maps[0]
+
+    def _lookup_block_id(self, location, block_map):
+        """
+        Returns the block_id which location maps to in block_map, or None if it isn't in there.
+        """
+        block_id = block_map.get(self.encode_key_for_mongo(location.name))
+        if block_id is None:
+            return None
+        elif not isinstance(block_id, dict):
+            raise InvalidLocationError()
+        # jump_to_id uses a None category.
+        elif location.category is None:
+            if len(block_id) == 1:
+                # unique match (most common case)
+                return block_id.values()[0]
+            raise InvalidLocationError()
+        return block_id.get(location.category)
+
+    def _usages_for_block_id(self, entry, block_id):
+        """
+        Returns the published and draft BlockUsageLocators of block_id in the course of the map entry.
+        """
+        published_usage = BlockUsageLocator(
+            package_id=entry['course_id'], branch=entry['prod_branch'], block_id=block_id)
+        draft_usage = BlockUsageLocator(
+            package_id=entry['course_id'], branch=entry['draft_branch'], block_id=block_id)
+        return published_usage, draft_usage
+
     def _add_to_block_map(self, location, location_id, block_map, block_id=None):
         '''add the given location to the block_map and persist it'''
+        block_id = self._assign_block_id(location, block_map, block_id)
+        self.location_map.update(location_id, {'$set': {'block_map': block_map}})
+        return block_id
+
+    def _assign_block_id(self, location, block_map, block_id=None):
+        '''add the given location to the block_map, w/o persisting it'''
         if block_id is None:
             if self._block_id_is_guid(location.name):
                 # This makes the ids more meaningful with a small probability of name collision.
@@ -335,7 +505,6 @@ class LocMapperStore(object):
                 block_id = self._verify_uniqueness(location.name, block_map)
         encoded_location_name = self.encode_key_for_mongo(location.name)
         block_map.setdefault(encoded_location_name, {})[location.category] = block_id
-        self.location_map.update(location_id, {'$set': {'block_map': block_map}})
         return block_id
 
     def _interpret_location_course_id(self, course_id, location, lower_only=False):
@@ -438,7 +607,7 @@ class LocMapperStore(object):
         """
         See if the location x published pair is in the cache. If so, return the mapped locator.
         """
-        entry = self.cache.get(u'{}+{}'.format(old_course_id, location.url()))
+        entry = self.cache.get(self._location_cache_key(old_course_id, location))
         if entry is not None:
             if published:
                 return entry[0]
@@ -491,15 +660,57 @@ class LocMapperStore(object):
         Also caches the inverse. If the location is category=='course', it caches it for
         the get_course query
         """
+        self.cache.set_many(
+            self._location_map_cache_entries(old_course_id, location, published_usage, draft_usage)
+        )
+
+    def _location_map_cache_entries(self, old_course_id, location, published_usage, draft_usage):
+        """
+        Returns the cache entries which _cache_location_map_entry sets
+        """
         setmany = {}
         if location.category == 'course':
             setmany[u'courseId+{}'.format(published_usage.package_id)] = location
             setmany[u'courseIdLower+{}'.format(published_usage.package_id.lower())] = location
         setmany[unicode(published_usage)] = location
         setmany[unicode(draft_usage)] = location
-        setmany[u'{}+{}'.format(old_course_id, location.url())] = (published_usage, draft_usage)
+        setmany[self._location_cache_key(old_course_id, location)] = (published_usage, draft_usage)
         setmany[old_course_id] = (published_usage, draft_usage)
-        self.cache.set_many(setmany)
+        return setmany
+
+    def _block_map_cache_entries(self, old_course_id, entry):
+        """
+        Returns the cache entries for all the blocks in the block_map of the map entry
+        """
+        setmany = {}
+        for old_name, cat_to_usage in entry['block_map'].iteritems():
+            if not isinstance(cat_to_usage, dict):
+                continue
+            for category, block_id in cat_to_usage.iteritems():
+                # Always use revision=None, as translate_locator_to_location does
+                location = Location(
+                    'i4x', entry['_id']['org'], entry['_id']['course'],
+                    category, self.decode_key_from_mongo(old_name), None
+                )
+                published_usage, draft_usage = self._usages_for_block_id(entry, block_id)
+                setmany.update(
+                    self._location_map_cache_entries(old_course_id, location, published_usage, draft_usage)
+                )
+        return setmany
+
+    @staticmethod
+    def _location_cache_key(old_course_id, location):
+        """
+        The cache key of the locators of location in the course old_course_id
+        """
+        return u'{}+{}'.format(old_course_id, location.url())
+
+    @staticmethod
+    def _missing_cache_key(cache_key):
+        """
+        The cache key recording that there is no mapping for cache_key
+        """
+        return u'missing+{}'.format(cache_key)
 
     def delete_course_mapping(self, course_location):
         """
@@ -528,6 +739,6 @@ class LocMapperStore(object):
 
         delete_keys.append(unicode(published_usage))
         delete_keys.append(unicode(draft_usage))
-        delete_keys.append(u'{}+{}'.format(old_course_id, location.url()))
+        delete_keys.append(self._location_cache_key(old_course_id, location))
         delete_keys.append(old_course_id)
         self.cache.delete_many(delete_keys)
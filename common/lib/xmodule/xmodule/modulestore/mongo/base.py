@@ -16,6 +16,7 @@ import pymongo
 import sys
 import logging
 import copy
+from collections import defaultdict, OrderedDict
 
 from bson.son import SON
 from fs.osfs import OSFS
@@ -23,6 +24,7 @@ from itertools import repeat
 from path import path
 
 from importlib import import_module
+from xmodule import block_registry
 from xmodule.errortracker import null_error_tracker, exc_info_to_str
 from xmodule.mako_module import MakoDescriptorSystem
 from xmodule.error_module import ErrorDescriptor
@@ -35,10 +37,12 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import own_metadata, InheritanceMixin, inherit_metadata, InheritanceKeyValueStore
 from xmodule.modulestore.xml import LocationReader
 from xmodule.tabs import StaticTab, CourseTabList
-from xblock.core import XBlock
 
 log = logging.getLogger(__name__)
 
+# Number of documents update_items writes to mongo at a time
+BULK_WRITE_BATCH_SIZE = 500
+
 
 def get_course_id_no_run(location):
     '''
@@ -120,7 +124,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
     TODO (cdodge) when the 'split module store' work has been completed we can remove all
     references to metadata_inheritance_tree
     """
-    def __init__(self, modulestore, module_data, default_class, cached_metadata, **kwargs):
+    def __init__(self, modulestore, module_data, default_class, cached_metadata, resources_root=None, **kwargs):
         """
         modulestore: the module store that can be used to retrieve additional modules
 
@@ -132,11 +136,15 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
 
         resources_fs: a filesystem, as per MakoDescriptorSystem
 
+        resources_root: if resources_fs is None, the directory in which the resources_fs
+            is created, the first time it is used
+
         error_tracker: a function that logs errors for later display to users
 
         render_template: a function for rendering templates, as per
             MakoDescriptorSystem
         """
+        self.resources_root = resources_root
         super(CachingDescriptorSystem, self).__init__(
             id_reader=LocationReader(),
             field_data=None,
@@ -152,6 +160,21 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
         self.course_id = None
         self.cached_metadata = cached_metadata
 
+    @property
+    def resources_fs(self):
+        """
+        The filesystem of the resources of the modules, created on first use if it
+        is in resources_root.
+        """
+        if self._resources_fs is None and self.resources_root is not None:
+            self.resources_root.makedirs_p()  # create directory if it doesn't exist
+            self._resources_fs = OSFS(self.resources_root)
+        return self._resources_fs
+
+    @resources_fs.setter
+    def resources_fs(self, value):  # pylint: disable=missing-docstring
+        self._resources_fs = value
+
     def load_item(self, location):
         """
         Return an XModule instance for the specified location
@@ -177,10 +200,13 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
                         metadata[new_name] = metadata[old_name]
                         del metadata[old_name]
 
+                # module_data is shared by every module loaded from the course, so each module
+                # gets its own copy of the fields to change
+                data = definition.get('data', {})
                 kvs = MongoKeyValueStore(
-                    definition.get('data', {}),
-                    definition.get('children', []),
-                    metadata,
+                    data.copy() if isinstance(data, dict) else data,
+                    list(definition.get('children', [])),
+                    metadata.copy(),
                 )
 
                 field_data = KvsFieldData(kvs)
@@ -317,10 +343,9 @@ class MongoModuleStore(ModuleStoreWriteBase):
         # get all collections in the course, this query should not return any leaf nodes
         # note this is a bit ugly as when we add new categories of containers, we have to add it here
 
-        block_types_with_children = set(name for name, class_ in XBlock.load_classes() if getattr(class_, 'has_children', False))
         query = {'_id.org': location.org,
                  '_id.course': location.course,
-                 '_id.category': {'$in': list(block_types_with_children)}
+                 '_id.category': {'$in': list(block_registry.block_types_with_children())}
                  }
         # we just want the Location, children, and inheritable metadata
         record_filter = {'_id': 1, 'definition.children': 1}
@@ -423,6 +448,7 @@ class MongoModuleStore(ModuleStoreWriteBase):
         for location
         """
         pseudo_course_id = '/'.join([location.org, location.course])
+        self._discard_descriptor_systems(location)
         if pseudo_course_id not in self.ignore_write_events_on_courses:
             self.get_cached_metadata_inheritance_tree(location, force_refresh=True)
 
@@ -477,53 +503,97 @@ class MongoModuleStore(ModuleStoreWriteBase):
 
         return data
 
-    def _load_item(self, item, data_cache, apply_cached_metadata=True):
+    def _descriptor_systems(self):
         """
-        Load an XModuleDescriptor from item, using the children stored in data_cache
+        Returns the dict of the descriptor systems shared by the items loaded during the
+        current request, keyed by (modulestore, metadata_cache_key, apply_cached_metadata).
+        Outside of a request (or celery task), such as in management commands, nothing would
+        ever clear them, so then only the items loaded together share them.
         """
-        location = Location(item['location'])
-        data_dir = getattr(item, 'data_dir', location.course)
-        root = self.fs_root / data_dir
-
-        root.makedirs_p()  # create directory if it doesn't exist
+        if not self._request_cache_active():
+            return {}
+        return self.request_cache.data.setdefault('mongo_descriptor_systems', {})
 
-        resource_fs = OSFS(root)
+    def _request_cache_active(self):
+        """
+        Returns whether the request cache is cleared at the end of the current request or celery task.
+        """
+        return self.request_cache is not None and getattr(self.request_cache, 'active', False)
 
-        cached_metadata = {}
-        if apply_cached_metadata:
-            cached_metadata = self.get_cached_metadata_inheritance_tree(location)
+    def _discard_descriptor_systems(self, location):
+        """
+        Stops the items loaded from now on, by any modulestore, from sharing the descriptor
+        systems of the course of location, as they may hold what has just been written to it.
+        """
+        if not self._request_cache_active():
+            return
+        descriptor_systems = self._descriptor_systems()
+        course_key = metadata_cache_key(location)
+        for key in descriptor_systems.keys():
+            if key[1] == course_key:
+                del descriptor_systems[key]
+
+    def _get_descriptor_system(self, location, apply_cached_metadata, descriptor_systems):
+        """
+        Returns the descriptor system in descriptor_systems for loading the items of the
+        course of location, creating it if needed.
+        """
+        key = (self, metadata_cache_key(location), apply_cached_metadata)
+        system = descriptor_systems.get(key)
+        if system is None:
+            cached_metadata = {}
+            if apply_cached_metadata:
+                cached_metadata = self.get_cached_metadata_inheritance_tree(location)
 
-        services = {}
-        if self.i18n_service:
-            services["i18n"] = self.i18n_service
+            services = {}
+            if self.i18n_service:
+                services["i18n"] = self.i18n_service
 
-        # TODO (cdodge): When the 'split module store' work has been completed, we should remove
-        # the 'metadata_inheritance_tree' parameter
-        system = CachingDescriptorSystem(
-            modulestore=self,
-            module_data=data_cache,
-            default_class=self.default_class,
-            resources_fs=resource_fs,
-            error_tracker=self.error_tracker,
-            render_template=self.render_template,
-            cached_metadata=cached_metadata,
-            mixins=self.xblock_mixins,
-            select=self.xblock_select,
-            services=services,
-        )
-        return system.load_item(location)
+            # TODO (cdodge): When the 'split module store' work has been completed, we should remove
+            # the 'metadata_inheritance_tree' parameter
+            system = CachingDescriptorSystem(
+                modulestore=self,
+                module_data={},
+                default_class=self.default_class,
+                resources_fs=None,
+                resources_root=self.fs_root / location.course,
+                error_tracker=self.error_tracker,
+                render_template=self.render_template,
+                cached_metadata=cached_metadata,
+                mixins=self.xblock_mixins,
+                select=self.xblock_select,
+                services=services,
+            )
+            descriptor_systems[key] = system
+        return system
 
     def _load_items(self, items, depth=0):
         """
         Load a list of xmodules from the data in items, with children cached up
-        to specified depth
+        to specified depth.
+
+        All the items of a course loaded during a request share one descriptor system,
+        whose module_data accumulates the data of the items loaded so far.
         """
         data_cache = self._cache_children(items, depth)
-
-        # if we are loading a course object, if we're not prefetching children (depth != 0) then don't
-        # bother with the metadata inheritance
-        return [self._load_item(item, data_cache,
-                apply_cached_metadata=(item['location']['category'] != 'course' or depth != 0)) for item in items]
+        course_data_caches = defaultdict(dict)
+        for location, data in data_cache.iteritems():
+            course_data_caches[metadata_cache_key(location)][location] = data
+
+        descriptor_systems = self._descriptor_systems()
+        modules = []
+        updated_systems = set()
+        for item in items:
+            location = Location(item['location'])
+            # if we are loading a course object, if we're not prefetching children (depth != 0) then don't
+            # bother with the metadata inheritance
+            apply_cached_metadata = location.category != 'course' or depth != 0
+            system = self._get_descriptor_system(location, apply_cached_metadata, descriptor_systems)
+            if system not in updated_systems:
+                system.module_data.update(course_data_caches[metadata_cache_key(location)])
+                updated_systems.add(system)
+            modules.append(system.load_item(location))
+        return modules
 
     def get_courses(self):
         '''
@@ -782,26 +852,10 @@ class MongoModuleStore(ModuleStoreWriteBase):
         data: A nested dictionary of problem data
         """
         try:
-            definition_data = xblock.get_explicitly_set_fields_by_scope()
-            payload = {
-                'definition.data': definition_data,
-                'metadata': own_metadata(xblock),
-            }
-            if xblock.has_children:
-                # convert all to urls
-                xblock.children = [child.url() if isinstance(child, Location) else child
-                                   for child in xblock.children]
-                payload.update({'definition.children': xblock.children})
-            self._update_single_item(xblock.location, payload)
+            self._update_single_item(xblock.location, self._xblock_payload(xblock))
             # for static tabs, their containing course also records their display name
             if xblock.category == 'static_tab':
-                course = self._get_course_for_item(xblock.location)
-                # find the course's reference to this tab and update the name.
-                static_tab = CourseTabList.get_tab_by_slug(course.tabs, xblock.location.name)
-                # only update if changed
-                if static_tab and static_tab['name'] != xblock.display_name:
-                    static_tab['name'] = xblock.display_name
-                    self.update_item(course, user)
+                self._update_static_tab_names([xblock], user)
 
             # recompute (and update) the metadata inheritance tree which is cached
             # was conditional on children or metadata having changed before dhm made one update to rule them all
@@ -812,6 +866,120 @@ class MongoModuleStore(ModuleStoreWriteBase):
             if not allow_not_found:
                 raise
 
+    def update_items(self, xblocks, user=None, allow_not_found=False):
+        """
+        Update the persisted version of each of the given xblocks, as update_item does, but
+        inserting the new ones BULK_WRITE_BATCH_SIZE at a time, and only recomputing the metadata
+        inheritance tree and firing the update signal once per course at the end.
+
+        Each xblock's document is replaced as a whole, so unlike update_item, this will
+        create the xblocks which have not been persisted before whatever `allow_not_found` is.
+        """
+        # pseudo course ids, mapped to a location in the course, of the courses written to
+        courses = {}
+        static_tabs = []
+        batch = OrderedDict()
+
+        for xblock in xblocks:
+            location = Location(xblock.location)
+            payload = self._xblock_payload(xblock)
+            document = {
+                'definition': {'data': payload['definition.data']},
+                'metadata': payload['metadata'],
+            }
+            if 'definition.children' in payload:
+                document['definition']['children'] = payload['definition.children']
+            batch[location] = document
+            # signal with the course's own, or about, items if they are written, as listeners
+            # (like the course summaries) only care about those
+            if location.category in ('course', 'about'):
+                courses[get_course_id_no_run(location)] = location
+            else:
+                courses.setdefault(get_course_id_no_run(location), location)
+            if xblock.category == 'static_tab':
+                static_tabs.append(xblock)
+            if len(batch) >= BULK_WRITE_BATCH_SIZE:
+                self._replace_items(batch)
+                batch = OrderedDict()
+        if batch:
+            self._replace_items(batch)
+
+        if static_tabs:
+            self._update_static_tab_names(static_tabs, user)
+
+        for course_id, location in courses.iteritems():
+            self.refresh_cached_metadata_inheritance_tree(location)
+            self.fire_updated_modulestore_signal(course_id, location)
+
+    def _replace_items(self, documents):
+        """
+        Replace the documents of the given locations, creating the ones which don't exist yet.
+
+        `documents` maps each Location to its document, less the _id. No document is ever removed,
+        so readers never find an item missing, even if a write fails: the documents which don't exist
+        yet are inserted all at once, and the existing ones are replaced one at a time.
+        """
+        ids = dict((location, namedtuple_to_son(location)) for location in documents)
+        existing = set(
+            Location(item['_id'])
+            for item in self.collection.find({'_id': {'$in': ids.values()}}, fields=['_id'])
+        )
+        new_documents = [
+            dict(document, _id=ids[location])
+            for location, document in documents.iteritems()
+            if location not in existing
+        ]
+        if new_documents:
+            try:
+                # Must include safe to avoid the django debug toolbar (which defines the deprecated "safe=False")
+                # from overriding our default value set in the init method.
+                self.collection.insert(new_documents, safe=self.collection.safe)
+            except pymongo.errors.DuplicateKeyError:
+                # some were created in the meantime: replacing all of them is just as good
+                existing = set(documents)
+
+        for location, document in documents.iteritems():
+            if location in existing:
+                self.collection.update({'_id': ids[location]}, document, upsert=True, safe=self.collection.safe)
+
+    def _xblock_payload(self, xblock):
+        """
+        Returns the fields of the document for xblock, in the dotted form update_item $sets.
+        """
+        definition_data = xblock.get_explicitly_set_fields_by_scope()
+        payload = {
+            'definition.data': definition_data,
+            'metadata': own_metadata(xblock),
+        }
+        if xblock.has_children:
+            # convert all to urls
+            xblock.children = [child.url() if isinstance(child, Location) else child
+                               for child in xblock.children]
+            payload.update({'definition.children': xblock.children})
+        return payload
+
+    def _update_static_tab_names(self, static_tabs, user):
+        """
+        For static tabs, their containing course also records their display name: update
+        it in each of the courses containing the given static tab xblocks, if it has changed.
+        """
+        courses = {}
+        for xblock in static_tabs:
+            course_id = get_course_id_no_run(xblock.location)
+            if course_id not in courses:
+                courses[course_id] = (self._get_course_for_item(xblock.location), [])
+            course, changed = courses[course_id]
+            # find the course's reference to this tab and update the name.
+            static_tab = CourseTabList.get_tab_by_slug(course.tabs, xblock.location.name)
+            # only update if changed
+            if static_tab and static_tab['name'] != xblock.display_name:
+                static_tab['name'] = xblock.display_name
+                changed.append(static_tab)
+
+        for course, changed in courses.itervalues():
+            if changed:
+                self.update_item(course, user)
+
     # pylint: disable=unused-argument
     def delete_item(self, location, **kwargs):
         """
@@ -860,7 +1028,7 @@ class MongoModuleStore(ModuleStoreWriteBase):
         """
         Return an array all of the locations for orphans in the course.
         """
-        detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
+        detached_categories = list(block_registry.block_types_tagged("detached"))
         all_items = self.collection.find({
             '_id.org': course_location.org,
             '_id.course': course_location.course,
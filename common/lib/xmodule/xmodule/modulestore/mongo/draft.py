@@ -6,6 +6,7 @@ returns the i4x://org/course/cat/name@draft object if that exists,
 and otherwise returns i4x://org/course/cat/name).
 """
 
+from collections import OrderedDict
 from datetime import datetime
 
 from xmodule.exceptions import InvalidVersionError
@@ -119,19 +120,27 @@ class DraftModuleStore(MongoModuleStore):
             in the request. The depth is counted in the number of calls to
             get_children() to cache. None indicates to cache all descendents
         """
-        draft_loc = as_draft(location)
-
-        draft_items = super(DraftModuleStore, self).get_items(draft_loc, course_id=course_id, depth=depth)
-        items = super(DraftModuleStore, self).get_items(location, course_id=course_id, depth=depth)
-
-        draft_locs_found = set(item.location.replace(revision=None) for item in draft_items)
-        non_draft_items = [
-            item
-            for item in items
-            if (item.location.revision != DRAFT
-                and item.location.replace(revision=None) not in draft_locs_found)
-        ]
-        return [wrap_draft(item) for item in draft_items + non_draft_items]
+        location = Location(location)
+        query = location_to_query(location)
+        if location.revision != DRAFT:
+            # fetch the drafts and the published items in one round-trip
+            query['_id.revision'] = {'$in': [DRAFT, None]}
+
+        draft_items = []
+        published_items = OrderedDict()
+        for item in self.collection.find(query):
+            item_location = Location(item['_id'])
+            if item_location.revision == DRAFT:
+                draft_items.append(item)
+            else:
+                published_items[item_location] = item
+
+        # drop the published items which have a draft before loading any of them
+        for draft in draft_items:
+            published_items.pop(Location(draft['_id']).replace(revision=None), None)
+
+        items = draft_items + published_items.values()
+        return [wrap_draft(item) for item in self._load_items(items, depth)]
 
     def convert_to_draft(self, source_location):
         """
@@ -176,6 +185,13 @@ class DraftModuleStore(MongoModuleStore):
         # don't allow locations to truly represent themselves as draft outside of this file
         xblock.location = as_published(xblock.location)
 
+    def update_items(self, xblocks, user=None, allow_not_found=False):
+        """
+        Save the current values of each of the xblocks to their draft versions, one at a time.
+        """
+        for xblock in xblocks:
+            self.update_item(xblock, user, allow_not_found)
+
     def delete_item(self, location, delete_all_versions=False, **kwargs):
         """
         Delete an item from this modulestore
@@ -230,18 +246,21 @@ class DraftModuleStore(MongoModuleStore):
         super(DraftModuleStore, self).delete_item(location)
 
     def _query_children_for_cache_children(self, items):
-        # first get non-draft in a round-trip
-        to_process_non_drafts = super(DraftModuleStore, self)._query_children_for_cache_children(items)
-
-        to_process_dict = {}
-        for non_draft in to_process_non_drafts:
-            to_process_dict[Location(non_draft["_id"])] = non_draft
-
-        # now query all draft content in another round-trip
+        # get the non-draft and the draft content in one round-trip
+        locations = [Location(item) for item in items]
         query = {
-            '_id': {'$in': [namedtuple_to_son(as_draft(Location(item))) for item in items]}
+            '_id': {'$in': [namedtuple_to_son(location) for location in locations] +
+                           [namedtuple_to_son(as_draft(location)) for location in locations]}
         }
-        to_process_drafts = list(self.collection.find(query))
+
+        to_process_dict = {}
+        to_process_drafts = []
+        for child in self.collection.find(query):
+            child_loc = Location(child["_id"])
+            if child_loc.revision == DRAFT:
+                to_process_drafts.append(child)
+            else:
+                to_process_dict[child_loc] = child
 
         # now we have to go through all drafts and replace the non-draft
         # with the draft. This is because the semantics of the DraftStore is to
@@ -68,7 +68,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xblock.fields import Scope
 from bson.objectid import ObjectId
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
-from xblock.core import XBlock
+from xmodule import block_registry
 from xmodule.modulestore.loc_mapper_store import LocMapperStore
 
 log = logging.getLogger(__name__)
@@ -450,7 +450,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         :param package_id:
         """
-        detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
+        detached_categories = list(block_registry.block_types_tagged("detached"))
         course = self._lookup_course(CourseLocator(package_id=package_id, branch=branch))
         items = {LocMapperStore.decode_key_from_mongo(block_id) for block_id in course['structure']['blocks'].keys()}
         items.remove(course['structure']['root'])
@@ -100,6 +100,15 @@ def rewrite_nonportable_content_links(source_course_id, dest_course_id, text):
 
 
 def _clone_modules(modulestore, modules, source_location, dest_location):
+    modulestore.update_items(
+        _cloned_modules(modules, source_location, dest_location), '**replace_user**'
+    )
+
+
+def _cloned_modules(modules, source_location, dest_location):
+    """
+    Yields each of `modules`, moved into the course at dest_location.
+    """
     for module in modules:
         original_loc = Location(module.location)
 
@@ -139,7 +148,7 @@ def _clone_modules(modulestore, modules, source_location, dest_location):
 
             module.children = new_children
 
-        modulestore.update_item(module, '**replace_user**')
+        yield module
 
 
 def clone_course(modulestore, contentstore, source_location, dest_location, delete_original=False):
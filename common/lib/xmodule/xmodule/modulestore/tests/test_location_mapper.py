@@ -419,6 +419,61 @@ class TestLocationMapper(LocMapperSetupSansDjango):
         with self.assertRaises(ItemNotFoundError):
             chapter_xlate = loc_mapper().translate_location(None, eponymous_block, add_entry_if_missing=False)
 
+    def test_translate_locations(self):
+        """
+        Test translating many locations, and locators, at once
+        """
+        org = 'foo_org'
+        course = 'bar_course'
+        old_style_course_id = '{}/{}/baz_run'.format(org, course)
+        new_style_package_id = '{}.geek_dept.{}.baz_run'.format(org, course)
+        loc_mapper().create_map_entry(
+            Location('i4x', org, course, 'course', 'baz_run'),
+            new_style_package_id,
+            block_map={
+                'abc123': {'problem': 'problem2'},
+                'baz_run': {'course': 'root'},
+            }
+        )
+        known = Location('i4x', org, course, 'problem', 'abc123')
+        unknown = Location('i4x', org, course, 'html', 'def456')
+        self.assertEqual(
+            [BlockUsageLocator(package_id=new_style_package_id, branch='draft', block_id='problem2'), None],
+            loc_mapper().translate_locations(old_style_course_id, [known, unknown], False, False)
+        )
+        # the whole block_map got cached, and so did the missing location
+        self.assertEqual(
+            Location('i4x', org, course, 'course', 'baz_run'),
+            loc_mapper()._get_location_from_cache(
+                BlockUsageLocator(package_id=new_style_package_id, branch='published', block_id='root')
+            )
+        )
+        self.instrumented_cache.reset_mock()
+        with self.assertRaises(ItemNotFoundError):
+            loc_mapper().translate_location(old_style_course_id, unknown, add_entry_if_missing=False)
+        self.assertEqual(2, self.instrumented_cache.get.call_count)
+
+        # adding the missing location is done in one write, and forgets that it was missing
+        course_locator, unknown_locator = loc_mapper().translate_locations(
+            old_style_course_id, [known.replace(category='course', name='baz_run'), unknown]
+        )
+        self.assertEqual('root', course_locator.block_id)
+        self.assertEqual(
+            unknown_locator, loc_mapper().translate_location(old_style_course_id, unknown, add_entry_if_missing=False)
+        )
+
+        # and back again
+        missing_locator = BlockUsageLocator(package_id=new_style_package_id, branch='published', block_id='nope')
+        self.assertEqual(
+            [known, unknown, None],
+            loc_mapper().translate_locators_to_locations([
+                BlockUsageLocator(package_id=new_style_package_id, branch='published', block_id='problem2'),
+                unknown_locator,
+                missing_locator,
+            ])
+        )
+        self.assertIsNone(loc_mapper().translate_locator_to_location(missing_locator))
+
 
 #==================================
 # functions to mock existing services
@@ -448,13 +503,19 @@ class TrivialCache(object):
         """
         return self.cache.get(key, default)
 
-    def set_many(self, entries):
+    def get_many(self, keys):
+        """
+        Mock the .get_many
+        """
+        return dict((key, self.cache[key]) for key in keys if key in self.cache)
+
+    def set_many(self, entries, timeout=None):
         """
         mock set_many
         """
         self.cache.update(entries)
 
-    def set(self, key, entry):
+    def set(self, key, entry, timeout=None):
         """
         mock set
         """
@@ -465,4 +526,4 @@ class TrivialCache(object):
         mock delete_many
         """
         for entry in entries:
-            del self.cache[entry]
+            self.cache.pop(entry, None)
@@ -1,11 +1,12 @@
 from pprint import pprint
 # pylint: disable=E0611
 from nose.tools import assert_equals, assert_raises, \
-    assert_not_equals, assert_false
+    assert_not_equals, assert_false, assert_true
 from itertools import ifilter
 # pylint: enable=E0611
 import pymongo
 import logging
+from mock import Mock
 from uuid import uuid4
 
 from xblock.fields import Scope
@@ -310,6 +311,85 @@ class TestMongoModuleStore(object):
         assert_equals(len(course_locations), 1)
         assert_in(Location('i4x', 'edX', 'simple', 'course', '2012_Fall'), course_locations)
 
+    def test_update_items(self):
+        """
+        Test writing several items at once
+        """
+        video = self.store.get_item("i4x://edX/toy/video/Welcome")
+        chapter = self.store.get_item("i4x://edX/toy/chapter/Overview")
+        video.display_name = u'Bulk video'
+        chapter.display_name = u'Bulk chapter'
+        self.store.update_items([video, chapter])
+
+        assert_equals(u'Bulk video', self.store.get_item("i4x://edX/toy/video/Welcome").display_name)
+        chapter = self.store.get_item("i4x://edX/toy/chapter/Overview")
+        assert_equals(u'Bulk chapter', chapter.display_name)
+        assert_in(video.location.url(), [child.location.url() for child in chapter.get_children()])
+
+    def test_update_items_keeps_documents(self):
+        """
+        Test that writing several items at once creates the new ones, and never removes a document
+        """
+        video = self.store.get_item("i4x://edX/toy/video/Welcome")
+        video.display_name = u'Replaced video'
+        html = self.store.create_xmodule(Location('i4x', 'edX', 'toy', 'html', 'bulk_{}'.format(uuid4().hex)))
+        html.display_name = u'New html'
+
+        remove = self.store.collection.remove
+        self.store.collection.remove = Mock()
+        try:
+            self.store.update_items([video, html])
+            assert_false(self.store.collection.remove.called)
+        finally:
+            self.store.collection.remove = remove
+
+        assert_equals(u'Replaced video', self.store.get_item(video.location).display_name)
+        assert_equals(u'New html', self.store.get_item(html.location).display_name)
+
+    def test_draft_get_items(self):
+        """
+        Test that the draft store returns the draft of the items which have one, instead of
+        the published item
+        """
+        verticals = self.draft_store.get_items(Location('i4x', 'edX', 'simple_with_draft', 'vertical', None, None))
+        assert_equals(
+            [u'i4x://edX/simple_with_draft/vertical/test_vertical'],
+            [vertical.location.url() for vertical in verticals if vertical.location.name == 'test_vertical']
+        )
+        assert_true(next(vertical for vertical in verticals if vertical.location.name == 'test_vertical').is_draft)
+
+    def test_shared_descriptor_system(self):
+        """
+        Test that the items of a course loaded during a request share a descriptor system,
+        until the course is written to
+        """
+        self.store.request_cache = Mock(data={}, active=True)
+        try:
+            chapter = self.store.get_item("i4x://edX/toy/chapter/Overview")
+            video = self.store.get_item("i4x://edX/toy/video/Welcome")
+            assert_true(chapter.runtime is video.runtime)
+            assert_in(chapter.location, video.runtime.module_data)
+            # nothing needed the resources filesystem yet
+            assert_equals(None, video.runtime._resources_fs)  # pylint: disable=protected-access
+
+            self.store.update_item(video)
+            assert_false(self.store.get_item("i4x://edX/toy/video/Welcome").runtime is chapter.runtime)
+        finally:
+            self.store.request_cache = None
+
+    def test_no_shared_descriptor_system_outside_requests(self):
+        """
+        Test that outside of a request, which would clear it, nothing is kept in the request cache
+        """
+        self.store.request_cache = Mock(data={}, active=False)
+        try:
+            chapter = self.store.get_item("i4x://edX/toy/chapter/Overview")
+            video = self.store.get_item("i4x://edX/toy/video/Welcome")
+            assert_false(chapter.runtime is video.runtime)
+            assert_false('mongo_descriptor_systems' in self.store.request_cache.data)
+        finally:
+            self.store.request_cache = None
+
 
 class TestMongoKeyValueStore(object):
     """
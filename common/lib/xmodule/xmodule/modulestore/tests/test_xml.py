@@ -43,6 +43,22 @@ class TestXMLModuleStore(unittest.TestCase):
         store = XMLModuleStore(DATA_DIR, course_dirs=['toy', 'simple'])
         self.assertEqual(store.get_modulestore_type('foo/bar/baz'), XML_MODULESTORE_TYPE)
 
+    def test_lazy_loading(self):
+        store = XMLModuleStore(DATA_DIR, course_dirs=['toy', 'simple'], lazy=True)
+        self.assertEqual(store.courses, {})
+        self.assertEqual(
+            sorted(store.unloaded_courses.keys()), ['edX/simple/2012_Fall', 'edX/toy/2012_Fall']
+        )
+
+        # Only the course asked for is loaded
+        course = store.get_course('edX/toy/2012_Fall')
+        self.assertEqual(course.id, 'edX/toy/2012_Fall')
+        self.assertEqual(store.unloaded_courses.keys(), ['edX/simple/2012_Fall'])
+        self.assertTrue(store.has_item('edX/toy/2012_Fall', course.location))
+
+        self.assertEqual(len(store.get_courses()), 2)
+        self.assertEqual(store.unloaded_courses, {})
+
     def test_unicode_chars_in_xml_content(self):
         # edX/full/6.002_Spring_2012 has non-ASCII chars, and during
         # uniquification of names, would raise a UnicodeError. It no longer does.
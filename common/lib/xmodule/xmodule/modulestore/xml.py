@@ -6,6 +6,7 @@ import os
 import re
 import sys
 import glob
+import threading
 
 from collections import defaultdict
 from cStringIO import StringIO
@@ -354,7 +355,7 @@ class XMLModuleStore(ModuleStoreReadBase):
     """
     def __init__(
         self, data_dir, default_class=None, course_dirs=None, course_ids=None,
-        load_error_modules=True, i18n_service=None, **kwargs
+        load_error_modules=True, i18n_service=None, lazy=False, **kwargs
     ):
         """
         Initialize an XMLModuleStore from data_dir
@@ -366,6 +367,10 @@ class XMLModuleStore(ModuleStoreReadBase):
 
         course_dirs or course_ids: If specified, the list of course_dirs or course_ids to load. Otherwise,
             load all courses. Note, providing both
+
+        lazy: If True, each course is only loaded the first time it is accessed through this
+            modulestore's methods, rather than all of them here. Courses whose id can't be
+            read from their course.xml are still loaded here, so that their errors are reported.
         """
         super(XMLModuleStore, self).__init__(**kwargs)
 
@@ -373,6 +378,8 @@ class XMLModuleStore(ModuleStoreReadBase):
         self.modules = defaultdict(dict)  # course_id -> dict(location -> XBlock)
         self.courses = {}  # course_dir -> XBlock for the course
         self.errored_courses = {}  # course_dir -> errorlog, for dirs that failed to load
+        self.unloaded_courses = {}  # course_id -> course_dir, for courses to be loaded lazily
+        self._load_lock = threading.RLock()
 
         self.load_error_modules = load_error_modules
 
@@ -400,8 +407,56 @@ class XMLModuleStore(ModuleStoreReadBase):
             course_dirs = sorted([d for d in os.listdir(self.data_dir) if
                                   os.path.exists(self.data_dir / d / "course.xml")])
         for course_dir in course_dirs:
+            if lazy:
+                course_id = self._read_course_id(course_dir)
+                if course_id is not None:
+                    if course_ids is None or course_id in course_ids:
+                        self.unloaded_courses[course_id] = course_dir
+                    continue
             self.try_load_course(course_dir, course_ids)
 
+    def _read_course_id(self, course_dir):
+        """
+        Returns the id of the course in course_dir, as load_course computes it, without
+        loading the course; or None if it can't be worked out.
+        """
+        try:
+            with open(self.data_dir / course_dir / "course.xml") as course_file:
+                course_data = etree.parse(
+                    StringIO(clean_out_mako_templating(course_file.read())), parser=edx_xml_parser
+                ).getroot()
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+        url_name = course_data.get('url_name', course_data.get('slug'))
+        if not url_name:
+            if not course_data.get('name'):
+                return None
+            url_name = Location.clean(course_data.get('name'))
+        return CourseDescriptor.make_id(
+            course_data.get('org', 'edx'), course_data.get('course', course_dir), url_name
+        )
+
+    def _ensure_course_loaded(self, course_id):
+        """
+        Loads the course course_id, if it is waiting to be loaded lazily.
+        """
+        if course_id in self.unloaded_courses:
+            with self._load_lock:
+                course_dir = self.unloaded_courses.get(course_id)
+                if course_dir is not None:
+                    self.try_load_course(course_dir, [course_id])
+                    # only mark the course loaded once it is complete, so that other threads
+                    # wait for it rather than see it partially loaded
+                    del self.unloaded_courses[course_id]
+
+    def _ensure_all_courses_loaded(self):
+        """
+        Loads all the courses waiting to be loaded lazily.
+        """
+        for course_id in self.unloaded_courses.keys():
+            self._ensure_course_loaded(course_id)
+
     def try_load_course(self, course_dir, course_ids=None):
         '''
         Load a course, keeping track of errors as we go along. If course_ids is not None,
@@ -691,6 +746,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         location: Something that can be passed to Location
         """
         location = Location(location)
+        self._ensure_course_loaded(course_id)
         try:
             return self.modules[course_id][location]
         except KeyError:
@@ -701,6 +757,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         Returns True if location exists in this ModuleStore.
         """
         location = Location(location)
+        self._ensure_course_loaded(course_id)
         return location in self.modules[course_id]
 
     def get_item(self, location, depth=0):
@@ -729,9 +786,11 @@ class XMLModuleStore(ModuleStoreReadBase):
                     items.append(module)
 
         if course_id is None:
+            self._ensure_all_courses_loaded()
             for _, modules in self.modules.iteritems():
                 _add_get_items(self, location, modules)
         else:
+            self._ensure_course_loaded(course_id)
             _add_get_items(self, location, self.modules[course_id])
 
         return items
@@ -741,13 +800,25 @@ class XMLModuleStore(ModuleStoreReadBase):
         Returns a list of course descriptors.  If there were errors on loading,
         some of these may be ErrorDescriptors instead.
         """
+        self._ensure_all_courses_loaded()
         return self.courses.values()
 
+    def get_course(self, course_id):
+        """
+        Returns the course descriptor for course_id, loading only that course.
+        """
+        self._ensure_course_loaded(course_id)
+        for course in self.courses.itervalues():
+            if course.id == course_id:
+                return course
+        return None
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
         course_dir where course loading failed.
         """
+        self._ensure_all_courses_loaded()
         return dict((k, self.errored_courses[k].errors) for k in self.errored_courses)
 
     def get_orphans(self, course_location, _branch):
@@ -777,6 +848,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         be empty if there are no parents.
         '''
         location = Location.ensure_fully_specified(location)
+        self._ensure_course_loaded(course_id)
         if not self.parent_trackers[course_id].is_known(location):
             raise ItemNotFoundError("{0} not in {1}".format(location, course_id))
 
@@ -4,9 +4,13 @@ Methods for exporting course data to XML
 
 import logging
 import lxml.etree
+import tarfile
+import time
+from cStringIO import StringIO
 from xblock.fields import Scope
 from xmodule.modulestore import Location
 from xmodule.modulestore.inheritance import own_metadata
+from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
 from json import dumps
 import json
@@ -58,11 +62,64 @@ def export_to_xml(modulestore, contentstore, course_location, root_dir, course_d
         alongside the public content in the course.
     """
 
+    fs = OSFS(root_dir)
+    export_fs = fs.makeopendir(course_dir)
+
+    _export_modules(modulestore, course_location, export_fs, draft_modulestore)
+
+    # export the static assets
+    if contentstore:
+        contentstore.export_all_for_course(
+            course_location,
+            root_dir + '/' + course_dir + '/static/',
+            root_dir + '/' + course_dir + '/policies/assets.json',
+        )
+
+
+def export_to_tarball(modulestore, contentstore, course_location, fileobj, course_dir, draft_modulestore=None):
+    """
+    Export the course as export_to_xml does, but as a gzipped tar archive written to `fileobj`, rather
+    than to a directory.
+
+    The xml is built in memory, and the content is streamed from `contentstore` into the archive, so
+    nothing is written to disk but the archive.
+
+    `fileobj`: The file-like object to write the archive to. It is written to sequentially, and not closed.
+    `course_dir`: The name of the directory in the archive to write the course content to
+    The other arguments are as for export_to_xml.
+    """
+    memory_fs = MemoryFS()
+    export_fs = memory_fs.makeopendir(course_dir)
+
+    _export_modules(modulestore, course_location, export_fs, draft_modulestore)
+
+    with tarfile.open(fileobj=fileobj, mode='w|gz') as tar_file:
+        for file_path in memory_fs.walkfiles():
+            data = memory_fs.getcontents(file_path)
+            tar_info = tarfile.TarInfo(file_path.lstrip('/'))
+            tar_info.size = len(data)
+            tar_info.mtime = time.time()
+            tar_file.addfile(tar_info, StringIO(data))
+
+        # export the static assets
+        if contentstore:
+            contentstore.export_all_for_course_to_tar(
+                course_location,
+                tar_file,
+                course_dir + '/static',
+                course_dir + '/policies/assets.json',
+            )
+
+
+def _export_modules(modulestore, course_location, export_fs, draft_modulestore=None):
+    """
+    Export all modules of the course at `course_location` from `modulestore`, and its drafts from
+    `draft_modulestore` if given, as xml to the filesystem `export_fs`.
+    """
     course_id = course_location.course_id
     course = modulestore.get_course(course_id)
 
-    fs = OSFS(root_dir)
-    export_fs = course.runtime.export_fs = fs.makeopendir(course_dir)
+    course.runtime.export_fs = export_fs
 
     root = lxml.etree.Element('unknown')
     course.add_xml_to_node(root)
@@ -70,14 +127,7 @@ def export_to_xml(modulestore, contentstore, course_location, root_dir, course_d
     with export_fs.open('course.xml', 'w') as course_xml:
         lxml.etree.ElementTree(root).write(course_xml)
 
-    # export the static assets
     policies_dir = export_fs.makeopendir('policies')
-    if contentstore:
-        contentstore.export_all_for_course(
-            course_location,
-            root_dir + '/' + course_dir + '/static/',
-            root_dir + '/' + course_dir + '/policies/assets.json',
-        )
 
     # export the static tabs
     export_extra_content(export_fs, modulestore, course_id, course_location, 'static_tab', 'tabs', '.html')
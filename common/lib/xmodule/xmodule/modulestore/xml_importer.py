@@ -1,6 +1,9 @@
+import hashlib
 import logging
 import os
 import mimetypes
+import sys
+from multiprocessing.pool import ThreadPool
 from path import path
 import json
 
@@ -8,6 +11,7 @@ from .xml import XMLModuleStore, ImportSystem, ParentTracker
 from xmodule.modulestore import Location
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
 from xmodule.contentstore.content import StaticContent
+from xmodule.exceptions import NotFoundError
 from .inheritance import own_metadata
 from xmodule.errortracker import make_error_tracker
 from .store_utilities import rewrite_nonportable_content_links
@@ -15,11 +19,96 @@ import xblock
 
 log = logging.getLogger(__name__)
 
+# The stages of import_from_xml reported to its stage_callback
+IMPORT_STAGE_STATIC = 'static'
+IMPORT_STAGE_MODULES = 'modules'
+IMPORT_STAGE_DRAFTS = 'drafts'
+
+# Static files are read, hashed and written to the content store in chunks of
+# this many bytes; files no larger than this are simply read into memory.
+STATIC_CONTENT_CHUNK_SIZE = 1024 * 1024
+
+# Number of threads generating thumbnails for, and saving, changed static content.
+STATIC_CONTENT_IMPORT_WORKERS = 4
+
+
+def _static_file_md5(content_path):
+    """
+    Returns the hex md5 digest of the file at `content_path`, as GridFS computes it, without reading
+    the whole file into memory.
+    """
+    md5 = hashlib.md5()
+    with open(content_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STATIC_CONTENT_CHUNK_SIZE), ''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _static_file_data(content_path):
+    """
+    Returns the contents of the file at `content_path`: a string for small files, and a generator
+    of chunks for larger ones, so that they can be written to the content store as they are read.
+    """
+    if os.path.getsize(content_path) <= STATIC_CONTENT_CHUNK_SIZE:
+        with open(content_path, 'rb') as f:
+            return f.read()
+
+    def chunks():
+        with open(content_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(STATIC_CONTENT_CHUNK_SIZE), ''):
+                yield chunk
+    return chunks()
+
+
+def _save_static_content(static_content_store, content, content_path, fullname_with_subpath):
+    """
+    Saves a thumbnail for `content`, if it is an image, and then `content` itself.
+    """
+    # first let's save a thumbnail so we can get back a thumbnail location
+    thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(
+        content, tempfile_path=content_path
+    )
+
+    if thumbnail_content is not None:
+        content.thumbnail_location = thumbnail_location
+
+    # then commit the content
+    try:
+        static_content_store.save(content)
+    except Exception as err:
+        log.exception('Error importing {0}, error={1}'.format(
+            fullname_with_subpath, err
+        ))
+
+
+def _check_static_content_saves(saves):
+    """
+    Logs the error of each of the `saves`, a list of the file name and AsyncResult of each
+    _save_static_content run on the thread pool, which failed, and then raises the first of them.
+    """
+    first_error = None
+    for fullname_with_subpath, result in saves:
+        try:
+            result.get()
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u'Error importing %s', fullname_with_subpath)
+            if first_error is None:
+                first_error = sys.exc_info()
+    if first_error is not None:
+        raise first_error[0], first_error[1], first_error[2]
+
 
 def import_static_content(
         modules, course_loc, course_data_path, static_content_store,
         target_location_namespace, subpath='static', verbose=False):
+    """
+    Imports the files under `subpath` of `course_data_path` into `static_content_store`.
 
+    Files whose md5 matches that of the asset already stored are not written again, so
+    re-importing a course only rewrites the assets which changed.
+
+    Returns a dict mapping the path of each file, relative to `subpath`, to the name of its asset.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -35,69 +124,90 @@ def import_static_content(
     verbose = True
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
+    pool = ThreadPool(STATIC_CONTENT_IMPORT_WORKERS)
+    saves = []
+    try:
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
 
-            content_path = os.path.join(dirname, filename)
+                content_path = os.path.join(dirname, filename)
+
+                if filename.endswith('~'):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
+                    continue
 
-            if filename.endswith('~'):
                 if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
+                    log.debug('importing static content %s...', content_path)
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+                try:
+                    md5 = _static_file_md5(content_path)
+                except IOError:
+                    if filename.startswith('._'):
+                        # OS X "companion files". See
+                        # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                        continue
+                    # Not a 'hidden file', then re-raise exception
+                    raise
+
+                # strip away leading path from the name
+                fullname_with_subpath = content_path.replace(static_dir, '')
+                if fullname_with_subpath.startswith('/'):
+                    fullname_with_subpath = fullname_with_subpath[1:]
+                content_loc = StaticContent.compute_location(
+                    target_location_namespace.org, target_location_namespace.course,
+                    fullname_with_subpath
+                )
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
-
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            content_loc = StaticContent.compute_location(
-                target_location_namespace.org, target_location_namespace.course,
-                fullname_with_subpath
-            )
+                policy_ele = policy.get(content_loc.name, {})
+                displayname = policy_ele.get('displayname', filename)
+                locked = policy_ele.get('locked', False)
+                mime_type = policy_ele.get('contentType')
 
-            policy_ele = policy.get(content_loc.name, {})
-            displayname = policy_ele.get('displayname', filename)
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                content_loc, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+                # Check extracted contentType in list of all valid mimetypes
+                if not mime_type or mime_type not in mimetypes_list:
+                    mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[fullname_with_subpath] = content_loc.name
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+                try:
+                    stored_attrs = static_content_store.get_attrs(content_loc)
+                except NotFoundError:
+                    stored_attrs = {}
+
+                if stored_attrs.get('md5') == md5:
+                    # The file is unchanged, so only its attributes may need updating
+                    attrs = {
+                        'displayname': displayname,
+                        'contentType': mime_type,
+                        'import_path': fullname_with_subpath,
+                        'locked': locked,
+                    }
+                    changed_attrs = dict(
+                        (attr, value) for attr, value in attrs.iteritems()
+                        if stored_attrs.get(attr) != value
+                    )
+                    if changed_attrs:
+                        static_content_store.set_attrs(content_loc, changed_attrs)
+                    if verbose:
+                        log.debug('static content %s is unchanged', content_path)
+                    continue
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception('Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+                content = StaticContent(
+                    content_loc, displayname, mime_type, _static_file_data(content_path),
+                    import_path=fullname_with_subpath, locked=locked
+                )
+                saves.append((fullname_with_subpath, pool.apply_async(
+                    _save_static_content,
+                    (static_content_store, content, content_path, fullname_with_subpath)
+                )))
+    finally:
+        pool.close()
+        pool.join()
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = content_loc.name
+    _check_static_content_saves(saves)
 
     return remap_dict
 
@@ -107,7 +217,7 @@ def import_from_xml(
         default_class='xmodule.raw_module.RawDescriptor',
         load_error_modules=True, static_content_store=None,
         target_location_namespace=None, verbose=False, draft_store=None,
-        do_import_static=True):
+        do_import_static=True, stage_callback=None):
     """
     Import the specified xml data_dir into the "store" modulestore,
     using org and course as the location org and course.
@@ -130,6 +240,10 @@ def import_from_xml(
         time the course is loaded. Static content for some courses may also be
         served directly by nginx, instead of going through django.
 
+    :param stage_callback:
+        if given, it is called with IMPORT_STAGE_STATIC, IMPORT_STAGE_MODULES
+        and IMPORT_STAGE_DRAFTS as each course reaches these stages of its import.
+
     """
 
     xml_module_store = XMLModuleStore(
@@ -217,6 +331,9 @@ def import_from_xml(
 
                     course_items.append(module)
 
+            if stage_callback is not None:
+                stage_callback(IMPORT_STAGE_STATIC)
+
             # then import all the static content
             if static_content_store is not None and do_import_static:
                 if target_location_namespace is not None:
@@ -260,30 +377,41 @@ def import_from_xml(
                     _namespace_rename, subpath=simport, verbose=verbose
                 )
 
-            # finally loop through all the modules
-            for module in xml_module_store.modules[course_id].itervalues():
-                if module.scope_ids.block_type == 'course':
-                    # we've already saved the course module up at the top
-                    # of the loop so just skip over it in the inner loop
-                    continue
+            if stage_callback is not None:
+                stage_callback(IMPORT_STAGE_MODULES)
 
-                # remap module to the new namespace
-                if target_location_namespace is not None:
-                    module = remap_namespace(module, target_location_namespace)
+            # finally loop through all the modules
+            def _modules_to_import():
+                """
+                Yields the modules of the course, other than the course module, ready to be saved.
+                """
+                for module in xml_module_store.modules[course_id].itervalues():
+                    if module.scope_ids.block_type == 'course':
+                        # we've already saved the course module up at the top
+                        # of the loop so just skip over it in the inner loop
+                        continue
+
+                    # remap module to the new namespace
+                    if target_location_namespace is not None:
+                        module = remap_namespace(module, target_location_namespace)
+
+                    if verbose:
+                        log.debug('importing module location {loc}'.format(
+                            loc=module.location
+                        ))
 
-                if verbose:
-                    log.debug('importing module location {loc}'.format(
-                        loc=module.location
-                    ))
+                    _prepare_module_for_import(
+                        module, course_location,
+                        target_location_namespace if target_location_namespace else course_location,
+                        do_import_static=do_import_static
+                    )
+                    yield module
 
-                import_module(
-                    module, store, course_data_path, static_content_store,
-                    course_location,
-                    target_location_namespace if target_location_namespace else course_location,
-                    do_import_static=do_import_static
-                )
+            store.update_items(_modules_to_import(), '**replace_user**')
 
             # now import any 'draft' items
+            if stage_callback is not None:
+                stage_callback(IMPORT_STAGE_DRAFTS)
             if draft_store is not None:
                 import_course_draft(
                     xml_module_store,
@@ -312,6 +440,16 @@ def import_module(
         source_course_location, dest_course_location, allow_not_found=False,
         do_import_static=True):
 
+    _prepare_module_for_import(
+        module, source_course_location, dest_course_location, do_import_static=do_import_static
+    )
+    store.update_item(module, '**replace_user**', allow_not_found=allow_not_found)
+
+
+def _prepare_module_for_import(module, source_course_location, dest_course_location, do_import_static=True):
+    """
+    Makes the changes to `module` needed before it is saved into the destination course.
+    """
     logging.debug(u'processing import of module {}...'.format(module.location.url()))
 
     if do_import_static and 'data' in module.fields and isinstance(module.fields['data'], xblock.fields.String):
@@ -329,8 +467,6 @@ def import_module(
     if 'index_in_children_list' in getattr(module, 'xml_attributes', []):
         del module.xml_attributes['index_in_children_list']
 
-    store.update_item(module, '**replace_user**', allow_not_found=allow_not_found)
-
 
 def import_course_draft(
         xml_module_store, store, draft_store, course_data_path,
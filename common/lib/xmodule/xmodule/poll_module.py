@@ -15,7 +15,7 @@ from collections import OrderedDict
 from lxml import etree
 from pkg_resources import resource_string
 
-from xmodule.x_module import XModule
+from xmodule.x_module import XModule, HANDLER_STATE_SELF
 from xmodule.stringify import stringify_children
 from xmodule.mako_module import MakoModuleDescriptor
 from xmodule.xml_module import XmlDescriptor
@@ -47,6 +47,7 @@ class PollModule(PollFields, XModule):
          }
     css = {'scss': [resource_string(__name__, 'css/poll/display.scss')]}
     js_module_name = "Poll"
+    default_handler_state = HANDLER_STATE_SELF
 
     def handle_ajax(self, dispatch, data):
         """Ajax handler.
@@ -11,7 +11,7 @@ from .exceptions import NotFoundError
 from .fields import Date
 from .mako_module import MakoModuleDescriptor
 from .progress import Progress
-from .x_module import XModule
+from .x_module import XModule, HANDLER_STATE_SELF
 from .xml_module import XmlDescriptor
 
 log = logging.getLogger(__name__)
@@ -46,7 +46,8 @@ class SequenceModule(SequenceFields, XModule):
           'js': [resource_string(__name__, 'js/src/sequence/display/jquery.sequence.js')]}
     css = {'scss': [resource_string(__name__, 'css/sequence/display.scss')]}
     js_module_name = "Sequence"
-
+    # goto_position only saves the position in the sequence
+    default_handler_state = HANDLER_STATE_SELF
 
     def __init__(self, *args, **kwargs):
         super(SequenceModule, self).__init__(*args, **kwargs)
@@ -12,7 +12,7 @@ samples.
 import logging
 
 from collections import defaultdict
-from xblock.core import XBlock
+from xmodule import block_registry
 
 log = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ def all_templates():
     """
     # TODO use memcache to memoize w/ expiration
     templates = defaultdict(list)
-    for category, descriptor in XBlock.load_classes():
+    for category, descriptor in block_registry.block_classes():
         if not hasattr(descriptor, 'templates'):
             continue
         templates[category] = descriptor.templates()
@@ -0,0 +1,56 @@
+"""
+Tests for the registry of installed XBlock classes
+"""
+from mock import patch
+from unittest import TestCase
+
+from xblock.core import XBlock
+from xblock.plugin import PluginMissingError
+
+from xmodule import block_registry
+from xmodule.html_module import HtmlDescriptor
+from xmodule.seq_module import SequenceDescriptor
+
+
+class BlockRegistryTest(TestCase):
+    """
+    Test that the registry finds the same classes as XBlock does, and only scans for them once
+    """
+    def setUp(self):
+        block_registry.reload()
+        self.addCleanup(block_registry.reload)
+
+    def test_block_classes_scanned_once(self):
+        with patch.object(XBlock, 'load_classes', wraps=XBlock.load_classes) as load_classes:
+            block_classes = block_registry.block_classes()
+            self.assertIs(block_classes, block_registry.block_classes())
+            self.assertEqual(1, load_classes.call_count)
+
+        self.assertIn(('sequential', SequenceDescriptor), block_classes)
+
+    def test_load_class(self):
+        self.assertIs(SequenceDescriptor, block_registry.load_class('sequential'))
+        with patch.object(XBlock, 'load_class') as load_class:
+            self.assertIs(SequenceDescriptor, block_registry.load_class('sequential'))
+            self.assertFalse(load_class.called)
+
+    def test_load_missing_class(self):
+        with self.assertRaises(PluginMissingError):
+            block_registry.load_class('not_a_block_type')
+        self.assertIs(HtmlDescriptor, block_registry.load_class('not_a_block_type', default=HtmlDescriptor))
+
+    def test_block_types(self):
+        self.assertIn('sequential', block_registry.block_types_with_children())
+        self.assertNotIn('html', block_registry.block_types_with_children())
+        self.assertIn('problem', block_registry.block_types_with_score())
+        self.assertEqual(
+            set(block_type for block_type, __ in XBlock.load_tagged_classes('detached')),
+            block_registry.block_types_tagged('detached'),
+        )
+        self.assertIn('about', block_registry.block_types_tagged('detached'))
+
+    def test_reload(self):
+        block_types = block_registry.block_types_with_children()
+        block_registry.reload()
+        self.assertIsNot(block_types, block_registry.block_types_with_children())
+        self.assertEqual(block_types, block_registry.block_types_with_children())
@@ -1,6 +1,7 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
 from mock import Mock
 from xmodule.modulestore import Location
@@ -21,3 +22,29 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertIn("example.txt", name_val)
         self.assertNotIn("example.txt~", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
+
+    def test_skip_unchanged_static_files(self):
+        course_dir = DATA_DIR / "tilde"
+        loc = Location("edX", "tilde", "Fall_2012")
+        with open(course_dir / "static" / "example.txt", 'rb') as f:
+            md5 = hashlib.md5(f.read()).hexdigest()
+        content_store = Mock()
+        content_store.get_attrs.return_value = {
+            'md5': md5,
+            'displayname': 'example.txt',
+            'contentType': 'text/plain',
+            'import_path': 'example.txt',
+            'locked': False,
+        }
+        remap_dict = import_static_content(Mock(), Mock(), course_dir, content_store, loc)
+        self.assertIn("example.txt", remap_dict)
+        self.assertFalse(content_store.save.called)
+        self.assertFalse(content_store.set_attrs.called)
+
+    def test_static_file_error_raised(self):
+        course_dir = DATA_DIR / "tilde"
+        loc = Location("edX", "tilde", "Fall_2012")
+        content_store = Mock()
+        content_store.generate_thumbnail.side_effect = IOError("Cannot make a thumbnail")
+        with self.assertRaises(IOError):
+            import_static_content(Mock(), Mock(), course_dir, content_store, loc)
@@ -18,6 +18,10 @@ from xmodule.contentstore.django import contentstore
 
 log = logging.getLogger(__name__)
 
+# How long, in seconds, converted transcripts are cached for. They are cached by the md5 of the
+# asset they were converted from, so replacing the asset never serves a stale conversion.
+TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class TranscriptException(Exception):  # pylint disable=C0111
     pass
@@ -309,7 +313,7 @@ def get_html5_ids(html5_sources):
     return html5_ids
 
 
-def manage_video_subtitles_save(item, user, old_metadata=None, generate_translation=False):
+def manage_video_subtitles_save(item, user, old_metadata=None, generate_translation=False, cache=None):
     """
     Does some specific things, that can be done only on save.
 
@@ -339,6 +343,9 @@ def manage_video_subtitles_save(item, user, old_metadata=None, generate_translat
     b) For all SRT files in`item.transcripts` regenerate new SJSON files.
         (To avoid confusing situation if you attempt to correct a translation by uploading
         a new version of the SRT file with same name).
+
+    # 4. If `cache` is given, convert all the transcripts to the formats the student view serves
+    them in, and cache them there, so that students don't wait for the conversions.
     """
 
     _ = item.runtime.service(item, "i18n").ugettext
@@ -389,6 +396,13 @@ def manage_video_subtitles_save(item, user, old_metadata=None, generate_translat
                     {speed: subs_id for subs_id, speed in youtube_speed_dict(item).iteritems()},
                     lang,
                 )
+                # and the one HTML5 videos use (see get_or_create_sjson)
+                generate_sjson_for_all_speeds(
+                    item,
+                    item.transcripts[lang],
+                    {1.0: os.path.splitext(item.transcripts[lang])[0]},
+                    lang,
+                )
             except TranscriptException as ex:
                 item.transcripts.pop(lang)  # remove key from transcripts because proper srt file does not exist in assets.
                 reraised_message += ' ' + ex.message
@@ -396,6 +410,34 @@ def manage_video_subtitles_save(item, user, old_metadata=None, generate_translat
             item.save_with_metadata(user)
             raise TranscriptException(reraised_message)
 
+    # 4.
+    if cache is not None:
+        cache_transcripts(item, cache)
+
+
+def cache_transcripts(item, cache):
+    """
+    Converts the transcripts of the video `item` to each format the student view serves them in, and
+    stores the conversions in `cache` (see Transcript.get_converted).
+    """
+    # (asset filename, format of the asset, formats it's served in)
+    assets = []
+    for subs_id in [item.sub] + youtube_speed_dict(item).keys():
+        if subs_id:
+            assets.append((subs_filename(subs_id), 'sjson', ('sjson', 'srt', 'txt')))
+    for lang, filename in item.transcripts.items():
+        assets.append((filename, 'srt', ('srt', 'txt')))
+        assets.append((subs_filename(os.path.splitext(filename)[0], lang), 'sjson', ('sjson',)))
+        for subs_id in youtube_speed_dict(item):
+            assets.append((subs_filename(subs_id, lang), 'sjson', ('sjson',)))
+
+    for filename, input_format, output_formats in assets:
+        for output_format in output_formats:
+            try:
+                Transcript.get_converted(item.location, filename, input_format, output_format, cache)
+            except (NotFoundError, ValueError, KeyError, UnicodeDecodeError):
+                log.debug("Could not cache transcript %s as %s", filename, output_format)
+
 
 def youtube_speed_dict(item):
     """
@@ -461,12 +503,12 @@ def get_or_create_sjson(item):
     user_filename = item.transcripts[item.transcript_language]
     user_subs_id = os.path.splitext(user_filename)[0]
     source_subs_id, result_subs_dict = user_subs_id, {1.0: user_subs_id}
+    sjson_filename = subs_filename(source_subs_id, item.transcript_language)
     try:
-        sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
+        Transcript.asset_md5(item.location, sjson_filename)
     except (NotFoundError):  # generating sjson from srt
         generate_sjson_for_all_speeds(item, user_filename, result_subs_dict, item.transcript_language)
-    sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
-    return sjson_transcript
+    return Transcript.get_converted(item.location, sjson_filename, 'sjson', 'sjson', item.runtime.cache)
 
 class Transcript(object):
     """
@@ -510,6 +552,36 @@ class Transcript(object):
             elif output_format == 'srt':
                 return generate_srt_from_sjson(json.loads(content), speed=1.0)
 
+    @staticmethod
+    def get_converted(location, filename, input_format, output_format, cache):
+        """
+        Returns the transcript in the asset `filename`, converted from `input_format` to `output_format`.
+
+        The conversion is cached in `cache` by the md5 of the asset, so that only the md5 is read from
+        the contentstore when it's cached. Each speed of a transcript is a separate sjson asset, so the
+        md5 and the formats are all that the conversion depends on.
+
+        Raises NotFoundError if there is no such asset.
+        """
+        cache_key = u'transcript.{}.{}.{}'.format(
+            Transcript.asset_md5(location, filename), input_format, output_format
+        )
+        content = cache.get(cache_key)
+        if content is None:
+            data = Transcript.get_asset(location, filename).data
+            content = Transcript.convert(data, input_format, output_format)
+            cache.set(cache_key, content, TRANSCRIPT_CACHE_TIMEOUT)
+        return content
+
+    @staticmethod
+    def asset_md5(location, filename):
+        """
+        Returns the md5 of the asset `filename`, without reading the asset.
+
+        Raises NotFoundError if there is no such asset.
+        """
+        return contentstore().get_attr(Transcript.asset_location(location, filename), 'md5')
+
     @staticmethod
     def asset(location, subs_id, lang='en', filename=None):
         """
@@ -20,6 +20,7 @@ from .transcripts_utils import (
     TranscriptsGenerationException,
     generate_sjson_for_all_speeds,
     youtube_speed_dict,
+    subs_filename,
     Transcript,
     save_to_store,
 )
@@ -28,6 +29,23 @@ from .transcripts_utils import (
 log = logging.getLogger(__name__)
 
 
+def _cacheable_transcript_response(request, response):
+    """
+    Adds an ETag and cache headers to the transcript `response`, and returns 304 Not Modified instead
+    if the browser already has it.
+
+    Browsers must revalidate every time: the transcript urls stay the same when the transcripts are
+    replaced, the download depends on the format and language the student picked, and a translation
+    request records the language the student picked.
+    """
+    response.md5_etag()
+    if response.etag in request.if_none_match:
+        response = Response(status=304, headerlist=[('ETag', response.headers['ETag'])])
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 # Disable no-member warning:
 # pylint: disable=E1101
 
@@ -107,13 +125,16 @@ class VideoStudentViewHandlers(object):
         if youtube_id:
             # Youtube case:
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, youtube_id).data
+                return Transcript.get_converted(
+                    self.location, subs_filename(youtube_id), 'sjson', 'sjson', self.runtime.cache
+                )
 
             youtube_ids = youtube_speed_dict(self)
             assert youtube_id in youtube_ids
 
+            sjson_filename = subs_filename(youtube_id, self.transcript_language)
             try:
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
+                Transcript.asset_md5(self.location, sjson_filename)
             except (NotFoundError):
                 log.info("Can't find content in storage for %s transcript: generating.", youtube_id)
                 generate_sjson_for_all_speeds(
@@ -122,13 +143,14 @@ class VideoStudentViewHandlers(object):
                     {speed: youtube_id for youtube_id, speed in youtube_ids.iteritems()},
                     self.transcript_language
                 )
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
 
-            return sjson_transcript
+            return Transcript.get_converted(self.location, sjson_filename, 'sjson', 'sjson', self.runtime.cache)
         else:
             # HTML5 case
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, self.sub).data
+                return Transcript.get_converted(
+                    self.location, subs_filename(self.sub), 'sjson', 'sjson', self.runtime.cache
+                )
             else:
                 return get_or_create_sjson(self)
 
@@ -157,13 +179,15 @@ class VideoStudentViewHandlers(object):
                 log.debug("No subtitles for 'en' language")
                 raise ValueError
 
-            data = Transcript.asset(self.location, transcript_name, lang).data
             filename = u'{}.{}'.format(transcript_name, transcript_format)
-            content = Transcript.convert(data, 'sjson', transcript_format)
+            content = Transcript.get_converted(
+                self.location, subs_filename(transcript_name, lang), 'sjson', transcript_format, self.runtime.cache
+            )
         else:
-            data = Transcript.asset(self.location, None, None, self.transcripts[lang]).data
             filename = u'{}.{}'.format(os.path.splitext(self.transcripts[lang])[0], transcript_format)
-            content = Transcript.convert(data, 'srt', transcript_format)
+            content = Transcript.get_converted(
+                self.location, self.transcripts[lang], 'srt', transcript_format, self.runtime.cache
+            )
 
         if not content:
             log.debug('no subtitles produced in get_transcript')
@@ -220,6 +244,7 @@ class VideoStudentViewHandlers(object):
             else:
                 response = Response(transcript, headerlist=[('Content-Language', language)])
                 response.content_type = Transcript.mime_types['sjson']
+                response = _cacheable_transcript_response(request, response)
 
         elif dispatch == 'download':
             try:
@@ -236,19 +261,20 @@ class VideoStudentViewHandlers(object):
                     ]
                 )
                 response.content_type = transcript_mime_type
+                response = _cacheable_transcript_response(request, response)
 
         elif dispatch == 'available_translations':
             available_translations = []
             if self.sub:  # check if sjson exists for 'en'.
                 try:
-                    Transcript.asset(self.location, self.sub, 'en')
+                    Transcript.asset_md5(self.location, subs_filename(self.sub, 'en'))
                 except NotFoundError:
                     pass
                 else:
                     available_translations = ['en']
             for lang in self.transcripts:
                 try:
-                    Transcript.asset(self.location, None, None, self.transcripts[lang])
+                    Transcript.asset_md5(self.location, self.transcripts[lang])
                 except NotFoundError:
                     continue
                 available_translations.append(lang)
@@ -27,7 +27,7 @@ from xblock.fields import ScopeIds
 from xblock.runtime import KvsFieldData
 
 from xmodule.modulestore.inheritance import InheritanceKeyValueStore
-from xmodule.x_module import XModule, module_attr
+from xmodule.x_module import XModule, module_attr, HANDLER_STATE_SELF
 from xmodule.editing_module import TabsEditingDescriptor
 from xmodule.raw_module import EmptyDataRawDescriptor
 from xmodule.xml_module import is_pointer_tag, name_to_pathname, deserialize_field
@@ -64,6 +64,7 @@ class VideoModule(VideoFields, VideoStudentViewHandlers, XModule):
     """
     video_time = 0
     icon_class = 'video'
+    default_handler_state = HANDLER_STATE_SELF
 
     # To make sure that js files are called in proper order we use numerical
     # index. We do that to avoid issues that occurs in tests.
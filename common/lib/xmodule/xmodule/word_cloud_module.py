@@ -12,7 +12,7 @@ import logging
 from pkg_resources import resource_string
 from xmodule.raw_module import EmptyDataRawDescriptor
 from xmodule.editing_module import MetadataOnlyEditingDescriptor
-from xmodule.x_module import XModule
+from xmodule.x_module import XModule, HANDLER_STATE_SELF
 
 from xblock.fields import Scope, Dict, Boolean, List, Integer, String
 
@@ -90,6 +90,7 @@ class WordCloudModule(WordCloudFields, XModule):
     }
     css = {'scss': [resource_string(__name__, 'css/word_cloud/display.scss')]}
     js_module_name = "WordCloud"
+    default_handler_state = HANDLER_STATE_SELF
 
     def get_state(self):
         """Return success json answer for client."""
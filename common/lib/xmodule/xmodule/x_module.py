@@ -20,6 +20,7 @@ from xblock.fields import Scope, Integer, Float, List, XBlockMixin, String, Dict
 from xblock.fragment import Fragment
 from xblock.plugin import default_select
 from xblock.runtime import Runtime
+from xmodule import block_registry
 from xmodule.fields import RelativeTime
 
 from xmodule.errortracker import exc_info_to_str
@@ -36,6 +37,34 @@ def dummy_track(_event_type, _event):
     pass
 
 
+# The student state an XBlock handler can declare it needs, so that the LMS loads only that before
+# calling it: none at all, the block's own, the block's and its children's, or the whole subtree's.
+HANDLER_STATE_NONE = 'none'
+HANDLER_STATE_SELF = 'self'
+HANDLER_STATE_CHILDREN = 'children'
+HANDLER_STATE_SUBTREE = 'subtree'
+
+
+def handler_state(state):
+    """
+    Decorator declaring which of the HANDLER_STATE_* student states the decorated XBlock handler needs,
+    overriding the default_handler_state of its block.
+    """
+    def decorator(func):  # pylint: disable=missing-docstring
+        func._handler_state = state  # pylint: disable=protected-access
+        return func
+    return decorator
+
+
+def _declared_handler_state(block_class, handler_name):
+    """
+    Returns the student state declared by the handler handler_name of block_class, or else by block_class.
+    """
+    handler = getattr(block_class, handler_name, None)
+    default = getattr(block_class, 'default_handler_state', HANDLER_STATE_SUBTREE)
+    return getattr(handler, '_handler_state', default)
+
+
 class HTMLSnippet(object):
     """
     A base class defining an interface for an object that is able to present an
@@ -127,6 +156,12 @@ class XModuleMixin(XBlockMixin):
     # student interacts with the module on the page.  A specific example is
     # FoldIt, which posts grade-changing updates through a separate API.
     always_recalculate_grades = False
+
+    # The student state which the XBlock handlers of this block need loaded before they are called,
+    # unless they declare their own with @handler_state (see HANDLER_STATE_*). The handlers of XModules
+    # all go through xmodule_handler, so XModules declare it for their handle_ajax here.
+    default_handler_state = HANDLER_STATE_SUBTREE
+
     # The default implementation of get_icon_class returns the icon_class
     # attribute of the class
     #
@@ -151,6 +186,12 @@ class XModuleMixin(XBlockMixin):
         """
         return self.runtime
 
+    def get_handler_state(self, handler_name):
+        """
+        Returns which of the HANDLER_STATE_* student states the handler handler_name of this block needs.
+        """
+        return _declared_handler_state(type(self), handler_name)
+
     @property
     def course_id(self):
         return self.runtime.course_id
@@ -541,6 +582,16 @@ class XModule(XModuleMixin, HTMLSnippet, XBlock):  # pylint: disable=abstract-me
         """
         return Fragment(self.get_html())
 
+    def student_view_cache_version(self):
+        """
+        Modules whose student_view doesn't depend on the user can return a string
+        identifying the version of everything it does depend on, which runtimes may
+        use to cache its rendering.
+
+        Returns None, the default, if student_view can't be cached.
+        """
+        return None
+
 
 def policy_key(location):
     """
@@ -633,6 +684,12 @@ class XModuleDescriptor(XModuleMixin, HTMLSnippet, ResourceTemplates, XBlock):
     entry_point = "xmodule.v1"
     module_class = XModule
 
+    def get_handler_state(self, handler_name):
+        """
+        Returns which of the HANDLER_STATE_* student states the handler handler_name needs. The handlers
+        are those of the XModule which this descriptor is bound to.
+        """
+        return _declared_handler_state(self.module_class, handler_name)
 
     # VS[compat].  Backwards compatibility code that can go away after
     # importing 2012 courses.
@@ -862,6 +919,7 @@ class XModuleDescriptor(XModuleMixin, HTMLSnippet, ResourceTemplates, XBlock):
     handle_ajax = module_attr('handle_ajax')
     max_score = module_attr('max_score')
     student_view = module_attr('student_view')
+    student_view_cache_version = module_attr('student_view_cache_version')
     get_child_descriptors = module_attr('get_child_descriptors')
     xmodule_handler = module_attr('xmodule_handler')
 
@@ -992,6 +1050,13 @@ class DescriptorSystem(ConfigurableFragmentWrapper, Runtime):  # pylint: disable
         """See documentation for `xblock.runtime:Runtime.get_block`"""
         return self.load_item(usage_id)
 
+    def load_block_type(self, block_type):
+        """
+        Returns the class of block_type from the process-wide block registry, rather than by scanning
+        the XBlock entry points again.
+        """
+        return block_registry.load_class(block_type, self.default_class, self.select)
+
     def get_field_provenance(self, xblock, field):
         """
         For the given xblock, return a dict for the field's current state:
@@ -1229,6 +1294,12 @@ class ModuleSystem(ConfigurableFragmentWrapper, Runtime):  # pylint: disable=abs
     def get_block(self, block_id):
         return self.get_module(self.descriptor_runtime.get_block(block_id))
 
+    def load_block_type(self, block_type):
+        """
+        Returns the class of block_type from the process-wide block registry.
+        """
+        return block_registry.load_class(block_type, self.default_class, self.select)
+
     def resource_url(self, resource):
         raise NotImplementedError("edX Platform doesn't currently implement XBlock resource urls")
 
@@ -6,6 +6,7 @@ Serve miscellaneous course and student data
 
 from django.contrib.auth.models import User
 import xmodule.graders as xmgraders
+from util.query import use_read_replica_if_available
 
 
 STUDENT_FEATURES = ('username', 'first_name', 'last_name', 'is_staff', 'email')
@@ -13,6 +14,25 @@ PROFILE_FEATURES = ('name', 'language', 'location', 'year_of_birth', 'gender',
                     'level_of_education', 'mailing_address', 'goals')
 AVAILABLE_FEATURES = STUDENT_FEATURES + PROFILE_FEATURES
 
+# Number of students fetched per query when iterating over enrolled students.
+STUDENT_FEATURES_BATCH_SIZE = 1000
+
+
+def _enrolled_students(course_id):
+    """ Return a queryset of the students actively enrolled in a course. """
+    return use_read_replica_if_available(User.objects.filter(
+        courseenrollment__course_id=course_id,
+        courseenrollment__is_active=1,
+    ))
+
+
+def _feature_fields(features):
+    """ Map each feature to the field name to query on the User model. """
+    return [
+        feature if feature in STUDENT_FEATURES else 'profile__' + feature
+        for feature in features
+    ]
+
 
 def enrolled_students_features(course_id, features):
     """
@@ -25,26 +45,37 @@ def enrolled_students_features(course_id, features):
         {'username': 'username3', 'first_name': 'firstname3'}
     ]
     """
-    students = User.objects.filter(
-        courseenrollment__course_id=course_id,
-        courseenrollment__is_active=1,
-    ).order_by('username').select_related('profile')
-
-    def extract_student(student, features):
-        """ convert student to dictionary """
-        student_features = [x for x in STUDENT_FEATURES if x in features]
-        profile_features = [x for x in PROFILE_FEATURES if x in features]
-
-        student_dict = dict((feature, getattr(student, feature))
-                            for feature in student_features)
-        profile = student.profile
-        if profile is not None:
-            profile_dict = dict((feature, getattr(profile, feature))
-                                for feature in profile_features)
-            student_dict.update(profile_dict)
-        return student_dict
-
-    return [extract_student(student, features) for student in students]
+    features = [x for x in features if x in AVAILABLE_FEATURES]
+    students = _enrolled_students(course_id).order_by('username').values_list(*_feature_fields(features))
+    return [dict(zip(features, values)) for values in students]
+
+
+def iter_enrolled_students_features(course_id, features, batch_size=STUDENT_FEATURES_BATCH_SIZE):
+    """
+    Generate lists of student features, one for each enrolled student.
+
+    Each list holds the values of `features`, in the same order.  Students are
+    fetched `batch_size` at a time, in order of user id, with each query
+    picking up after the last id of the previous one.  Only the requested
+    columns are fetched, so that exporting a large course does not require
+    holding its whole roster in memory.
+
+    iter_enrolled_students_features(course_id, ['username', 'first_name'])
+    would generate
+        ['username1', 'firstname1']
+        ['username2', 'firstname2']
+        ...
+    """
+    students = _enrolled_students(course_id).order_by('id')
+    fields = ['id'] + _feature_fields(features)
+    last_id = 0
+    while True:
+        batch = list(students.filter(id__gt=last_id).values_list(*fields)[:batch_size])
+        for values in batch:
+            yield list(values[1:])
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1][0]
 
 
 def dump_grading_context(course):
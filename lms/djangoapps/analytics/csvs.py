@@ -5,8 +5,12 @@ Format and create csv responses
 """
 
 import csv
+from cStringIO import StringIO
 from django.http import HttpResponse
 
+# Number of rows written to the response at a time by create_streaming_csv_response.
+STREAMING_CSV_ROWS_PER_CHUNK = 500
+
 
 def create_csv_response(filename, header, datarows):
     """
@@ -31,6 +35,45 @@ def create_csv_response(filename, header, datarows):
     return response
 
 
+def create_streaming_csv_response(filename, header, datarows):
+    """
+    Create an HttpResponse with an attached .csv file, whose content is generated
+    as the response is sent.
+
+    Takes the same arguments as create_csv_response, but `datarows` may be
+    any iterable, e.g. a generator, and is only consumed as the response is written.
+
+    header   e.g. ['Name', 'Email']
+    datarows e.g. (['Jim', 'jim@edy.org'], ['Jake', 'jake@edy.org'], ...)
+    """
+    response = HttpResponse(_csv_chunks(header, datarows), mimetype='text/csv')
+    response['Content-Disposition'] = 'attachment; filename={0}'\
+        .format(filename)
+    return response
+
+
+def _csv_chunks(header, datarows):
+    """
+    Generate the content of a .csv file in chunks of STREAMING_CSV_ROWS_PER_CHUNK rows.
+    """
+    buf = StringIO()
+    csvwriter = csv.writer(
+        buf,
+        dialect='excel',
+        quotechar='"',
+        quoting=csv.QUOTE_ALL)
+
+    csvwriter.writerow(header)
+    for index, datarow in enumerate(datarows, 1):
+        encoded_row = [unicode(s).encode('utf-8') for s in datarow]
+        csvwriter.writerow(encoded_row)
+        if index % STREAMING_CSV_ROWS_PER_CHUNK == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
 def format_dictlist(dictlist, features):
     """
     Convert a list of dictionaries to be compatible with create_csv_response
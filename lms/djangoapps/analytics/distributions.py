@@ -21,8 +21,10 @@ The distribution in a course for gender might look like:
 }
 """
 
+from django.core.cache import cache
 from django.db.models import Count
 from student.models import CourseEnrollment, UserProfile
+from util.query import use_read_replica_if_available
 
 # choices with a restricted domain, e.g. level_of_education
 _EASY_CHOICE_FEATURES = ('gender', 'level_of_education')
@@ -36,6 +38,9 @@ DISPLAY_NAMES = {
     'year_of_birth': 'Year Of Birth',
 }
 
+# Number of seconds that a computed distribution is cached for a course.
+DISTRIBUTION_CACHE_TIMEOUT = 60
+
 
 class ProfileDistribution(object):
     """
@@ -81,23 +86,36 @@ class ProfileDistribution(object):
             validation_assert(isinstance(self.choices_display_names, dict))
 
 
-def profile_distribution(course_id, feature):
-    """
-    Retrieve distribution of students over a given feature.
-    feature is one of AVAILABLE_PROFILE_FEATURES.
+def _distribution_cache_key(course_id, feature):
+    """ Get the cache key for the distribution of a feature in a course. """
+    return u"analytics.distributions.{}.{}".format(course_id, feature)
 
-    Returns a ProfileDistribution instance.
 
-    NOTE: no_data will appear as a key instead of None/null to adhere to the json spec.
-    data types are EASY_CHOICE or OPEN_CHOICE
+def _query_feature_counts(course_id, features):
     """
+    Count enrolled students by their values of all the `features` in a single query.
 
-    if not feature in AVAILABLE_PROFILE_FEATURES:
-        raise ValueError(
-            "unsupported feature requested for distribution '{}'".format(
-                feature)
-        )
-
+    Returns a list of (values, count) pairs, where `values` is a dict mapping each
+    feature to a value, and `count` is the number of enrollments with that
+    combination of values.  Enrollments of users without a profile have None for
+    every feature.
+    """
+    fields = ['user__profile__' + feature for feature in features]
+    # Count the enrollment ids rather than the feature, since
+    # django does not count NULL values when using annotate Count.
+    query = use_read_replica_if_available(
+        CourseEnrollment.objects.filter(course_id=course_id)
+    ).values(*fields).annotate(enrollment_count=Count('id')).order_by()
+    return [
+        (dict((feature, row[field]) for feature, field in zip(features, fields)), row['enrollment_count'])
+        for row in query
+    ]
+
+
+def _build_distribution(feature, feature_counts):
+    """
+    Build the ProfileDistribution for `feature` from the output of _query_feature_counts.
+    """
     prd = ProfileDistribution(feature)
 
     if feature in _EASY_CHOICE_FEATURES:
@@ -112,59 +130,80 @@ def profile_distribution(course_id, feature):
         choices = [(short, full)
                    for (short, full) in raw_choices] + [('no_data', 'No Data')]
 
-        def get_filter(feature, value):
-            """ Get the orm filter parameters for a feature. """
-            return {
-                'gender': {'user__profile__gender': value},
-                'level_of_education': {'user__profile__level_of_education': value},
-            }[feature]
-
-        def get_count(feature, value):
-            """ Get the count of enrolled students matching the feature value. """
-            return CourseEnrollment.objects.filter(
-                course_id=course_id,
-                **get_filter(feature, value)
-            ).count()
-
-        distribution = {}
-        for (short, full) in choices:
+        distribution = dict((short, 0) for (short, _) in choices)
+        for (values, count) in feature_counts:
+            value = values[feature]
             # handle no data case
-            if short == 'no_data':
-                distribution['no_data'] = 0
-                distribution['no_data'] += get_count(feature, None)
-                distribution['no_data'] += get_count(feature, '')
-            else:
-                distribution[short] = get_count(feature, short)
+            if value in (None, ''):
+                distribution['no_data'] += count
+            elif value in distribution:
+                distribution[value] += count
 
         prd.data = distribution
         prd.choices_display_names = dict(choices)
     elif feature in _OPEN_CHOICE_FEATURES:
         prd.type = 'OPEN_CHOICE'
-        profiles = UserProfile.objects.filter(
-            user__courseenrollment__course_id=course_id
-        )
-        query_distribution = profiles.values(
-            feature).annotate(Count(feature)).order_by()
-        # query_distribution is of the form [{'featureval': 'value1', 'featureval__count': 4},
-        #    {'featureval': 'value2', 'featureval__count': 2}, ...]
-
-        distribution = dict((vald[feature], vald[feature + '__count'])
-                            for vald in query_distribution)
+        distribution = {}
+        for (values, count) in feature_counts:
+            # change none to no_data for valid json key
+            value = values[feature]
+            if value is None:
+                value = 'no_data'
+            distribution[value] = distribution.get(value, 0) + count
         # distribution is of the form {'value1': 4, 'value2': 2, ...}
 
-        # change none to no_data for valid json key
-        if None in distribution:
-            # django does not properly count NULL values when using annotate Count
-            # so
-            #     distribution['no_data'] = distribution.pop(None)
-            # would always be 0.
-
-            # Correctly count null values
-            distribution['no_data'] = profiles.filter(
-                **{feature: None}
-            ).count()
-
         prd.data = distribution
 
     prd.validate()
     return prd
+
+
+def profile_distributions(course_id, features):
+    """
+    Retrieve distributions of students over several features.
+    Each feature is one of AVAILABLE_PROFILE_FEATURES.
+
+    Distributions are cached per course for DISTRIBUTION_CACHE_TIMEOUT seconds.
+    Those that are not cached are all computed from a single grouped query.
+
+    Returns a dict mapping each feature to a ProfileDistribution instance.
+    """
+    for feature in features:
+        if not feature in AVAILABLE_PROFILE_FEATURES:
+            raise ValueError(
+                "unsupported feature requested for distribution '{}'".format(
+                    feature)
+            )
+
+    cache_keys = dict((feature, _distribution_cache_key(course_id, feature)) for feature in features)
+    cached = cache.get_many(cache_keys.values())
+    distributions = dict(
+        (feature, cached[key]) for feature, key in cache_keys.items() if key in cached
+    )
+
+    missing_features = [feature for feature in features if feature not in distributions]
+    if missing_features:
+        feature_counts = _query_feature_counts(course_id, missing_features)
+        computed = dict(
+            (feature, _build_distribution(feature, feature_counts)) for feature in missing_features
+        )
+        cache.set_many(
+            dict((cache_keys[feature], prd) for feature, prd in computed.items()),
+            DISTRIBUTION_CACHE_TIMEOUT
+        )
+        distributions.update(computed)
+
+    return distributions
+
+
+def profile_distribution(course_id, feature):
+    """
+    Retrieve distribution of students over a given feature.
+    feature is one of AVAILABLE_PROFILE_FEATURES.
+
+    Returns a ProfileDistribution instance.
+
+    NOTE: no_data will appear as a key instead of None/null to adhere to the json spec.
+    data types are EASY_CHOICE or OPEN_CHOICE
+    """
+    return profile_distributions(course_id, [feature])[feature]
@@ -6,7 +6,10 @@ from django.test import TestCase
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 
-from analytics.basic import enrolled_students_features, AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES
+from analytics.basic import (
+    enrolled_students_features, iter_enrolled_students_features,
+    AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES,
+)
 
 
 class TestAnalyticsBasic(TestCase):
@@ -38,6 +41,22 @@ class TestAnalyticsBasic(TestCase):
             self.assertIn(userreport['email'], [user.email for user in self.users])
             self.assertIn(userreport['name'], [user.profile.name for user in self.users])
 
+    def test_iter_enrolled_students_features(self):
+        query_features = ['username', 'name', 'email']
+        # use a batch size that does not divide the number of students evenly:
+        with self.assertNumQueries(4):
+            userrows = list(iter_enrolled_students_features(self.course_id, query_features, batch_size=8))
+        self.assertEqual(
+            userrows,
+            [[user.username, user.profile.name, user.email] for user in sorted(self.users, key=lambda user: user.id)]
+        )
+
+    def test_iter_enrolled_students_features_inactive(self):
+        CourseEnrollment.unenroll(self.users[0], self.course_id)
+        usernames = [row[0] for row in iter_enrolled_students_features(self.course_id, ['username'], batch_size=10)]
+        self.assertEqual(len(usernames), len(self.users) - 1)
+        self.assertNotIn(self.users[0].username, usernames)
+
     def test_available_features(self):
         self.assertEqual(len(AVAILABLE_FEATURES), len(STUDENT_FEATURES + PROFILE_FEATURES))
         self.assertEqual(set(AVAILABLE_FEATURES), set(STUDENT_FEATURES + PROFILE_FEATURES))
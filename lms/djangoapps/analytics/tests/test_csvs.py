@@ -3,7 +3,9 @@
 from django.test import TestCase
 from nose.tools import raises
 
-from analytics.csvs import create_csv_response, format_dictlist, format_instances
+from mock import patch
+
+from analytics.csvs import create_csv_response, create_streaming_csv_response, format_dictlist, format_instances
 
 
 class TestAnalyticsCSVS(TestCase):
@@ -36,6 +38,16 @@ class TestAnalyticsCSVS(TestCase):
         self.assertEqual(res['Content-Disposition'], 'attachment; filename={0}'.format('robot.csv'))
         self.assertEqual(res.content.strip(), '')
 
+    @patch('analytics.csvs.STREAMING_CSV_ROWS_PER_CHUNK', 2)
+    def test_create_streaming_csv_response(self):
+        header = ['Name', 'Email']
+        datarows = (row for row in [['Jim', 'jim@edy.org'], ['Jake', 'jake@edy.org'], ['Jeeves', 'jeeves@edy.org']])
+
+        res = create_streaming_csv_response('robot.csv', header, datarows)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        self.assertEqual(res['Content-Disposition'], 'attachment; filename={0}'.format('robot.csv'))
+        self.assertEqual(res.content.strip(), '"Name","Email"\r\n"Jim","jim@edy.org"\r\n"Jake","jake@edy.org"\r\n"Jeeves","jeeves@edy.org"')
+
 
 class TestAnalyticsFormatDictlist(TestCase):
     """ Test format_dictlist method """
@@ -1,11 +1,12 @@
 """ Tests for analytics.distributions """
 
+from django.core.cache import cache
 from django.test import TestCase
 from nose.tools import raises
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 
-from analytics.distributions import profile_distribution, AVAILABLE_PROFILE_FEATURES
+from analytics.distributions import profile_distribution, profile_distributions, AVAILABLE_PROFILE_FEATURES
 
 
 class TestAnalyticsDistributions(TestCase):
@@ -13,6 +14,8 @@ class TestAnalyticsDistributions(TestCase):
 
     def setUp(self):
         self.course_id = 'some/robot/course/id'
+        # distributions are cached per course, so start each test afresh:
+        cache.clear()
 
         self.users = [UserFactory(
             profile__gender=['m', 'f', 'o'][i % 3],
@@ -48,12 +51,30 @@ class TestAnalyticsDistributions(TestCase):
         self.assertNotIn('no_data', distribution.data)
         self.assertEqual(distribution.data[1930], 1)
 
+    def test_profile_distributions_single_query(self):
+        features = list(AVAILABLE_PROFILE_FEATURES)
+        with self.assertNumQueries(1):
+            distributions = profile_distributions(self.course_id, features)
+        self.assertEqual(sorted(distributions.keys()), sorted(features))
+        self.assertEqual(distributions['gender'].data['f'], len(self.users) / 3)
+        self.assertEqual(distributions['year_of_birth'].data[1931], 1)
+        self.assertEqual(sum(distributions['level_of_education'].data.values()), len(self.users))
+
+    def test_profile_distribution_cached(self):
+        feature = 'gender'
+        profile_distribution(self.course_id, feature)
+        with self.assertNumQueries(0):
+            distribution = profile_distribution(self.course_id, feature)
+        self.assertEqual(distribution.data['m'], len(self.users) / 3)
+
 
 class TestAnalyticsDistributionsNoData(TestCase):
     '''Test analytics distribution gathering.'''
 
     def setUp(self):
         self.course_id = 'some/robot/course/id'
+        # distributions are cached per course, so start each test afresh:
+        cache.clear()
 
         self.users = [UserFactory(
             profile__year_of_birth=i + 1930,
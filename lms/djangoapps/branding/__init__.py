@@ -2,18 +2,23 @@ from xmodule.modulestore.django import modulestore
 from xmodule.course_module import CourseDescriptor
 from django.conf import settings
 
+from course_summaries.models import get_course_summaries
 from microsite_configuration import microsite
 
 
 def get_visible_courses():
     """
-    Return the set of CourseDescriptors that should be visible in this branded instance
+    Return the set of CourseDescriptors that should be visible in this branded instance,
+    or their CourseSummaries if FEATURES['ENABLE_COURSE_SUMMARIES'] is set
     """
-    _courses = modulestore().get_courses()
+    if settings.FEATURES.get('ENABLE_COURSE_SUMMARIES'):
+        courses = get_course_summaries()
+    else:
+        _courses = modulestore().get_courses()
 
-    courses = [c for c in _courses
-               if isinstance(c, CourseDescriptor)]
-    courses = sorted(courses, key=lambda course: course.number)
+        courses = [c for c in _courses
+                   if isinstance(c, CourseDescriptor)]
+        courses = sorted(courses, key=lambda course: course.number)
 
     subdomain = microsite.get_value('subdomain', 'default')
 
@@ -12,6 +12,8 @@ file and check it in at the same time as your model changes. To do that,
 
 """
 import logging
+from string import Formatter
+
 from django.db import models, transaction
 from django.contrib.auth.models import User
 from html_to_text import html_to_text
@@ -171,29 +173,33 @@ class CourseEmailTemplate(models.Model):
         using the provided template.  The template is a format string,
         which is rendered using format() with the provided `context` dict.
 
-        This doesn't insert user's text into template, until such time we can
-        support proper error handling due to errors in the message body
-        (e.g. due to the use of curly braces).
-
-        Instead, for now, we insert the message body *after* the substitutions
-        have been performed, so that anything in the message body that might
-        interfere will be innocently returned as-is.
+        This is a convenience for rendering a single message.  When the same
+        message is to be rendered for many recipients, use CompiledEmailTemplate
+        directly, so that the template is only parsed once.
 
         Output is returned as a unicode string.  It is not encoded as utf-8.
         Such encoding is left to the email code, which will use the value
         of settings.DEFAULT_CHARSET to encode the message.
         """
-        # If we wanted to support substitution, we'd call:
-        # format_string = format_string.replace(COURSE_EMAIL_MESSAGE_BODY_TAG, message_body)
-        result = format_string.format(**context)
-        # Note that the body tag in the template will now have been
-        # "formatted", so we need to do the same to the tag being
-        # searched for.
-        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
-        result = result.replace(message_body_tag, message_body, 1)
+        return CompiledEmailTemplate(format_string, message_body).render(context)
+
+    def compile_plaintext(self, plaintext):
+        """
+        Create a compiled plain text message.
+
+        Returns a CompiledEmailTemplate combining the stored plain template with
+        the plain text body (`plaintext`), ready to be rendered for each recipient.
+        """
+        return CompiledEmailTemplate(self.plain_template, plaintext)
+
+    def compile_htmltext(self, htmltext):
+        """
+        Create a compiled HTML text message.
 
-        # finally, return the result, without converting to an encoded byte array.
-        return result
+        Returns a CompiledEmailTemplate combining the stored HTML template with
+        the HTML text body (`htmltext`), ready to be rendered for each recipient.
+        """
+        return CompiledEmailTemplate(self.html_template, htmltext)
 
     def render_plaintext(self, plaintext, context):
         """
@@ -214,6 +220,72 @@ class CourseEmailTemplate(models.Model):
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
 
+class CompiledEmailTemplate(object):
+    """
+    A course email template that has been parsed once, for rendering many times.
+
+    The template is a format string.  On construction, it is split into a list of
+    static text segments and the format() slots that fall between them, so that
+    rendering a message for a particular recipient is only a matter of looking up
+    each slot in the context and concatenating the results.
+
+    The message body is inserted into the static segment containing the body tag
+    at compile time, rather than being substituted into the template.  This means that
+    anything in the message body that might interfere with format() (e.g. curly braces)
+    is innocently returned as-is, just as it would be by rendering the template first
+    and inserting the body afterwards.
+    """
+    formatter = Formatter()
+
+    def __init__(self, format_string, message_body):
+        self.segments = []
+        self.slots = []
+
+        # Note that the body tag will have been "formatted" by parse(), so we
+        # need to do the same to the tag being searched for.
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        body_inserted = False
+        literal_parts = []
+        for literal_text, field_name, format_spec, conversion in self.formatter.parse(format_string):
+            literal_parts.append(literal_text)
+            if field_name is None:
+                continue
+            body_inserted = self._add_segment(literal_parts, message_body_tag, message_body, body_inserted)
+            literal_parts = []
+            self.slots.append((field_name, conversion, format_spec))
+        self._add_segment(literal_parts, message_body_tag, message_body, body_inserted)
+
+    def _add_segment(self, literal_parts, message_body_tag, message_body, body_inserted):
+        """
+        Append a static segment made up of `literal_parts`, inserting the message body if needed.
+
+        Returns whether the message body has been inserted in this or a previous segment.
+        """
+        segment = u''.join(literal_parts)
+        if not body_inserted and message_body_tag in segment:
+            segment = segment.replace(message_body_tag, message_body, 1)
+            body_inserted = True
+        self.segments.append(segment)
+        return body_inserted
+
+    def render(self, context):
+        """
+        Render the message for the provided `context` dict.
+
+        Raises KeyError if the template refers to a value that is missing from `context`.
+        """
+        formatter = self.formatter
+        parts = [self.segments[0]]
+        for (field_name, conversion, format_spec), segment in zip(self.slots, self.segments[1:]):
+            value, _ = formatter.get_field(field_name, (), context)
+            value = formatter.convert_field(value, conversion)
+            if format_spec and '{' in format_spec:
+                format_spec = formatter.vformat(format_spec, (), context)
+            parts.append(formatter.format_field(value, format_spec))
+            parts.append(segment)
+        return u''.join(parts)
+
+
 class CourseAuthorization(models.Model):
     """
     Enable the course email feature on a course-by-course basis.
@@ -5,7 +5,8 @@ to a course.
 import re
 import random
 import json
-from time import sleep
+from multiprocessing.pool import ThreadPool
+from time import sleep, time
 
 from dogapi import dog_stats_api
 from smtplib import SMTPServerDisconnected, SMTPDataError, SMTPConnectError, SMTPException
@@ -400,7 +401,9 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
       * `subtask_status` : object of class SubtaskStatus representing current status.
 
     Sends to all addresses contained in to_list that are not also in the Optout table.
-    Emails are sent multi-part, in both plain text and html.
+    Emails are sent multi-part, in both plain text and html.  Up to
+    settings.BULK_EMAIL_CONNECTIONS_PER_TASK connections are opened, and messages are sent
+    over them concurrently, with the throughput of each recorded in `subtask_status`.
 
     Returns a tuple of two values:
       * First value is a SubtaskStatus object which represents current progress at the end of this call.
@@ -432,39 +435,62 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
     subject = "[" + course_title + "] " + course_email.subject
     from_addr = _get_source_address(course_email.course_id, course_title)
 
+    # Parse the templates once, so that rendering for each recipient is
+    # only a matter of filling in the slots:
     course_email_template = CourseEmailTemplate.get_template()
+    plaintext_template = course_email_template.compile_plaintext(course_email.text_message)
+    html_template = course_email_template.compile_htmltext(course_email.html_message)
+
+    # Throttle if we have gotten the rate limiter, by falling back to sending
+    # over a single connection.
+    if subtask_status.retried_nomax > 0:
+        num_connections = 1
+    else:
+        num_connections = max(1, min(settings.BULK_EMAIL_CONNECTIONS_PER_TASK, len(to_list)))
+
+    connections = []
+    pool = None
     try:
-        connection = get_connection()
-        connection.open()
+        for _ in range(num_connections):
+            connection = get_connection()
+            connections.append(connection)
+            connection.open()
+        if num_connections > 1:
+            pool = ThreadPool(num_connections)
 
         # Define context values to use in all course emails:
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
 
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
+            # Take a batch of recipients from the end of the to_list, one for each connection.
+            # At the end of processing this batch, those that were sent (or that failed
+            # permanently) will be removed from the to_list.
             # That way, the to_list will always contain the recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
+            batch = list(reversed(to_list[-num_connections:]))
+            send_args = []
+            for current_recipient, connection in zip(batch, connections):
+                # Update context with user-specific values from the recipient.
+                email_context['email'] = current_recipient['email']
+                email_context['name'] = current_recipient['profile__name']
+
+                # Construct message content using templates and context:
+                plaintext_msg = plaintext_template.render(email_context)
+                html_msg = html_template.render(email_context)
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    subject,
+                    plaintext_msg,
+                    from_addr,
+                    [current_recipient['email']],
+                    connection=connection
+                )
+                email_msg.attach_alternative(html_msg, 'text/html')
+                log.debug('Email with id %s to be sent to %s', email_id, current_recipient['email'])
+                send_args.append((connection, email_msg, course_title))
 
             # Throttle if we have gotten the rate limiter.  This is not very high-tech,
             # but if a task has been retried for rate-limiting reasons, then we sleep
@@ -474,41 +500,52 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             if subtask_status.retried_nomax > 0:
                 sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
 
-            try:
-                log.debug('Email with id %s to be sent to %s', email_id, email)
-
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+            if pool is not None:
+                send_results = pool.map(_send_message_on_connection, send_args)
+            else:
+                send_results = [_send_message_on_connection(args) for args in send_args]
+
+            unsent = []
+            send_exception = None
+            for connection_index, (current_recipient, (exc, duration_ms)) in enumerate(zip(batch, send_results)):
+                email = current_recipient['email']
+                if exc is None:
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+                    subtask_status.increment_connection(connection_index, succeeded=1, duration_ms=duration_ms)
+                elif isinstance(exc, SMTPDataError) and not (exc.smtp_code >= 400 and exc.smtp_code < 500):
+                    # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
                     # This will fall through and not retry the message.
                     log.warning('Task %s: email with id %s not delivered to %s due to error %s', task_id, email_id, email, exc.smtp_error)
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
-
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                log.warning('Task %s: email with id %s not delivered to %s due to error %s', task_id, email_id, email, exc)
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
-
-            else:
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment_connection(connection_index, failed=1, duration_ms=duration_ms)
+                elif isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS):
+                    # This will fall through and not retry the message.
+                    log.warning('Task %s: email with id %s not delivered to %s due to error %s', task_id, email_id, email, exc)
+                    dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                    subtask_status.increment(failed=1)
+                    subtask_status.increment_connection(connection_index, failed=1, duration_ms=duration_ms)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
-
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            to_list.pop()
+                    # Keep the recipient on the list, and let the outer handler
+                    # deal with the exception once the rest of the batch is accounted for.
+                    unsent.append(current_recipient)
+                    if send_exception is None:
+                        send_exception = exc
+
+            # Remove the recipients in the batch that were processed from the end of the list.
+            # (That way, if there were a failure that needed to be retried, the user is
+            # still on the list.)
+            del to_list[-len(batch):]
+            to_list.extend(reversed(unsent))
+
+            if send_exception is not None:
+                # This will cause the outer handler to catch the exception and retry the entire task.
+                raise send_exception
 
     except INFINITE_RETRY_ERRORS as exc:
         dog_stats_api.increment('course_email.infinite_retry', tags=[_statsd_tag(course_title)])
@@ -564,7 +601,36 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for connection in connections:
+            connection.close()
+
+
+def _send_message_on_connection(send_args):
+    """
+    Sends a single email message over the connection it was created for.
+
+    `send_args` is a tuple of the connection, the EmailMultiAlternatives message,
+    and the course title (used for tagging stats).  This is called from a pool of
+    threads when a subtask sends over more than one connection at a time, so it
+    only talks to the mail server, and leaves all other bookkeeping to the caller.
+
+    Returns a tuple of two values:
+      * First value is the exception raised while sending, or None if the send succeeded.
+        Exceptions are returned rather than raised, so that the outcome of every message
+        in a batch is known before any of them is handled.
+      * Second value is the time taken to send, in milliseconds.
+    """
+    connection, email_msg, course_title = send_args
+    start_time = time()
+    try:
+        with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+            connection.send_messages([email_msg])
+    except Exception as exc:  # pylint: disable=broad-except
+        return exc, int((time() - start_time) * 1000)
+    return None, int((time() - start_time) * 1000)
 
 
 def _get_current_task():
@@ -9,7 +9,9 @@ from student.tests.factories import UserFactory
 
 from mock import patch
 
-from bulk_email.models import CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CourseAuthorization
+from bulk_email.models import (
+    CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CompiledEmailTemplate, CourseAuthorization,
+)
 
 
 class CourseEmailTest(TestCase):
@@ -104,6 +106,31 @@ class CourseEmailTemplateTest(TestCase):
         template.render_plaintext("My new plain text.", context)
 
 
+class CompiledEmailTemplateTest(TestCase):
+    """Test the CompiledEmailTemplate class."""
+
+    def test_render_matches_format(self):
+        format_string = u"Hi {name} <{email}>!\n{{message_body}}\n{{{{escaped}}}} {course_title!r:>12}"
+        message_body = u"A body with {curly} braces and a {{message_body}} tag"
+        context = {'name': u'Robot', 'email': u'robot@edx.org', 'course_title': u'Course'}
+        expected = format_string.format(**context).replace(u'{message_body}', message_body, 1)
+        compiled = CompiledEmailTemplate(format_string, message_body)
+        self.assertEquals(compiled.render(context), expected)
+        # rendering again with different values reuses the same compiled template:
+        context['name'] = u'Other Robot'
+        expected = format_string.format(**context).replace(u'{message_body}', message_body, 1)
+        self.assertEquals(compiled.render(context), expected)
+
+    def test_render_without_slots(self):
+        compiled = CompiledEmailTemplate(u"Just {{message_body}}", u"the body")
+        self.assertEquals(compiled.render({}), u"Just the body")
+
+    def test_render_missing_context(self):
+        compiled = CompiledEmailTemplate(u"Hi {name}", u"")
+        with self.assertRaises(KeyError):
+            compiled.render({})
+
+
 class CourseAuthorizationTest(TestCase):
     """Test the CourseAuthorization model."""
 
@@ -194,6 +194,26 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
             get_conn.return_value.send_messages.side_effect = cycle([None])
             self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
 
+    def test_successful_with_connection_pool(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        num_connections = 4
+        with patch.object(settings, 'BULK_EMAIL_CONNECTIONS_PER_TASK', num_connections):
+            with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+                get_conn.return_value.send_messages.return_value = None
+                entry = self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+                self.assertEquals(get_conn.call_count, num_connections)
+                self.assertEquals(get_conn.return_value.send_messages.call_count, num_emails)
+
+        # check that throughput was recorded for each connection:
+        subtask_status = json.loads(entry.subtasks)['status'].values()[0]
+        connections = subtask_status.get('connections')
+        self.assertEquals(len(connections), num_connections)
+        self.assertEquals(sum(stats['succeeded'] for stats in connections), num_emails)
+        self.assertEquals(sum(stats['failed'] for stats in connections), 0)
+
     def test_successful_twice(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -1,15 +1,35 @@
 """
 Computes the data to display on the Instructor Dashboard
+
+The d3 views read from a CourseMetricsSnapshot of the course, rather than
+aggregating over the StudentModule table on every request.  The snapshot is
+brought up to date by refresh_course_metrics, which is run in the background
+by the refresh_course_metrics management command, or when a view finds that
+the snapshot is older than METRICS_SNAPSHOT_MAX_AGE.
 """
 
+import json
+from datetime import timedelta
+
 from courseware import models
-from django.db.models import Count
+from util.query import use_read_replica_if_available
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.utils import timezone
 from django.utils.translation import ugettext as _
 
 from xmodule.course_module import CourseDescriptor
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.inheritance import own_metadata
 
+# A snapshot older than this is refreshed before it is displayed.
+METRICS_SNAPSHOT_MAX_AGE = timedelta(minutes=15)
+
+# StudentModule entries modified this long before the watermark of a snapshot
+# are looked at again, so that entries saved by transactions that committed
+# late are not missed.
+METRICS_WATERMARK_OVERLAP = timedelta(minutes=5)
+
 
 def get_problem_grade_distribution(course_id):
     """
@@ -23,7 +43,7 @@ def get_problem_grade_distribution(course_id):
     """
 
     # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
+    db_query = use_read_replica_if_available(models.StudentModule.objects).filter(
         course_id__exact=course_id,
         grade__isnull=False,
         module_type__exact="problem",
@@ -62,7 +82,7 @@ def get_sequential_open_distrib(course_id):
     """
 
     # Aggregate query on studentmodule table for "opening a subsection" data
-    db_query = models.StudentModule.objects.filter(
+    db_query = use_read_replica_if_available(models.StudentModule.objects).filter(
         course_id__exact=course_id,
         module_type__exact="sequential",
     ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
@@ -91,7 +111,7 @@ def get_problem_set_grade_distrib(course_id, problem_set):
     """
 
     # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
+    db_query = use_read_replica_if_available(models.StudentModule.objects).filter(
         course_id__exact=course_id,
         grade__isnull=False,
         module_type__exact="problem",
@@ -121,6 +141,174 @@ def get_problem_set_grade_distrib(course_id, problem_set):
     return prob_grade_distrib
 
 
+def get_sequential_set_open_distrib(course_id, sequential_set):
+    """
+    Returns the number of students that opened each of the subsections/sequentials in `sequential_set`.
+
+    `course_id` the course ID for the course interested in
+
+    `sequential_set` an array of strings representing sequential module_id's.
+
+    Outputs a dict mapping the 'module_id' to the number of students that have opened that subsection/sequential.
+    """
+    db_query = use_read_replica_if_available(models.StudentModule.objects).filter(
+        course_id__exact=course_id,
+        module_type__exact="sequential",
+        module_state_key__in=sequential_set,
+    ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
+
+    return dict((row['module_state_key'], row['count_sequential']) for row in db_query)
+
+
+def get_course_structure(course_id):
+    """
+    Returns the parts of the course tree needed to lay out the metrics.
+
+    `course_id` the course ID for the course interested in
+
+    Returns an array of dicts in the order of the sections. Each dict has:
+      'display_name' - display name for the section
+      'subsections' - array of dicts in the order of the subsections, each with:
+        'id' - the subsection's 'module_id'
+        'display_name' - display name for the subsection
+        'units' - array, in the order of the units, of arrays of the problems in each unit.
+          Each problem is a dict with 'id' and 'display_name'.
+    """
+    # Retrieve course object down to problems
+    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=4)
+
+    structure = []
+    for section in course.get_children():
+        subsections = []
+        for subsection in section.get_children():
+            units = []
+            for unit in subsection.get_children():
+                units.append([
+                    {
+                        'id': child.location.url(),
+                        'display_name': own_metadata(child).get('display_name', ''),
+                    }
+                    for child in unit.get_children() if child.location.category == 'problem'
+                ])
+            subsections.append({
+                'id': subsection.location.url(),
+                'display_name': own_metadata(subsection).get('display_name', ''),
+                'units': units,
+            })
+        structure.append({
+            'display_name': own_metadata(section).get('display_name', ''),
+            'subsections': subsections,
+        })
+
+    return structure
+
+
+def refresh_course_metrics(course_id):
+    """
+    Brings the CourseMetricsSnapshot for the course up to date, creating it if needed.
+
+    `course_id` the course ID for the course interested in
+
+    The course structure is walked again, but only the problems and subsections with
+    StudentModule entries modified since the snapshot's watermark have their aggregates
+    recomputed.  The first refresh of a course computes all of them.
+
+    Returns the refreshed CourseMetricsSnapshot.
+    """
+    try:
+        snapshot = models.CourseMetricsSnapshot.objects.get(course_id=course_id)
+    except models.CourseMetricsSnapshot.DoesNotExist:
+        snapshot = models.CourseMetricsSnapshot(course_id=course_id)
+
+    structure = get_course_structure(course_id)
+
+    # Find the new watermark first, so that entries modified while the
+    # aggregates are computed are looked at again next time.
+    student_modules = use_read_replica_if_available(models.StudentModule.objects).filter(
+        course_id__exact=course_id,
+        module_type__in=["problem", "sequential"],
+    )
+    new_watermark = student_modules.aggregate(Max('modified'))['modified__max']
+
+    if snapshot.watermark is None:
+        prob_grade_distrib = get_problem_grade_distribution(course_id)
+        sequential_open_distrib = get_sequential_open_distrib(course_id)
+    else:
+        prob_grade_distrib = json.loads(snapshot.problem_grade_distrib)
+        sequential_open_distrib = json.loads(snapshot.sequential_open_distrib)
+
+        changed = student_modules.filter(
+            modified__gte=snapshot.watermark - METRICS_WATERMARK_OVERLAP,
+        ).values_list('module_type', 'module_state_key').distinct()
+        changed_problems = [key for (module_type, key) in changed if module_type == "problem"]
+        changed_sequentials = [key for (module_type, key) in changed if module_type == "sequential"]
+
+        # Problems may have lost all their grades (e.g. if student state was reset),
+        # in which case they are no longer in the distribution.
+        for problem in changed_problems:
+            prob_grade_distrib.pop(problem, None)
+        if changed_problems:
+            prob_grade_distrib.update(get_problem_set_grade_distrib(course_id, changed_problems))
+        if changed_sequentials:
+            sequential_open_distrib.update(get_sequential_set_open_distrib(course_id, changed_sequentials))
+
+    # Keep grades in order, as get_problem_set_grade_distrib does.
+    for problem_info in prob_grade_distrib.values():
+        problem_info['grade_distrib'] = sorted(problem_info['grade_distrib'])
+
+    values = {
+        'structure': json.dumps(structure),
+        'problem_grade_distrib': json.dumps(prob_grade_distrib),
+        'sequential_open_distrib': json.dumps(sequential_open_distrib),
+    }
+    if new_watermark is not None:
+        values['watermark'] = new_watermark
+
+    if snapshot.pk is None:
+        # Another request may be creating the snapshot at the same time
+        try:
+            snapshot, created = models.CourseMetricsSnapshot.objects.get_or_create(
+                course_id=course_id, defaults=values
+            )
+        except IntegrityError:
+            snapshot, created = models.CourseMetricsSnapshot.objects.get(course_id=course_id), False
+        if created:
+            return snapshot
+
+    for field, value in values.iteritems():
+        setattr(snapshot, field, value)
+    snapshot.save()
+    return snapshot
+
+
+def get_course_metrics(course_id):
+    """
+    Returns the metrics for the course, from its CourseMetricsSnapshot.
+
+    `course_id` the course ID for the course interested in
+
+    The snapshot is refreshed first if it does not exist yet, or is older than METRICS_SNAPSHOT_MAX_AGE.
+
+    Returns a dict with:
+      'structure' - as returned by get_course_structure
+      'problem_grade_distrib' - as returned by get_problem_grade_distribution
+      'sequential_open_distrib' - as returned by get_sequential_open_distrib
+    """
+    try:
+        snapshot = models.CourseMetricsSnapshot.objects.get(course_id=course_id)
+    except models.CourseMetricsSnapshot.DoesNotExist:
+        snapshot = refresh_course_metrics(course_id)
+    else:
+        if snapshot.updated < timezone.now() - METRICS_SNAPSHOT_MAX_AGE:
+            snapshot = refresh_course_metrics(course_id)
+
+    return {
+        'structure': json.loads(snapshot.structure),
+        'problem_grade_distrib': json.loads(snapshot.problem_grade_distrib),
+        'sequential_open_distrib': json.loads(snapshot.sequential_open_distrib),
+    }
+
+
 def get_d3_problem_grade_distrib(course_id):
     """
     Returns problem grade distribution information for each section, data already in format for d3 function.
@@ -131,75 +319,71 @@ def get_d3_problem_grade_distrib(course_id):
       'display_name' - display name for the section
       'data' - data for the d3_stacked_bar_graph function of the grade distribution for that problem
     """
-
-    prob_grade_distrib = get_problem_grade_distribution(course_id)
+    metrics = get_course_metrics(course_id)
+    prob_grade_distrib = metrics['problem_grade_distrib']
     d3_data = []
 
-    # Retrieve course object down to problems
-    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=4)
-
     # Iterate through sections, subsections, units, problems
-    for section in course.get_children():
+    for section in metrics['structure']:
         curr_section = {}
-        curr_section['display_name'] = own_metadata(section).get('display_name', '')
+        curr_section['display_name'] = section['display_name']
         data = []
         c_subsection = 0
-        for subsection in section.get_children():
+        for subsection in section['subsections']:
             c_subsection += 1
             c_unit = 0
-            for unit in subsection.get_children():
+            for unit in subsection['units']:
                 c_unit += 1
                 c_problem = 0
-                for child in unit.get_children():
+                for child in unit:
 
                     # Student data is at the problem level
-                    if child.location.category == 'problem':
-                        c_problem += 1
-                        stack_data = []
-
-                        # Construct label to display for this problem
-                        label = "P{0}.{1}.{2}".format(c_subsection, c_unit, c_problem)
-
-                        # Only problems in prob_grade_distrib have had a student submission.
-                        if child.location.url() in prob_grade_distrib:
-
-                            # Get max_grade, grade_distribution for this problem
-                            problem_info = prob_grade_distrib[child.location.url()]
-
-                            # Get problem_name for tooltip
-                            problem_name = own_metadata(child).get('display_name', '')
-
-                            # Compute percent of this grade over max_grade
-                            max_grade = float(problem_info['max_grade'])
-                            for (grade, count_grade) in problem_info['grade_distrib']:
-                                percent = 0.0
-                                if max_grade > 0:
-                                    percent = (grade * 100.0) / max_grade
-
-                                # Construct tooltip for problem in grade distibution view
-                                tooltip = _("{label} {problem_name} - {count_grade} {students} ({percent:.0f}%: {grade:.0f}/{max_grade:.0f} {questions})").format(
-                                    label=label,
-                                    problem_name=problem_name,
-                                    count_grade=count_grade,
-                                    students=_("students"),
-                                    percent=percent,
-                                    grade=grade,
-                                    max_grade=max_grade,
-                                    questions=_("questions"),
-                                )
-
-                                # Construct data to be sent to d3
-                                stack_data.append({
-                                    'color': percent,
-                                    'value': count_grade,
-                                    'tooltip': tooltip,
-                                })
-
-                        problem = {
-                            'xValue': label,
-                            'stackData': stack_data,
-                        }
-                        data.append(problem)
+                    c_problem += 1
+                    stack_data = []
+
+                    # Construct label to display for this problem
+                    label = "P{0}.{1}.{2}".format(c_subsection, c_unit, c_problem)
+
+                    # Only problems in prob_grade_distrib have had a student submission.
+                    if child['id'] in prob_grade_distrib:
+
+                        # Get max_grade, grade_distribution for this problem
+                        problem_info = prob_grade_distrib[child['id']]
+
+                        # Get problem_name for tooltip
+                        problem_name = child['display_name']
+
+                        # Compute percent of this grade over max_grade
+                        max_grade = float(problem_info['max_grade'])
+                        for (grade, count_grade) in problem_info['grade_distrib']:
+                            percent = 0.0
+                            if max_grade > 0:
+                                percent = (grade * 100.0) / max_grade
+
+                            # Construct tooltip for problem in grade distibution view
+                            tooltip = _("{label} {problem_name} - {count_grade} {students} ({percent:.0f}%: {grade:.0f}/{max_grade:.0f} {questions})").format(
+                                label=label,
+                                problem_name=problem_name,
+                                count_grade=count_grade,
+                                students=_("students"),
+                                percent=percent,
+                                grade=grade,
+                                max_grade=max_grade,
+                                questions=_("questions"),
+                            )
+
+                            # Construct data to be sent to d3
+                            stack_data.append({
+                                'color': percent,
+                                'value': count_grade,
+                                'tooltip': tooltip,
+                            })
+
+                    problem = {
+                        'xValue': label,
+                        'stackData': stack_data,
+                    }
+                    data.append(problem)
         curr_section['data'] = data
 
         d3_data.append(curr_section)
@@ -217,28 +401,26 @@ def get_d3_sequential_open_distrib(course_id):
       'display_name' - display name for the section
       'data' - data for the d3_stacked_bar_graph function of how many students opened each sequential/subsection
     """
-    sequential_open_distrib = get_sequential_open_distrib(course_id)
+    metrics = get_course_metrics(course_id)
+    sequential_open_distrib = metrics['sequential_open_distrib']
 
     d3_data = []
 
-    # Retrieve course object down to subsection
-    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=2)
-
     # Iterate through sections, subsections
-    for section in course.get_children():
+    for section in metrics['structure']:
         curr_section = {}
-        curr_section['display_name'] = own_metadata(section).get('display_name', '')
+        curr_section['display_name'] = section['display_name']
         data = []
         c_subsection = 0
 
         # Construct data for each subsection to be sent to d3
-        for subsection in section.get_children():
+        for subsection in section['subsections']:
             c_subsection += 1
-            subsection_name = own_metadata(subsection).get('display_name', '')
+            subsection_name = subsection['display_name']
 
             num_students = 0
-            if subsection.location.url() in sequential_open_distrib:
-                num_students = sequential_open_distrib[subsection.location.url()]
+            if subsection['id'] in sequential_open_distrib:
+                num_students = sequential_open_distrib[subsection['id']]
 
             stack_data = []
             tooltip = _("{num_students} student(s) opened Subsection {subsection_num}: {subsection_name}").format(
@@ -276,9 +458,6 @@ def get_d3_section_grade_distrib(course_id, section):
     distribution for those problems. Finally returns an object formated the way the d3_stacked_bar_graph.js expects its
     data object to be in.
 
-    If this is requested multiple times quickly for the same course, it is better to call
-    get_d3_problem_grade_distrib and pick out the sections of interest.
-
     Returns an array of dicts with the following keys (taken from d3_stacked_bar_graph.js's documentation)
       'xValue' - Corresponding value for the x-axis
       'stackData' - Array of objects with key, value pairs that represent a bar:
@@ -286,31 +465,28 @@ def get_d3_section_grade_distrib(course_id, section):
         'value' - Maps to the height of the bar, along the y-axis
         'tooltip' - (Optional) Text to display on mouse hover
     """
-
-    # Retrieve course object down to problems
-    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=4)
+    metrics = get_course_metrics(course_id)
 
     problem_set = []
     problem_info = {}
     c_subsection = 0
-    for subsection in course.get_children()[section].get_children():
+    for subsection in metrics['structure'][section]['subsections']:
         c_subsection += 1
         c_unit = 0
-        for unit in subsection.get_children():
+        for unit in subsection['units']:
             c_unit += 1
             c_problem = 0
-            for child in unit.get_children():
-                if (child.location.category == 'problem'):
-                    c_problem += 1
-                    problem_set.append(child.location.url())
-                    problem_info[child.location.url()] = {
-                        'id': child.location.url(),
-                        'x_value': "P{0}.{1}.{2}".format(c_subsection, c_unit, c_problem),
-                        'display_name': own_metadata(child).get('display_name', ''),
-                    }
-
-    # Retrieve grade distribution for these problems
-    grade_distrib = get_problem_set_grade_distrib(course_id, problem_set)
+            for child in unit:
+                c_problem += 1
+                problem_set.append(child['id'])
+                problem_info[child['id']] = {
+                    'id': child['id'],
+                    'x_value': "P{0}.{1}.{2}".format(c_subsection, c_unit, c_problem),
+                    'display_name': child['display_name'],
+                }
+
+    # Grade distribution for these problems
+    grade_distrib = metrics['problem_grade_distrib']
 
     d3_data = []
 
@@ -359,16 +535,7 @@ def get_section_display_name(course_id):
 
     The ith string in the array is the display name of the ith section in the course.
     """
-
-    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=4)
-
-    section_display_name = [""] * len(course.get_children())
-    i = 0
-    for section in course.get_children():
-        section_display_name[i] = own_metadata(section).get('display_name', '')
-        i += 1
-
-    return section_display_name
+    return [section['display_name'] for section in get_course_metrics(course_id)['structure']]
 
 
 def get_array_section_has_problem(course_id):
@@ -379,23 +546,7 @@ def get_array_section_has_problem(course_id):
 
     The ith value in the array is true if the ith section in the course contains problems and false otherwise.
     """
-
-    course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id), depth=4)
-
-    b_section_has_problem = [False] * len(course.get_children())
-    i = 0
-    for section in course.get_children():
-        for subsection in section.get_children():
-            for unit in subsection.get_children():
-                for child in unit.get_children():
-                    if child.location.category == 'problem':
-                        b_section_has_problem[i] = True
-                        break  # out of child loop
-                if b_section_has_problem[i]:
-                    break  # out of unit loop
-            if b_section_has_problem[i]:
-                break  # out of subsection loop
-
-        i += 1
-
-    return b_section_has_problem
+    return [
+        any(unit for subsection in section['subsections'] for unit in subsection['units'])
+        for section in get_course_metrics(course_id)['structure']
+    ]
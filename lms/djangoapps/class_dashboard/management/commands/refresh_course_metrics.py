@@ -0,0 +1,27 @@
+# pylint: disable=missing-docstring
+
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from class_dashboard.dashboard_data import refresh_course_metrics
+
+
+class Command(BaseCommand):
+    """
+    Bring the metrics snapshots shown on the instructor dashboard up to date.
+
+    Only the problems and subsections with student state modified since the
+    last refresh of each course have their aggregates recomputed.
+
+    """
+    args = '<course_id course_id ...>'
+    help = dedent(__doc__).strip()
+
+    def handle(self, *args, **options):
+        if not args:
+            raise CommandError("At least one course_id must be specified.")
+
+        for course_id in args:
+            snapshot = refresh_course_metrics(course_id)
+            self.stdout.write("{}: metrics refreshed up to {}\n".format(course_id, snapshot.watermark))
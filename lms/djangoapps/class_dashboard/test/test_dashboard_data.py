@@ -3,6 +3,7 @@ Tests for class dashboard (Metrics tab in instructor dashboard)
 """
 
 import json
+from mock import patch
 
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
@@ -10,6 +11,7 @@ from django.core.urlresolvers import reverse
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from courseware.tests.tests import TEST_DATA_MONGO_MODULESTORE
+from courseware.models import CourseMetricsSnapshot
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from capa.tests.response_xml_factory import StringResponseXMLFactory
@@ -18,7 +20,8 @@ from xmodule.modulestore import Location
 from class_dashboard.dashboard_data import (get_problem_grade_distribution, get_sequential_open_distrib,
                                             get_problem_set_grade_distrib, get_d3_problem_grade_distrib,
                                             get_d3_sequential_open_distrib, get_d3_section_grade_distrib,
-                                            get_section_display_name, get_array_section_has_problem
+                                            get_section_display_name, get_array_section_has_problem,
+                                            get_course_metrics, refresh_course_metrics
                                             )
 from class_dashboard.views import has_instructor_access_for_class
 
@@ -63,6 +66,7 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
         for user in self.users:
             CourseEnrollmentFactory.create(user=user, course_id=self.course.id)
 
+        self.items = []
         for i in xrange(USER_COUNT - 1):
             category = "problem"
             item = ItemFactory.create(
@@ -72,6 +76,7 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
                 metadata={'rerandomize': 'always'},
                 display_name=u"test problem omega \u03a9 " + str(i)
             )
+            self.items.append(item)
 
             for j, user in enumerate(self.users):
                 StudentModuleFactory.create(
@@ -161,6 +166,43 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
         b_section_has_problem = get_array_section_has_problem(self.course.id)
         self.assertEquals(b_section_has_problem[0], True)
 
+    def test_refresh_course_metrics(self):
+
+        problem_url = Location(self.items[0].location).url()
+        metrics = get_course_metrics(self.course.id)
+        grade_distrib = metrics['problem_grade_distrib'][problem_url]['grade_distrib']
+        self.assertEquals(USER_COUNT, sum(count for (_grade, count) in grade_distrib))
+
+        # New student state is only seen once the snapshot is refreshed
+        StudentModuleFactory.create(
+            grade=1,
+            max_grade=1,
+            student=UserFactory.create(),
+            course_id=self.course.id,
+            module_state_key=problem_url,
+        )
+        metrics = get_course_metrics(self.course.id)
+        grade_distrib = metrics['problem_grade_distrib'][problem_url]['grade_distrib']
+        self.assertEquals(USER_COUNT, sum(count for (_grade, count) in grade_distrib))
+
+        refresh_course_metrics(self.course.id)
+        metrics = get_course_metrics(self.course.id)
+        grade_distrib = metrics['problem_grade_distrib'][problem_url]['grade_distrib']
+        self.assertEquals(USER_COUNT + 1, sum(count for (_grade, count) in grade_distrib))
+        self.assertEquals(len(self.items), len(metrics['problem_grade_distrib']))
+
+    def test_refresh_course_metrics_created_concurrently(self):
+
+        refresh_course_metrics(self.course.id)
+        # Another request creates the snapshot after this one found there was none
+        with patch.object(
+            CourseMetricsSnapshot.objects, 'get', side_effect=[CourseMetricsSnapshot.DoesNotExist]
+        ):
+            snapshot = refresh_course_metrics(self.course.id)
+
+        self.assertEquals([snapshot.id], [row.id for row in CourseMetricsSnapshot.objects.filter(course_id=self.course.id)])
+        self.assertEquals(len(self.items), len(get_course_metrics(self.course.id)['problem_grade_distrib']))
+
     def test_dashboard(self):
 
         url = reverse('instructor_dashboard', kwargs={'course_id': self.course.id})
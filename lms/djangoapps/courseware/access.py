@@ -14,6 +14,7 @@ from xmodule.x_module import XModule
 
 from xblock.core import XBlock
 
+from course_summaries.models import CourseSummary
 from student.models import CourseEnrollmentAllowed
 from external_auth.models import ExternalAuthMap
 from courseware.masquerade import is_masquerading_as_student
@@ -68,7 +69,7 @@ def has_access(user, obj, action, course_context=None):
 
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
-    if isinstance(obj, CourseDescriptor):
+    if isinstance(obj, (CourseDescriptor, CourseSummary)):
         return _has_access_course_desc(user, obj, action)
 
     if isinstance(obj, ErrorDescriptor):
@@ -13,8 +13,9 @@ from xmodule.modulestore import Location, XML_MODULESTORE_TYPE
 from xmodule.modulestore.django import modulestore, loc_mapper
 from xmodule.contentstore.content import StaticContent
 from xmodule.modulestore.exceptions import ItemNotFoundError, InvalidLocationError
-from static_replace import replace_static_urls
+from static_replace import replace_static_urls, replace_course_urls
 
+from course_summaries.models import CourseSummary
 from courseware.access import has_access
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module
@@ -158,6 +159,16 @@ def get_course_about_section(course, section_key):
     # markup. This can change without effecting this interface when we find a
     # good format for defining so many snippets of text/html.
 
+    # The course listings show the short description, which is summarized
+    if section_key == 'short_description' and isinstance(course, CourseSummary):
+        html = replace_static_urls(
+            course.short_description or '',
+            course.data_dir,
+            course_id=course.id,
+            static_asset_path=course.static_asset_path
+        )
+        return replace_course_urls(html, course.id)
+
 # TODO: Remove number, instructors from this list
     if section_key in ['short_description', 'description', 'key_dates', 'video',
                        'course_staff_short', 'course_staff_extended',
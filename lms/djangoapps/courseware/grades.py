@@ -1,6 +1,7 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 from collections import defaultdict
+from datetime import timedelta
 import json
 import random
 import logging
@@ -8,24 +9,34 @@ import logging
 from contextlib import contextmanager
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Q
 from django.test.client import RequestFactory
 
 from dogapi import dog_stats_api
 
 from courseware import courses
 from courseware.model_data import FieldDataCache
-from student.models import anonymous_id_for_user
+from student.models import anonymous_id_for_user, cache_anonymous_ids_for_course
 from submissions import api as sub_api
+from util.query import use_read_replica_if_available
 from xmodule import graders
+from xmodule.course_module import CourseDescriptor
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
-from .models import StudentModule
+from .models import StudentModule, StudentModuleAnswer, AnswerDistributionWatermark
 from .module_render import get_module_for_descriptor
 
 log = logging.getLogger("edx.courseware")
 
+# Number of StudentModule entries processed at a time by update_answer_distributions.
+ANSWER_DISTRIBUTION_BATCH_SIZE = 1000
+
+# StudentModule entries modified this long before the watermark are looked at
+# again by update_answer_distributions, so that entries saved by transactions
+# that committed after later entries had been processed are not missed.
+ANSWER_DISTRIBUTION_WATERMARK_OVERLAP = timedelta(minutes=5)
+
 
 def yield_dynamic_descriptor_descendents(descriptor, module_creator):
     """
@@ -50,6 +61,117 @@ def yield_dynamic_descriptor_descendents(descriptor, module_creator):
         yield next_descriptor
 
 
+def _student_module_answers(course_id, module):
+    """
+    Return a list of StudentModuleAnswer instances for the answers found in
+    `module`, a dict of StudentModule values.
+
+    Only submitted problems (i.e. those with a non-null grade) have answers.
+    Empty Loncapa problem state that gets created from running the progress
+    page is not counted, nor is state that can't be parsed.
+    """
+    if module['grade'] is None:
+        return []
+    try:
+        state_dict = json.loads(module['state']) if module['state'] else {}
+        raw_answers = state_dict.get("student_answers", {})
+    except ValueError:
+        log.error(
+            "Answer Distribution: Could not parse module state for " +
+            "StudentModule id={}, course={}".format(module['id'], course_id)
+        )
+        return []
+
+    # Each problem part has an ID that is derived from the
+    # module.module_state_key (with some suffix appended)
+    # Convert whatever raw answers we have (numbers, unicode, None, etc.)
+    # to be unicode values. Note that if we get a string, it's always
+    # unicode and not str -- state comes from the json decoder, and that
+    # always returns unicode for strings.
+    return [
+        StudentModuleAnswer(
+            student_module_id=module['id'],
+            course_id=course_id,
+            module_state_key=module['module_state_key'],
+            part_id=problem_part_id,
+            answer=unicode(raw_answer),
+        )
+        for problem_part_id, raw_answer in raw_answers.items()
+    ]
+
+
+@transaction.commit_on_success
+def _update_student_module_answers(course_id, modules):
+    """
+    Replace the StudentModuleAnswer rows for each of `modules` with the answers in their current state.
+    """
+    StudentModuleAnswer.objects.filter(student_module__in=[module['id'] for module in modules]).delete()
+    answers = []
+    for module in modules:
+        answers.extend(_student_module_answers(course_id, module))
+    StudentModuleAnswer.objects.bulk_create(answers)
+
+
+def update_answer_distributions(course_id, batch_size=ANSWER_DISTRIBUTION_BATCH_SIZE):
+    """
+    Bring the StudentModuleAnswer rows for a course up to date with its StudentModule entries.
+
+    Only the problem StudentModule entries that were modified since the course's
+    AnswerDistributionWatermark are processed, in order of modification and
+    `batch_size` at a time.  The watermark is saved after each batch, so that an
+    interrupted update picks up where it left off the next time it is run.
+    The first update for a course processes all of its problems.
+
+    StudentModule entries are read from a read-replica database if one is available.
+
+    Returns the number of StudentModule entries processed.
+    """
+    watermark, _ = AnswerDistributionWatermark.objects.get_or_create(course_id=course_id)
+    modules = use_read_replica_if_available(
+        StudentModule.objects.filter(course_id=course_id, module_type='problem')
+    )
+    if watermark.modified is not None:
+        modules = modules.filter(modified__gte=watermark.modified - ANSWER_DISTRIBUTION_WATERMARK_OVERLAP)
+    modules = modules.order_by('modified', 'id').values('id', 'module_state_key', 'grade', 'state', 'modified')
+
+    num_processed = 0
+    batch = []
+    while True:
+        batch_query = modules
+        if batch:
+            # Continue after the last entry of the previous batch.
+            last_modified, last_id = batch[-1]['modified'], batch[-1]['id']
+            batch_query = batch_query.filter(Q(modified__gt=last_modified) | Q(modified=last_modified, id__gt=last_id))
+        batch = list(batch_query[:batch_size])
+        if not batch:
+            break
+
+        _update_student_module_answers(course_id, batch)
+        num_processed += len(batch)
+        watermark.modified = batch[-1]['modified']
+        watermark.save()
+        if len(batch) < batch_size:
+            break
+
+    return num_processed
+
+
+def _problem_url_and_display_names(course_id):
+    """
+    Return a dict mapping the module_state_key of each problem in the course
+    to the problem's url_name and display_name.
+
+    All the problems are fetched with a single modulestore query.  This method
+    ignores permissions.
+    """
+    course_location = CourseDescriptor.id_to_location(course_id)
+    problem_location = course_location.replace(category='problem', name=None)
+    return dict(
+        (problem.location.url(), (problem.url_name, problem.display_name_with_default))
+        for problem in modulestore().get_items(problem_location, course_id=course_id)
+    )
+
+
 def answer_distributions(course_id):
     """
     Given a course_id, return answer distributions in the form of a dictionary
@@ -57,8 +179,10 @@ def answer_distributions(course_id):
 
       (problem url_name, problem display_name, problem_id) -> {dict: answer -> count}
 
-    Answer distributions are found by iterating through all StudentModule
-    entries for a given course with type="problem" and a grade that is not null.
+    Answer distributions are counted from the StudentModuleAnswer rows for the
+    course, which are first brought up to date with update_answer_distributions.
+    These hold the answers of all StudentModule entries for a given course with
+    type="problem" and a grade that is not null.
     This means that we only count LoncapaProblems that people have submitted.
     Other types of items like ORA or sequences will not be collected. Empty
     Loncapa problem state that gets created from runnig the progress page is
@@ -79,73 +203,32 @@ def answer_distributions(course_id):
 
     This method will try to use a read-replica database if one is available.
     """
-    # dict: { module.module_state_key : (url_name, display_name) }
-    state_keys_to_problem_info = {}  # For caching, used by url_and_display_name
-
-    def url_and_display_name(module_state_key):
-        """
-        For a given module_state_key, return the problem's url and display_name.
-        Handle modulestore access and caching. This method ignores permissions.
-        May throw an ItemNotFoundError if there is no content that corresponds
-        to this module_state_key.
-        """
-        problem_store = modulestore()
-        if module_state_key not in state_keys_to_problem_info:
-            problems = problem_store.get_items(module_state_key, course_id=course_id, depth=1)
-            if not problems:
-                # Likely means that the problem was deleted from the course
-                # after the student had answered. We log this suspicion where
-                # this exception is caught.
-                raise ItemNotFoundError(
-                    "Answer Distribution: Module {} not found for course {}"
-                    .format(module_state_key, course_id)
-                )
-            problem = problems[0]
-            problem_info = (problem.url_name, problem.display_name_with_default)
-            state_keys_to_problem_info[module_state_key] = problem_info
+    update_answer_distributions(course_id)
 
-        return state_keys_to_problem_info[module_state_key]
+    # dict: { module.module_state_key : (url_name, display_name) }
+    state_keys_to_problem_info = _problem_url_and_display_names(course_id)
 
-    # Iterate through all problems submitted for this course in no particular
-    # order, and build up our answer_counts dict that we will eventually return
     answer_counts = defaultdict(lambda: defaultdict(int))
-    for module in StudentModule.all_submitted_problems_read_only(course_id):
-        try:
-            state_dict = json.loads(module.state) if module.state else {}
-            raw_answers = state_dict.get("student_answers", {})
-        except ValueError:
-            log.error(
-                "Answer Distribution: Could not parse module state for " +
-                "StudentModule id={}, course={}".format(module.id, course_id)
-            )
+    counts = StudentModuleAnswer.objects.filter(
+        course_id=course_id
+    ).values('module_state_key', 'part_id', 'answer').annotate(answer_count=Count('id')).order_by()
+    for count in counts:
+        module_state_key = count['module_state_key']
+        if module_state_key not in state_keys_to_problem_info:
+            msg = "Answer Distribution: Item {} referenced in StudentModule entries " + \
+                  "in course {} not found; " + \
+                  "This can happen if a student answered a question that " + \
+                  "was later deleted from the course. These answers will be " + \
+                  "omitted from the answer distribution CSV."
+            log.warning(msg.format(module_state_key, course_id))
             continue
 
-        # Each problem part has an ID that is derived from the
-        # module.module_state_key (with some suffix appended)
-        for problem_part_id, raw_answer in raw_answers.items():
-            # Convert whatever raw answers we have (numbers, unicode, None, etc.)
-            # to be unicode values. Note that if we get a string, it's always
-            # unicode and not str -- state comes from the json decoder, and that
-            # always returns unicode for strings.
-            answer = unicode(raw_answer)
-
-            try:
-                url, display_name = url_and_display_name(module.module_state_key)
-            except ItemNotFoundError:
-                msg = "Answer Distribution: Item {} referenced in StudentModule {} " + \
-                      "for user {} in course {} not found; " + \
-                      "This can happen if a student answered a question that " + \
-                      "was later deleted from the course. This answer will be " + \
-                      "omitted from the answer distribution CSV."
-                log.warning(
-                    msg.format(module.module_state_key, module.id, module.student_id, course_id)
-                )
-                continue
-
-            answer_counts[(url, display_name, problem_part_id)][answer] += 1
+        url, display_name = state_keys_to_problem_info[module_state_key]
+        answer_counts[(url, display_name, count['part_id'])][count['answer']] += count['answer_count']
 
     return answer_counts
 
+
 @transaction.commit_manually
 def grade(student, request, course, keep_raw_scores=False):
     """
@@ -519,15 +602,15 @@ def iterate_grades_for(course_id, students):
     - raw_scores: contains scores for every graded module
     """
     course = courses.get_course_by_id(course_id)
-
-    # We make a fake request because grading code expects to be able to look at
-    # the request. We have to attach the correct user to the request before
-    # grading that student.
-    request = RequestFactory().get('/')
+    cache_anonymous_ids_for_course(course_id)
 
     for student in students:
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=['action:{}'.format(course_id)]):
             try:
+                # We make a fake request because grading code expects to be able to look at
+                # the request. Each student gets their own, so that what is kept on the request
+                # while grading them (such as their module runtime) doesn't pile up.
+                request = RequestFactory().get('/')
                 request.user = student
                 # Grading calls problem rendering, which calls masquerading,
                 # which checks session vars -- thus the empty session dict below.
@@ -0,0 +1,37 @@
+# pylint: disable=missing-docstring
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courseware.grades import update_answer_distributions, ANSWER_DISTRIBUTION_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Bring the stored answer distributions of the given courses up to date.
+
+    Only the problem state modified since the last update of each course is
+    processed.  Progress is saved as the update goes, so an interrupted update
+    can be resumed by running the command again.
+
+    """
+    args = '<course_id course_id ...>'
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    dest='batch_size',
+                    default=ANSWER_DISTRIBUTION_BATCH_SIZE,
+                    help='Number of student modules to process at a time'),
+    )
+
+    def handle(self, *args, **options):
+        if not args:
+            raise CommandError("At least one course_id must be specified.")
+
+        for course_id in args:
+            num_processed = update_answer_distributions(course_id, batch_size=options['batch_size'])
+            self.stdout.write("{}: processed {} student modules\n".format(course_id, num_processed))
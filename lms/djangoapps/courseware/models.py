@@ -13,11 +13,12 @@ ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
 from django.contrib.auth.models import User
-from django.conf import settings
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from util.query import use_read_replica_if_available
+
 
 class StudentModule(models.Model):
     """
@@ -72,10 +73,7 @@ class StudentModule(models.Model):
             module_type='problem',
             grade__isnull=False
         )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
+        return use_read_replica_if_available(queryset)
 
     def __repr__(self):
         return 'StudentModule<%r>' % ({
@@ -121,6 +119,72 @@ class StudentModuleHistory(models.Model):
             history_entry.save()
 
 
+class StudentModuleAnswer(models.Model):
+    """
+    The answer given to one part of a problem, as found in the state of a StudentModule.
+
+    These rows are kept up to date with StudentModule by
+    courseware.grades.update_answer_distributions, so that answer distributions
+    can be counted by the database instead of by parsing the state of every
+    submitted problem in a course.
+    """
+    student_module = models.ForeignKey(StudentModule, db_index=True)
+    course_id = models.CharField(max_length=255, db_index=True)
+    module_state_key = models.CharField(max_length=255, db_column='module_id')
+    part_id = models.CharField(max_length=255)
+    answer = models.TextField()
+
+    def __repr__(self):
+        return 'StudentModuleAnswer<%r>' % ({
+            'course_id': self.course_id,
+            'module_state_key': self.module_state_key,
+            'part_id': self.part_id,
+            'answer': self.answer[:20],
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+
+class AnswerDistributionWatermark(models.Model):
+    """
+    Records how far the StudentModuleAnswer rows of a course have been brought up to date.
+
+    `modified` is the latest StudentModule.modified value that has been processed.
+    """
+    course_id = models.CharField(max_length=255, unique=True)
+    modified = models.DateTimeField(null=True, blank=True)
+
+    def __unicode__(self):
+        return "[AnswerDistributionWatermark] %s: %s" % (self.course_id, self.modified)
+
+
+class CourseMetricsSnapshot(models.Model):
+    """
+    Aggregates of the StudentModule entries of a course, for display on the instructor dashboard.
+
+    The aggregates are kept up to date by class_dashboard.dashboard_data.refresh_course_metrics,
+    which only recomputes those for modules that have StudentModule entries modified since
+    `watermark`.  The fields holding the aggregates and the course structure are JSON.
+    """
+    course_id = models.CharField(max_length=255, unique=True)
+
+    # The latest StudentModule.modified value included in the aggregates.
+    watermark = models.DateTimeField(null=True, blank=True)
+
+    # The sections, subsections, units and problems of the course, as needed to lay out the metrics.
+    structure = models.TextField(default='[]')
+    # dict mapping problem module_state_key to its 'max_grade' and 'grade_distrib'.
+    problem_grade_distrib = models.TextField(default='{}')
+    # dict mapping sequential module_state_key to the number of students that opened it.
+    sequential_open_distrib = models.TextField(default='{}')
+
+    updated = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __unicode__(self):
+        return "[CourseMetricsSnapshot] %s: %s" % (self.course_id, self.watermark)
+
+
 class XModuleUserStateSummaryField(models.Model):
     """
     Stores data set in the Scope.user_state_summary scope by an xmodule field
@@ -13,13 +13,19 @@ from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.db import transaction
 from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.translation import ugettext
 from django.views.decorators.csrf import csrf_exempt
 
+from capa.correctmap import CorrectMap
+from capa.responsetypes import CodeResponse
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
 from courseware.masquerade import setup_masquerade
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
+from courseware.models import StudentModule, StudentModuleHistory
 from lms.lib.xblock.field_data import LmsFieldData
 from lms.lib.xblock.runtime import LmsModuleSystem, unquote_slashes
 from edxmako.shortcuts import render_to_string
@@ -31,6 +37,7 @@ from xblock.fields import Scope
 from xblock.runtime import KvsFieldData, KeyValueStore
 from xblock.exceptions import NoSuchHandlerError
 from xblock.django.request import django_to_webob_request, webob_to_django_response
+from xmodule import block_registry
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
 from xmodule.modulestore import Location
@@ -39,7 +46,9 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
 from xmodule_modifiers import replace_course_urls, replace_jump_to_id_urls, replace_static_urls, add_staff_debug_info, wrap_xblock
 from xmodule.lti_module import LTIModule
-from xmodule.x_module import XModuleDescriptor
+from xmodule.x_module import (
+    XModuleDescriptor, HANDLER_STATE_NONE, HANDLER_STATE_SELF, HANDLER_STATE_CHILDREN, HANDLER_STATE_SUBTREE
+)
 
 from util.json_request import JsonResponse
 from util.sandboxing import can_execute_unsafe_code
@@ -72,6 +81,90 @@ def make_track_function(request):
     return function
 
 
+def _display_descriptors(descriptor):
+    """
+    Returns the descriptors which display immediately inside descriptor, as get_display_items
+    does for its module, but without binding anything to a user.
+
+    Every child descriptor displays itself, as XModuleMixin.displayable_items has it, unless
+    it has dynamic children (an ABTest shows the children of the user's group): then what
+    displays depends on the user, and None is returned.
+    """
+    items = []
+    for child in descriptor.get_children():
+        if child.has_dynamic_children():
+            return None
+        items.append(child)
+    return items
+
+
+def _toc_skeleton(course):
+    """
+    Returns the parts of the table of contents of course which are the same for every user:
+    a list with, for each chapter that isn't hidden from the toc, a dict of its descriptor,
+    display_name and url_name, and its sections, a list of the same for each section that
+    isn't hidden, along with its format, due date and whether it is graded.
+
+    It is only read from the descriptors, without binding them to a user or checking any
+    access, and kept on the course descriptor, so it is built once per version of the course
+    that gets loaded. Returns None if what the course displays depends on the user.
+    """
+    skeleton = getattr(course, '_toc_skeleton', None)
+    if skeleton is not None:
+        return skeleton
+
+    chapters = _display_descriptors(course)
+    if chapters is None:
+        return None
+
+    skeleton = []
+    for chapter in chapters:
+        if chapter.hide_from_toc:
+            continue
+
+        sections = _display_descriptors(chapter)
+        if sections is None:
+            return None
+
+        skeleton.append({
+            'descriptor': chapter,
+            'display_name': chapter.display_name_with_default,
+            'url_name': chapter.url_name,
+            'sections': [
+                {
+                    'descriptor': section,
+                    'display_name': section.display_name_with_default,
+                    'url_name': section.url_name,
+                    'format': section.format if section.format is not None else '',
+                    'due': section.due,
+                    'graded': section.graded,
+                }
+                for section in sections
+                if not section.hide_from_toc
+            ],
+        })
+
+    course._toc_skeleton = skeleton  # pylint: disable=protected-access
+    return skeleton
+
+
+def _extended_due(user, section, field_data_cache):
+    """
+    Returns the due date extension the user was granted on section, if any.
+    """
+    key = KeyValueStore.Key(
+        scope=Scope.user_state,
+        user_id=user.id,
+        block_scope_id=section.location,
+        field_name='extended_due'
+    )
+    try:
+        value = DjangoKeyValueStore(field_data_cache).get(key)
+    except KeyError:
+        return None
+    return section.fields['extended_due'].from_json(value)
+
+
 def toc_for_course(user, request, course, active_chapter, active_section, field_data_cache):
     '''
     Create a table of contents from the module store
@@ -90,12 +183,63 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
 
     chapters with name 'hidden' are skipped.
 
+    The parts which are the same for everyone come from _toc_skeleton: only the
+    access checks, due date extensions and active flags are worked out per user.
+    Courses whose chapters or sections depend on the user are bound to the user instead.
+
     NOTE: assumes that if we got this far, user has access to course.  Returns
     None if this is not the case.
 
     field_data_cache must include data from the course module and 2 levels of its descendents
     '''
 
+    # allow course staff to masquerade as student
+    if has_access(user, course, 'staff', course.id):
+        setup_masquerade(request, True)
+
+    if not has_access(user, course, 'load', course.id):
+        return None
+
+    skeleton = _toc_skeleton(course)
+    if skeleton is None:
+        return _bound_toc_for_course(user, request, course, active_chapter, active_section, field_data_cache)
+
+    chapters = list()
+    for chapter in skeleton:
+        if not has_access(user, chapter['descriptor'], 'load', course.id):
+            continue
+
+        sections = list()
+        for section in chapter['sections']:
+            if not has_access(user, section['descriptor'], 'load', course.id):
+                continue
+
+            active = (chapter['url_name'] == active_chapter and
+                      section['url_name'] == active_section)
+
+            sections.append({'display_name': section['display_name'],
+                             'url_name': section['url_name'],
+                             'format': section['format'],
+                             'due': get_extended_due_date({
+                                 'due': section['due'],
+                                 'extended_due': _extended_due(user, section['descriptor'], field_data_cache),
+                             }),
+                             'active': active,
+                             'graded': section['graded'],
+                             })
+
+        chapters.append({'display_name': chapter['display_name'],
+                         'url_name': chapter['url_name'],
+                         'sections': sections,
+                         'active': chapter['url_name'] == active_chapter})
+    return chapters
+
+
+def _bound_toc_for_course(user, request, course, active_chapter, active_section, field_data_cache):
+    """
+    Returns the table of contents of course, as toc_for_course does, by binding the course,
+    its chapters and its sections to the user.
+    """
     course_module = get_module_for_descriptor(user, request, course, field_data_cache, course.id)
     if course_module is None:
         return None
@@ -195,19 +339,24 @@ def get_module_for_descriptor(user, request, descriptor, field_data_cache, cours
     """
     Implements get_module, extracting out the request-specific functionality.
 
+    The ModuleSystemContext used to bind descriptors is kept on the request, so that all the
+    descriptors bound for the same user and course while handling it share one.
+
     See get_module() docstring for further details.
     """
     # allow course staff to masquerade as student
     if has_access(user, descriptor, 'staff', course_id):
         setup_masquerade(request, True)
 
-    track_function = make_track_function(request)
-    xqueue_callback_url_prefix = get_xqueue_callback_url_prefix(request)
-
-    return get_module_for_descriptor_internal(user, descriptor, field_data_cache, course_id,
-                                              track_function, xqueue_callback_url_prefix,
-                                              position, wrap_xmodule_display, grade_bucket_type,
-                                              static_asset_path)
+    contexts = vars(request).setdefault('_module_system_contexts', {})
+    key = (user.id, course_id, field_data_cache, position, wrap_xmodule_display, grade_bucket_type, static_asset_path)
+    if key not in contexts:
+        contexts[key] = ModuleSystemContext(
+            user, field_data_cache, course_id,
+            make_track_function(request), get_xqueue_callback_url_prefix(request),
+            position, wrap_xmodule_display, grade_bucket_type, static_asset_path
+        )
+    return contexts[key].get_module(descriptor)
 
 
 def get_module_for_descriptor_internal(user, descriptor, field_data_cache, course_id,
@@ -219,241 +368,318 @@ def get_module_for_descriptor_internal(user, descriptor, field_data_cache, cours
 
     See get_module() docstring for further details.
     """
+    context = ModuleSystemContext(
+        user, field_data_cache, course_id, track_function, xqueue_callback_url_prefix,
+        position, wrap_xmodule_display, grade_bucket_type, static_asset_path
+    )
+    return context.get_module(descriptor)
 
-    # Do not check access when it's a noauth request.
-    if getattr(user, 'known', True):
-        # Short circuit--if the user shouldn't have access, bail without doing any work
-        if not has_access(user, descriptor, 'load', course_id):
-            return None
 
-    student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
+class ModuleSystemContext(object):
+    """
+    The parts of the runtime for binding descriptors for `user` in the course `course_id` which
+    don't depend on the descriptor being bound.
 
+    They are set up once, and shared by every descriptor bound through the context, including the
+    children loaded through the runtime's get_module. Each descriptor still gets its own
+    LmsModuleSystem, since XModules keep per-block state on it (their xqueue callback, anonymous
+    student id, xmodule_instance...), but it is only a thin wrapper around the shared pieces.
+    """
+    def __init__(self, user, field_data_cache, course_id, track_function, xqueue_callback_url_prefix,
+                 position=None, wrap_xmodule_display=True, grade_bucket_type=None, static_asset_path=''):
+        self.user = user
+        self.field_data_cache = field_data_cache
+        self.course_id = course_id
+        self.track_function = track_function
+        self.xqueue_callback_url_prefix = xqueue_callback_url_prefix
+        self.position = position
+        self.wrap_xmodule_display = wrap_xmodule_display
+        self.grade_bucket_type = grade_bucket_type
+        self.static_asset_path = static_asset_path
+
+        self.student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
+        self.i18n_service = ModuleI18nService()
+        self.jump_to_id_base_url = reverse('jump_to_id', kwargs={'course_id': course_id, 'module_id': ''})
+        self.replace_course_urls = partial(
+            static_replace.replace_course_urls,
+            course_id=course_id
+        )
+        self.replace_jump_to_id_urls = partial(
+            static_replace.replace_jump_to_id_urls,
+            course_id=course_id,
+            jump_to_id_base_url=self.jump_to_id_base_url
+        )
+
+        self._is_staff = None
+        self._user_role = None
+        self._anonymous_student_ids = {}
+        self._url_rewriting = {}
+
+    def is_staff(self, descriptor):
+        """
+        Returns whether the user has staff access to descriptor. Staff access is granted per course,
+        so it is only checked once.
+        """
+        if self._is_staff is None:
+            self._is_staff = has_access(self.user, descriptor.location, 'staff', self.course_id)
+        return self._is_staff
+
+    def get_user_role(self):
+        """
+        Returns the role of the user in the course, as given by courseware.access.get_user_role.
+        """
+        if self._user_role is None:
+            self._user_role = get_user_role(self.user, self.course_id)
+        return self._user_role
+
+    def can_execute_unsafe_code(self):
+        """
+        Returns whether the course may execute unsafe code.
+        """
+        return can_execute_unsafe_code(self.course_id)
+
+    def anonymous_student_id(self, descriptor):
+        """
+        Returns the anonymous id of the user to give to descriptor.
+        """
+        # These modules store data using the anonymous_student_id as a key.
+        # To prevent loss of data, we will continue to provide old modules with
+        # the per-student anonymized id (as we have in the past),
+        # while giving selected modules a per-course anonymized id.
+        # As we have the time to manually test more modules, we can add to the list
+        # of modules that get the per-course anonymized id.
+        is_pure_xblock = isinstance(descriptor, XBlock) and not isinstance(descriptor, XModuleDescriptor)
+        module_class = getattr(descriptor, 'module_class', None)
+        is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
+        anonymous_id_course_id = self.course_id if is_pure_xblock or is_lti_module else ''
+
+        if anonymous_id_course_id not in self._anonymous_student_ids:
+            self._anonymous_student_ids[anonymous_id_course_id] = anonymous_id_for_user(
+                self.user, anonymous_id_course_id
+            )
+        return self._anonymous_student_ids[anonymous_id_course_id]
+
+    def url_rewriting(self, descriptor):
+        """
+        Returns the replace_urls function, the list of block wrappers, and the prefix of the keys
+        renderings are cached under, for descriptor. They only depend on where its static content lives.
+        """
+        data_dir = getattr(descriptor, 'data_dir', None)
+        static_asset_path = self.static_asset_path or descriptor.static_asset_path
+        key = (data_dir, static_asset_path)
+        if key in self._url_rewriting:
+            return self._url_rewriting[key]
 
-    def make_xqueue_callback(dispatch='score_update'):
-        # Fully qualified callback URL for external queueing system
+        # TODO (cpennington): This should be removed when all html from
+        # a module is coming through get_html and is therefore covered
+        # by the replace_static_urls code below
+        replace_urls = partial(
+            static_replace.replace_static_urls,
+            data_directory=data_dir,
+            course_id=self.course_id,
+            static_asset_path=static_asset_path,
+        )
+
+        # Build a list of wrapping functions that will be applied in order
+        # to the Fragment content coming out of the xblocks that are about to be rendered.
+        block_wrappers = []
+
+        # Wrap the output display in a single div to allow for the XModule
+        # javascript to be bound correctly
+        if self.wrap_xmodule_display is True:
+            block_wrappers.append(partial(wrap_xblock, 'LmsRuntime', extra_data={'course-id': self.course_id}))
+
+        # TODO (cpennington): When modules are shared between courses, the static
+        # prefix is going to have to be specific to the module, not the directory
+        # that the xml was loaded from
+
+        # Rewrite urls beginning in /static to point to course-specific content
+        block_wrappers.append(partial(
+            replace_static_urls,
+            data_dir,
+            course_id=self.course_id,
+            static_asset_path=static_asset_path
+        ))
+
+        # Allow URLs of the form '/course/' refer to the root of multicourse directory
+        #   hierarchy of this course
+        block_wrappers.append(partial(replace_course_urls, self.course_id))
+
+        # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
+        # is an improvement over the /course/... format for studio authored courses,
+        # because it is agnostic to course-hierarchy.
+        # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
+        # function, we just need to specify something to get the reverse() to work.
+        block_wrappers.append(partial(
+            replace_jump_to_id_urls,
+            self.course_id,
+            self.jump_to_id_base_url,
+        ))
+
+        if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
+            if self.is_staff(descriptor):
+                block_wrappers.append(partial(add_staff_debug_info, self.user))
+
+        render_cache_key_prefix = u'{}.{}.{}.{}'.format(
+            self.course_id, data_dir, static_asset_path, self.wrap_xmodule_display
+        )
+
+        self._url_rewriting[key] = (replace_urls, block_wrappers, render_cache_key_prefix)
+        return self._url_rewriting[key]
+
+    def make_xqueue_callback(self, location, dispatch='score_update'):
+        """
+        Returns the fully qualified callback URL for the external queueing system, for the
+        module at location.
+        """
         relative_xqueue_callback_url = reverse(
             'xqueue_callback',
             kwargs=dict(
-                course_id=course_id,
-                userid=str(user.id),
-                mod_id=descriptor.location.url(),
+                course_id=self.course_id,
+                userid=str(self.user.id),
+                mod_id=location.url(),
                 dispatch=dispatch
             ),
         )
-        return xqueue_callback_url_prefix + relative_xqueue_callback_url
-
-    # Default queuename is course-specific and is derived from the course that
-    #   contains the current module.
-    # TODO: Queuename should be derived from 'course_settings.json' of each course
-    xqueue_default_queuename = descriptor.location.org + '-' + descriptor.location.course
-
-    xqueue = {
-        'interface': xqueue_interface,
-        'construct_callback': make_xqueue_callback,
-        'default_queuename': xqueue_default_queuename.replace(' ', '_'),
-        'waittime': settings.XQUEUE_WAITTIME_BETWEEN_REQUESTS
-    }
+        return self.xqueue_callback_url_prefix + relative_xqueue_callback_url
 
-    # This is a hacky way to pass settings to the combined open ended xmodule
-    # It needs an S3 interface to upload images to S3
-    # It needs the open ended grading interface in order to get peer grading to be done
-    # this first checks to see if the descriptor is the correct one, and only sends settings if it is
-
-    # Get descriptor metadata fields indicating needs for various settings
-    needs_open_ended_interface = getattr(descriptor, "needs_open_ended_interface", False)
-    needs_s3_interface = getattr(descriptor, "needs_s3_interface", False)
-
-    # Initialize interfaces to None
-    open_ended_grading_interface = None
-    s3_interface = None
-
-    # Create interfaces if needed
-    if needs_open_ended_interface:
-        open_ended_grading_interface = settings.OPEN_ENDED_GRADING_INTERFACE
-        open_ended_grading_interface['mock_peer_grading'] = settings.MOCK_PEER_GRADING
-        open_ended_grading_interface['mock_staff_grading'] = settings.MOCK_STAFF_GRADING
-    if needs_s3_interface:
-        s3_interface = {
-            'access_key': getattr(settings, 'AWS_ACCESS_KEY_ID', ''),
-            'secret_access_key': getattr(settings, 'AWS_SECRET_ACCESS_KEY', ''),
-            'storage_bucket_name': getattr(settings, 'AWS_STORAGE_BUCKET_NAME', 'openended')
-        }
-
-    def inner_get_module(descriptor):
+    def handle_grade_event(self, location, event):
         """
-        Delegate to get_module_for_descriptor_internal() with all values except `descriptor` set.
-
-        Because it does an access check, it may return None.
+        Records the grade in `event` for the module at location.
         """
-        # TODO: fix this so that make_xqueue_callback uses the descriptor passed into
-        # inner_get_module, not the parent's callback.  Add it as an argument....
-        return get_module_for_descriptor_internal(user, descriptor, field_data_cache, course_id,
-                                                  track_function, make_xqueue_callback,
-                                                  position, wrap_xmodule_display, grade_bucket_type,
-                                                  static_asset_path)
-
-    def handle_grade_event(block, event_type, event):
-        user_id = event.get('user_id', user.id)
+        user_id = event.get('user_id', self.user.id)
 
         # Construct the key for the module
         key = KeyValueStore.Key(
             scope=Scope.user_state,
             user_id=user_id,
-            block_scope_id=descriptor.location,
+            block_scope_id=location,
             field_name='grade'
         )
 
-        student_module = field_data_cache.find_or_create(key)
+        student_module = self.field_data_cache.find_or_create(key)
         # Update the grades
         student_module.grade = event.get('value')
         student_module.max_grade = event.get('max_value')
         # Save all changes to the underlying KeyValueStore
         student_module.save()
 
-        # Bin score into range and increment stats
-        score_bucket = get_score_bucket(student_module.grade, student_module.max_grade)
-        course_id_dict = Location.parse_course_id(course_id)
-
-        tags = [
-            u"org:{org}".format(**course_id_dict),
-            u"course:{course}".format(**course_id_dict),
-            u"run:{name}".format(**course_id_dict),
-            u"score_bucket:{0}".format(score_bucket)
-        ]
-
-        if grade_bucket_type is not None:
-            tags.append('type:%s' % grade_bucket_type)
-
-        dog_stats_api.increment("lms.courseware.question_answered", tags=tags)
+        _record_question_answered(
+            self.course_id, student_module.grade, student_module.max_grade, self.grade_bucket_type
+        )
 
-    def publish(block, event_type, event):
+    def publish(self, location, block, event_type, event):  # pylint: disable=unused-argument
         """A function that allows XModules to publish events."""
         if event_type == 'grade':
-            handle_grade_event(block, event_type, event)
+            self.handle_grade_event(location, event)
         else:
-            track_function(event_type, event)
-
-    # Build a list of wrapping functions that will be applied in order
-    # to the Fragment content coming out of the xblocks that are about to be rendered.
-    block_wrappers = []
-
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(wrap_xblock, 'LmsRuntime', extra_data={'course-id': course_id}))
-
-    # TODO (cpennington): When modules are shared between courses, the static
-    # prefix is going to have to be specific to the module, not the directory
-    # that the xml was loaded from
-
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
-    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
-    # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id, 'module_id': ''}),
-    ))
-
-    if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
-        if has_access(user, descriptor, 'staff', course_id):
-            block_wrappers.append(partial(add_staff_debug_info, user))
-
-    # These modules store data using the anonymous_student_id as a key.
-    # To prevent loss of data, we will continue to provide old modules with
-    # the per-student anonymized id (as we have in the past),
-    # while giving selected modules a per-course anonymized id.
-    # As we have the time to manually test more modules, we can add to the list
-    # of modules that get the per-course anonymized id.
-    is_pure_xblock = isinstance(descriptor, XBlock) and not isinstance(descriptor, XModuleDescriptor)
-    module_class = getattr(descriptor, 'module_class', None)
-    is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
-    if is_pure_xblock or is_lti_module:
-        anonymous_student_id = anonymous_id_for_user(user, course_id)
-    else:
-        anonymous_student_id = anonymous_id_for_user(user, '')
-
-    system = LmsModuleSystem(
-        track_function=track_function,
-        render_template=render_to_string,
-        static_url=settings.STATIC_URL,
-        xqueue=xqueue,
-        # TODO (cpennington): Figure out how to share info between systems
-        filestore=descriptor.runtime.resources_fs,
-        get_module=inner_get_module,
-        user=user,
-        debug=settings.DEBUG,
-        hostname=settings.SITE_NAME,
-        # TODO (cpennington): This should be removed when all html from
-        # a module is coming through get_html and is therefore covered
-        # by the replace_static_urls code below
-        replace_urls=partial(
-            static_replace.replace_static_urls,
-            data_directory=getattr(descriptor, 'data_dir', None),
-            course_id=course_id,
-            static_asset_path=static_asset_path or descriptor.static_asset_path,
-        ),
-        replace_course_urls=partial(
-            static_replace.replace_course_urls,
-            course_id=course_id
-        ),
-        replace_jump_to_id_urls=partial(
-            static_replace.replace_jump_to_id_urls,
-            course_id=course_id,
-            jump_to_id_base_url=reverse('jump_to_id', kwargs={'course_id': course_id, 'module_id': ''})
-        ),
-        node_path=settings.NODE_PATH,
-        publish=publish,
-        anonymous_student_id=anonymous_student_id,
-        course_id=course_id,
-        open_ended_grading_interface=open_ended_grading_interface,
-        s3_interface=s3_interface,
-        cache=cache,
-        can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
-        # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
-        mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
-        wrappers=block_wrappers,
-        get_real_user=user_by_anonymous_id,
-        services={
-            'i18n': ModuleI18nService(),
-        },
-        get_user_role=lambda: get_user_role(user, course_id),
-        descriptor_runtime=descriptor.runtime,
-    )
+            self.track_function(event_type, event)
+
+    def get_module(self, descriptor):
+        """
+        Binds descriptor to the user, and returns it.
 
-    # pass position specified in URL to module through ModuleSystem
-    system.set('position', position)
-    if settings.FEATURES.get('ENABLE_PSYCHOMETRICS'):
-        system.set(
-            'psychometrics_handler',  # set callback for updating PsychometricsData
-            make_psychometrics_data_update_handler(course_id, user, descriptor.location.url())
+        Because it does an access check, it may return None.
+        """
+        # Do not check access when it's a noauth request.
+        if getattr(self.user, 'known', True):
+            # Short circuit--if the user shouldn't have access, bail without doing any work
+            if not has_access(self.user, descriptor, 'load', self.course_id):
+                return None
+
+        # Default queuename is course-specific and is derived from the course that
+        #   contains the current module.
+        # TODO: Queuename should be derived from 'course_settings.json' of each course
+        xqueue_default_queuename = descriptor.location.org + '-' + descriptor.location.course
+
+        xqueue = {
+            'interface': xqueue_interface,
+            'construct_callback': partial(self.make_xqueue_callback, descriptor.location),
+            'default_queuename': xqueue_default_queuename.replace(' ', '_'),
+            'waittime': settings.XQUEUE_WAITTIME_BETWEEN_REQUESTS
+        }
+
+        # This is a hacky way to pass settings to the combined open ended xmodule
+        # It needs an S3 interface to upload images to S3
+        # It needs the open ended grading interface in order to get peer grading to be done
+        # this first checks to see if the descriptor is the correct one, and only sends settings if it is
+
+        # Get descriptor metadata fields indicating needs for various settings
+        needs_open_ended_interface = getattr(descriptor, "needs_open_ended_interface", False)
+        needs_s3_interface = getattr(descriptor, "needs_s3_interface", False)
+
+        # Initialize interfaces to None
+        open_ended_grading_interface = None
+        s3_interface = None
+
+        # Create interfaces if needed
+        if needs_open_ended_interface:
+            open_ended_grading_interface = settings.OPEN_ENDED_GRADING_INTERFACE
+            open_ended_grading_interface['mock_peer_grading'] = settings.MOCK_PEER_GRADING
+            open_ended_grading_interface['mock_staff_grading'] = settings.MOCK_STAFF_GRADING
+        if needs_s3_interface:
+            s3_interface = {
+                'access_key': getattr(settings, 'AWS_ACCESS_KEY_ID', ''),
+                'secret_access_key': getattr(settings, 'AWS_SECRET_ACCESS_KEY', ''),
+                'storage_bucket_name': getattr(settings, 'AWS_STORAGE_BUCKET_NAME', 'openended')
+            }
+
+        replace_urls, block_wrappers, render_cache_key_prefix = self.url_rewriting(descriptor)
+
+        system = LmsModuleSystem(
+            track_function=self.track_function,
+            render_template=render_to_string,
+            static_url=settings.STATIC_URL,
+            xqueue=xqueue,
+            # TODO (cpennington): Figure out how to share info between systems
+            filestore=descriptor.runtime.resources_fs,
+            get_module=self.get_module,
+            user=self.user,
+            debug=settings.DEBUG,
+            hostname=settings.SITE_NAME,
+            replace_urls=replace_urls,
+            replace_course_urls=self.replace_course_urls,
+            replace_jump_to_id_urls=self.replace_jump_to_id_urls,
+            node_path=settings.NODE_PATH,
+            publish=partial(self.publish, descriptor.location),
+            anonymous_student_id=self.anonymous_student_id(descriptor),
+            course_id=self.course_id,
+            open_ended_grading_interface=open_ended_grading_interface,
+            s3_interface=s3_interface,
+            cache=cache,
+            can_execute_unsafe_code=self.can_execute_unsafe_code,
+            # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
+            mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
+            wrappers=block_wrappers,
+            get_real_user=user_by_anonymous_id,
+            services={
+                'i18n': self.i18n_service,
+            },
+            get_user_role=self.get_user_role,
+            descriptor_runtime=descriptor.runtime,
+            render_cache_key_prefix=render_cache_key_prefix,
         )
 
-    system.set(u'user_is_staff', has_access(user, descriptor.location, u'staff', course_id))
+        # pass position specified in URL to module through ModuleSystem
+        system.set('position', self.position)
+        if settings.FEATURES.get('ENABLE_PSYCHOMETRICS'):
+            system.set(
+                'psychometrics_handler',  # set callback for updating PsychometricsData
+                make_psychometrics_data_update_handler(self.course_id, self.user, descriptor.location.url())
+            )
 
-    # make an ErrorDescriptor -- assuming that the descriptor's system is ok
-    if has_access(user, descriptor.location, 'staff', course_id):
-        system.error_descriptor_class = ErrorDescriptor
-    else:
-        system.error_descriptor_class = NonStaffErrorDescriptor
+        is_staff = self.is_staff(descriptor)
+        system.set(u'user_is_staff', is_staff)
 
-    descriptor.bind_for_student(system, LmsFieldData(descriptor._field_data, student_data))  # pylint: disable=protected-access
-    descriptor.scope_ids = descriptor.scope_ids._replace(user_id=user.id)  # pylint: disable=protected-access
-    return descriptor
+        # make an ErrorDescriptor -- assuming that the descriptor's system is ok
+        if is_staff:
+            system.error_descriptor_class = ErrorDescriptor
+        else:
+            system.error_descriptor_class = NonStaffErrorDescriptor
+
+        descriptor.bind_for_student(system, LmsFieldData(descriptor._field_data, self.student_data))  # pylint: disable=protected-access
+        descriptor.scope_ids = descriptor.scope_ids._replace(user_id=self.user.id)  # pylint: disable=protected-access
+        return descriptor
 
 
 def find_target_student_module(request, user_id, course_id, mod_id):
@@ -476,13 +702,119 @@ def find_target_student_module(request, user_id, course_id, mod_id):
     return instance
 
 
-@csrf_exempt
-def xqueue_callback(request, course_id, userid, mod_id, dispatch):
-    '''
-    Entry point for graded results from the queueing system.
-    '''
-    data = request.POST.copy()
+# How many times a reply from the xqueue is applied to the stored state of a problem, when that state
+# keeps changing underneath it, before giving up and loading the problem instead
+XQUEUE_SCORE_UPDATE_ATTEMPTS = 3
+
+
+def _record_question_answered(course_id, grade, max_grade, grade_bucket_type=None):
+    """
+    Bins the grade of a question into a score bucket, and counts it in the stats.
+    """
+    score_bucket = get_score_bucket(grade, max_grade)
+    course_id_dict = Location.parse_course_id(course_id)
+
+    tags = [
+        u"org:{org}".format(**course_id_dict),
+        u"course:{course}".format(**course_id_dict),
+        u"run:{name}".format(**course_id_dict),
+        u"score_bucket:{0}".format(score_bucket)
+    ]
+
+    if grade_bucket_type is not None:
+        tags.append('type:%s' % grade_bucket_type)
+
+    dog_stats_api.increment("lms.courseware.question_answered", tags=tags)
+
+
+def _update_score_from_xqueue(course_id, user_id, mod_id, queuekey, score_msg):
+    """
+    Applies the grader's reply score_msg, to the submission queued with queuekey, straight to the
+    stored correct map and grade of the problem mod_id of the user, without loading the problem.
+
+    Rather than locking the row of the problem's state while the reply is applied, the new state is
+    only written if the stored state is still the one the reply was applied to, and the reply is
+    applied again if it isn't.
+
+    Returns whether the reply was applied. It can only be applied this way to the parts of a capa
+    problem which are waiting for it, which are CodeResponses.
+    """
+    for __ in xrange(XQUEUE_SCORE_UPDATE_ATTEMPTS):
+        applied = _try_update_score_from_xqueue(course_id, user_id, mod_id, queuekey, score_msg)
+        if applied is not None:
+            return applied
+
+    log.info(u"The state of module %s for user %s kept changing, loading it to apply the xqueue reply", mod_id, user_id)
+    return False
+
+
+@transaction.commit_on_success
+def _try_update_score_from_xqueue(course_id, user_id, mod_id, queuekey, score_msg):
+    """
+    One attempt at _update_score_from_xqueue. It runs in its own transaction, so that the next
+    attempt reads the latest state.
+
+    Returns None if the state changed while the reply was being applied to it.
+    """
+    try:
+        student_module = StudentModule.objects.get(
+            course_id=course_id,
+            student_id=user_id,
+            module_state_key=mod_id,
+        )
+    except StudentModule.DoesNotExist:
+        return False
+
+    if student_module.module_type != 'problem' or student_module.max_grade is None or not student_module.state:
+        return False
+
+    state = json.loads(student_module.state)
+    correct_map = CorrectMap()
+    correct_map.set_dict(state.get('correct_map') or {})
+    answer_ids = [
+        answer_id for answer_id in correct_map
+        if correct_map.is_right_queuekey(answer_id, queuekey)
+    ]
+    if not answer_ids:
+        return False
+
+    for answer_id in answer_ids:
+        CodeResponse.apply_score_msg(correct_map, answer_id, score_msg, queuekey, ugettext)
+    state['correct_map'] = correct_map.get_dict()
+    new_state = json.dumps(state)
+
+    # The score of the problem, worked out as LoncapaProblem.get_score does
+    if state.get('student_answers'):
+        grade = sum(correct_map.get_npoints(answer_id) for answer_id in correct_map)
+    else:
+        grade = 0
+
+    # The state itself is the version checked: `modified` only has a precision of a second in MySQL
+    modified = timezone.now()
+    updated = StudentModule.objects.filter(
+        pk=student_module.pk,
+        state=student_module.state,
+    ).update(state=new_state, grade=grade, modified=modified)
+    if not updated:
+        return None
+
+    # update() doesn't send post_save, which is what records the history of a problem's state
+    StudentModuleHistory.objects.create(
+        student_module=student_module,
+        version=None,
+        created=modified,
+        state=new_state,
+        grade=grade,
+        max_grade=student_module.max_grade,
+    )
+    _record_question_answered(course_id, grade, student_module.max_grade, 'xqueue')
+    return True
+
 
+def _xqueue_header(data):
+    """
+    Returns the header of the xqueue package data, raising Http404 if the package isn't one.
+    """
     # Test xqueue package, which we expect to be:
     #   xpackage = {'xqueue_header': json.dumps({'lms_key':'secretkey',...}),
     #               'xqueue_body'  : 'Message from grader'}
@@ -493,6 +825,21 @@ def xqueue_callback(request, course_id, userid, mod_id, dispatch):
     header = json.loads(data['xqueue_header'])
     if not isinstance(header, dict) or 'lms_key' not in header:
         raise Http404
+    return header
+
+
+def _apply_xqueue_result(request, course_id, userid, mod_id, dispatch, data):
+    """
+    Applies the graded result in the xqueue package data to the module mod_id of user userid.
+
+    Replies to the score updates of CodeResponses are applied to the stored state of the problem;
+    anything else is handed to the module itself.
+    """
+    header = _xqueue_header(data)
+
+    if dispatch == 'score_update':
+        if _update_score_from_xqueue(course_id, userid, mod_id, header['lms_key'], data['xqueue_body']):
+            return
 
     instance = find_target_student_module(request, userid, course_id, mod_id)
 
@@ -511,9 +858,54 @@ def xqueue_callback(request, course_id, userid, mod_id, dispatch):
         log.exception("error processing ajax call")
         raise
 
+
+@csrf_exempt
+def xqueue_callback(request, course_id, userid, mod_id, dispatch):
+    '''
+    Entry point for graded results from the queueing system.
+    '''
+    _apply_xqueue_result(request, course_id, userid, mod_id, dispatch, request.POST.copy())
     return HttpResponse("")
 
 
+@csrf_exempt
+def xqueue_bulk_callback(request, course_id):
+    '''
+    Entry point for many graded results from the queueing system at once.
+
+    The body of the request is a JSON list of results, each a dict of the userid, mod_id and dispatch
+    that xqueue_callback takes in its url, and the xqueue_header and xqueue_body it takes in its POST.
+    Each result is applied in its own transaction, and the response is a JSON list of whether each
+    one was applied.
+    '''
+    try:
+        results = json.loads(request.body)
+    except ValueError:
+        raise Http404
+    if not isinstance(results, list):
+        raise Http404
+
+    applied = []
+    for result in results:
+        try:
+            with transaction.commit_on_success():
+                _apply_xqueue_result(
+                    request,
+                    course_id,
+                    result['userid'],
+                    result['mod_id'],
+                    result['dispatch'],
+                    dict((key, result[key]) for key in ('xqueue_header', 'xqueue_body') if key in result),
+                )
+        except Exception:  # pylint: disable=broad-except
+            log.warning(u"Could not apply xqueue result %r", result, exc_info=True)
+            applied.append(False)
+        else:
+            applied.append(True)
+
+    return JsonResponse(applied)
+
+
 @csrf_exempt
 def handle_xblock_callback_noauth(request, course_id, usage_id, handler, suffix=None):
     """
@@ -550,7 +942,7 @@ def xblock_resource(request, block_type, uri):  # pylint: disable=unused-argumen
     Return a package resource for the specified XBlock.
     """
     try:
-        xblock_class = XBlock.load_class(block_type, select=settings.XBLOCK_SELECT_FUNCTION)
+        xblock_class = block_registry.load_class(block_type, select=settings.XBLOCK_SELECT_FUNCTION)
         content = xblock_class.open_local_resource(uri)
     except IOError:
         log.info('Failed to load xblock resource', exc_info=True)
@@ -562,6 +954,30 @@ def xblock_resource(request, block_type, uri):  # pylint: disable=unused-argumen
     return HttpResponse(content, mimetype=mimetype)
 
 
+# The depth of descendents whose student state is loaded for each state a handler can declare
+HANDLER_STATE_DEPTHS = {
+    HANDLER_STATE_SELF: 0,
+    HANDLER_STATE_CHILDREN: 1,
+    HANDLER_STATE_SUBTREE: None,
+}
+
+
+def _handler_field_data_cache(course_id, user, descriptor, handler):
+    """
+    Returns a FieldDataCache with just the student state which the handler of descriptor declares
+    it needs (see xmodule.x_module.handler_state).
+    """
+    state = descriptor.get_handler_state(handler)
+    if state == HANDLER_STATE_NONE:
+        return FieldDataCache([], course_id, user)
+    return FieldDataCache.cache_for_descriptor_descendents(
+        course_id,
+        user,
+        descriptor,
+        depth=HANDLER_STATE_DEPTHS.get(state),
+    )
+
+
 def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, user):
     """
     Invoke an XBlock handler, either authenticated or not.
@@ -597,12 +1013,15 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, user):
         }
     }
 
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-        course_id,
-        user,
-        descriptor
-    )
-    instance = get_module(user, request, location, field_data_cache, course_id, grade_bucket_type='ajax')
+    field_data_cache = _handler_field_data_cache(course_id, user, descriptor, handler)
+    try:
+        instance = get_module_for_descriptor(
+            user, request, descriptor, field_data_cache, course_id, grade_bucket_type='ajax'
+        )
+    except Exception:  # pylint: disable=broad-except
+        # As in get_module, don't let this turn into a 500
+        log.exception("Error in get_module")
+        instance = None
     if instance is None:
         # Either permissions just changed, or someone is trying to be clever
         # and load something they shouldn't have access to.
@@ -1,6 +1,7 @@
 """
 Test for lms courseware app, module render unit
 """
+from datetime import datetime, timedelta
 from ddt import ddt, data
 from functools import partial
 from mock import MagicMock, patch, Mock
@@ -9,9 +10,11 @@ import json
 from django.http import Http404, HttpResponse
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
+from pytz import UTC
 
 from capa.tests.response_xml_factory import OptionResponseXMLFactory
 from xblock.field_data import FieldData
@@ -23,10 +26,12 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import ItemFactory, CourseFactory
 from xmodule.x_module import XModuleDescriptor
+from xmodule.exceptions import UndefinedContext
 
 from courseware import module_render as render
 from courseware.courses import get_course_with_access, course_image_url, get_course_info_section
 from courseware.model_data import FieldDataCache
+from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory, UserFactory
 from courseware.tests.tests import LoginEnrollmentTestCase
 from courseware.tests.modulestore_config import TEST_DATA_MIXED_MODULESTORE
@@ -93,6 +98,35 @@ class ModuleRenderTestCase(ModuleStoreTestCase, LoginEnrollmentTestCase):
         # note if the URL mapping changes then this assertion will break
         self.assertIn('/courses/' + self.course_id + '/jump_to_id/vertical_test', html)
 
+    def test_runtime_shared_within_request(self):
+        """
+        Modules loaded for the same user and course while handling a request share the parts of
+        their runtime which don't depend on the module.
+        """
+        mock_request = MagicMock()
+        mock_request.user = self.mock_user
+
+        course = get_course_with_access(self.mock_user, self.course_id, 'load')
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course_id, self.mock_user, course, depth=2)
+
+        with patch('courseware.module_render.anonymous_id_for_user', return_value='anon') as mock_anonymous_id:
+            modules = [
+                render.get_module(self.mock_user, mock_request, location, field_data_cache, self.course_id)
+                for location in (
+                    Location('i4x', 'edX', 'toy', 'html', 'toyjumpto'),
+                    Location('i4x', 'edX', 'toy', 'chapter', 'Overview'),
+                )
+            ]
+            children = modules[1].get_display_items()
+
+        self.assertEqual(mock_anonymous_id.call_count, 1)
+        self.assertTrue(children)
+        runtimes = [module.xmodule_runtime for module in modules + children]
+        self.assertEqual(len(set(runtime.get_module for runtime in runtimes)), 1)
+        self.assertEqual(len(set(id(runtime.wrappers) for runtime in runtimes)), 1)
+        self.assertEqual(len(set(id(runtime) for runtime in runtimes)), len(runtimes))
+
 
     def test_xqueue_callback_success(self):
         """
@@ -134,6 +168,77 @@ class ModuleRenderTestCase(ModuleStoreTestCase, LoginEnrollmentTestCase):
                 request = self.request_factory.post(self.callback_url, data)
                 render.xqueue_callback(request, self.course_id, self.mock_user.id, self.mock_module.id, self.dispatch)
 
+    def _queued_problem_state(self, queuekey):
+        """
+        Returns the StudentModule of a code problem waiting for the reply to the submission queued with queuekey.
+        """
+        return StudentModuleFactory.create(
+            course_id=self.course_id,
+            module_state_key='i4x://edX/toy/problem/code',
+            grade=0,
+            max_grade=1,
+            state=json.dumps({
+                'student_answers': {'i4x-edX-toy-problem-code_2_1': 'print "hello"'},
+                'correct_map': {
+                    'i4x-edX-toy-problem-code_2_1': {
+                        'correctness': 'incorrect',
+                        'queuestate': {'key': queuekey, 'time': '20140101000000'},
+                    },
+                },
+            }),
+        )
+
+    def test_xqueue_callback_score_update(self):
+        student_module = self._queued_problem_state('fake key')
+        data = {
+            'xqueue_header': json.dumps({'lms_key': 'fake key'}),
+            'xqueue_body': json.dumps({'correct': True, 'score': 1, 'msg': '<p>Well done</p>'}),
+        }
+
+        # The reply is applied to the stored state, without loading the problem
+        with patch('courseware.module_render.find_target_student_module') as get_fake_module:
+            request = self.request_factory.post(self.callback_url, data)
+            render.xqueue_callback(
+                request, self.course_id, student_module.student.id, student_module.module_state_key, self.dispatch
+            )
+        self.assertFalse(get_fake_module.called)
+
+        student_module = StudentModule.objects.get(pk=student_module.pk)
+        self.assertEqual(1, student_module.grade)
+        correct_map = json.loads(student_module.state)['correct_map']['i4x-edX-toy-problem-code_2_1']
+        self.assertEqual('correct', correct_map['correctness'])
+        self.assertIsNone(correct_map['queuestate'])
+        self.assertEqual(student_module.state, student_module.studentmodulehistory_set.latest().state)
+
+    def test_xqueue_bulk_callback(self):
+        student_module = self._queued_problem_state('fake key')
+        results = [
+            {
+                'userid': student_module.student.id,
+                'mod_id': student_module.module_state_key,
+                'dispatch': self.dispatch,
+                'xqueue_header': json.dumps({'lms_key': 'fake key'}),
+                'xqueue_body': json.dumps({'correct': False, 'score': 0, 'msg': '<p>Try again</p>'}),
+            },
+            {
+                'userid': student_module.student.id,
+                'mod_id': student_module.module_state_key,
+                'dispatch': self.dispatch,
+                'xqueue_header': '{}',
+                'xqueue_body': 'hello world',
+            },
+        ]
+        response = self.client.post(
+            reverse('xqueue_bulk_callback', kwargs={'course_id': self.course_id}),
+            json.dumps(results),
+            content_type='application/json',
+        )
+        self.assertEqual([True, False], json.loads(response.content))
+
+        state = json.loads(StudentModule.objects.get(pk=student_module.pk).state)
+        self.assertEqual('incorrect', state['correct_map']['i4x-edX-toy-problem-code_2_1']['correctness'])
+        self.assertIsNone(state['correct_map']['i4x-edX-toy-problem-code_2_1']['queuestate'])
+
     def test_get_score_bucket(self):
         self.assertEquals(render.get_score_bucket(0, 10), 'incorrect')
         self.assertEquals(render.get_score_bucket(1, 10), 'partial')
@@ -255,6 +360,23 @@ class TestHandleXBlockCallback(ModuleStoreTestCase, LoginEnrollmentTestCase):
         )
         self.assertIsInstance(response, HttpResponse)
 
+    def test_handler_state(self):
+        # goto_position only needs the sequence's own state, not that of everything in it
+        request = self.request_factory.post('dummy_url', data={'position': 1})
+        request.user = self.mock_user
+        with patch.object(
+            FieldDataCache, 'cache_for_descriptor_descendents', wraps=FieldDataCache.cache_for_descriptor_descendents
+        ) as mock_cache:
+            response = render.handle_xblock_callback(
+                request,
+                self.course_id,
+                quote_slashes(str(self.location)),
+                'xmodule_handler',
+                'goto_position',
+            )
+        self.assertIsInstance(response, HttpResponse)
+        self.assertEqual(0, mock_cache.call_args[1]['depth'])
+
     def test_bad_course_id(self):
         request = self.request_factory.post('dummy_url')
         request.user = self.mock_user
@@ -369,6 +491,57 @@ class TestTOC(TestCase):
         for toc_section in expected:
             self.assertIn(toc_section, actual)
 
+    def test_toc_from_unbound_descriptors(self):
+        request = RequestFactory().get('/')
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.toy_course.id, self.portal_user, self.toy_course, depth=2)
+        expected = render.toc_for_course(self.portal_user, request, self.toy_course, 'Overview', None, field_data_cache)
+        del self.toy_course._toc_skeleton
+
+        # Any descriptor the skeleton tried to use as a module would raise, as unbound ones do
+        with patch.object(XModuleDescriptor, '_xmodule', new=property(Mock(side_effect=UndefinedContext))):
+            actual = render.toc_for_course(self.portal_user, request, self.toy_course, 'Overview', None, field_data_cache)
+
+        self.assertEqual(expected, actual)
+        self.assertIsNotNone(self.toy_course._toc_skeleton)
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestTOCAccess(ModuleStoreTestCase):
+    """
+    Check that the Table of Contents skeleton shared between users is filtered for each of them
+    """
+    def setUp(self):
+        tomorrow = datetime.now(UTC) + timedelta(days=1)
+        course = CourseFactory.create()
+        released = ItemFactory.create(parent=course, category='chapter', display_name='Released')
+        ItemFactory.create(parent=released, category='sequential', display_name='Released Section')
+        unreleased = ItemFactory.create(parent=course, category='chapter', display_name='Unreleased', start=tomorrow)
+        ItemFactory.create(parent=unreleased, category='sequential', display_name='Unreleased Section')
+
+        self.course = modulestore().get_course(course.id)
+        self.student = UserFactory()
+        self.staff = UserFactory(is_staff=True)
+
+    def toc_chapters(self, user):
+        """
+        Returns the display names of the chapters in the Table of Contents user gets.
+        """
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course.id, user, self.course, depth=2)
+        toc = render.toc_for_course(user, RequestFactory().get('/'), self.course, None, None, field_data_cache)
+        return [chapter['display_name'] for chapter in toc]
+
+    @patch.dict('courseware.access.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_student_first(self):
+        self.assertEqual(['Released'], self.toc_chapters(self.student))
+        self.assertEqual(['Released', 'Unreleased'], self.toc_chapters(self.staff))
+
+    @patch.dict('courseware.access.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_staff_first(self):
+        self.assertEqual(['Released', 'Unreleased'], self.toc_chapters(self.staff))
+        self.assertEqual(['Released'], self.toc_chapters(self.student))
+
 
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 class TestHtmlModifiers(ModuleStoreTestCase):
@@ -508,6 +681,22 @@ class TestHtmlModifiers(ModuleStoreTestCase):
             result_fragment.content
         )
 
+    def test_render_cached(self):
+        cache.clear()
+        module = render.get_module_for_descriptor(
+            self.user, self.request, self.descriptor, self.field_data_cache, self.course.id
+        )
+        first = module.render('student_view')
+
+        module = render.get_module_for_descriptor(
+            self.user, self.request, self.descriptor, self.field_data_cache, self.course.id
+        )
+        with patch('xmodule.html_module.HtmlModule.get_html') as mock_get_html:
+            second = module.render('student_view')
+
+        self.assertFalse(mock_get_html.called)
+        self.assertEqual(first.content, second.content)
+
 
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 @patch.dict('django.conf.settings.FEATURES', {'DISPLAY_DEBUG_INFO_TO_STAFF': True, 'DISPLAY_HISTOGRAMS_TO_STAFF': True})
@@ -17,7 +17,7 @@ from django.test.utils import override_settings
 
 # Need access to internal func to put users in the right group
 from courseware import grades
-from courseware.models import StudentModule
+from courseware.models import StudentModule, StudentModuleAnswer, AnswerDistributionWatermark
 
 from xmodule.modulestore.django import modulestore, editable_modulestore
 
@@ -1017,6 +1017,29 @@ class TestAnswerDistributions(TestSubmittingProblems):
         empty_distribution = grades.answer_distributions(self.course.id)
         self.assertFalse(empty_distribution)  # should be empty
 
+    def test_incremental_update(self):
+        # Answers are extracted into StudentModuleAnswer rows in batches, and
+        # the progress made is recorded in the watermark.
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+
+        num_processed = grades.update_answer_distributions(self.course.id, batch_size=1)
+        self.assertEqual(num_processed, StudentModule.objects.filter(course_id=self.course.id, module_type='problem').count())
+        self.assertEqual(
+            sorted(StudentModuleAnswer.objects.filter(course_id=self.course.id).values_list('answer', flat=True)),
+            [u'Correct', u'Incorrect']
+        )
+        watermark = AnswerDistributionWatermark.objects.get(course_id=self.course.id)
+        self.assertIsNotNone(watermark.modified)
+
+        # A resubmission replaces the earlier answer rather than adding to it.
+        self.submit_question_answer('p2', {'2_1': u'Correct'})
+        grades.update_answer_distributions(self.course.id)
+        self.assertEqual(
+            sorted(StudentModuleAnswer.objects.filter(course_id=self.course.id).values_list('answer', flat=True)),
+            [u'Correct', u'Correct']
+        )
+
     def test_broken_state(self):
         # Missing or broken state for a problem should be skipped without
         # causing the whole answer_distribution call to explode.
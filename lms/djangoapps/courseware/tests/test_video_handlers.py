@@ -9,6 +9,7 @@ import json
 from datetime import timedelta
 from webob import Request
 
+from django.core.cache import get_cache
 from xmodule.contentstore.content import StaticContent
 from xmodule.modulestore import Location
 from xmodule.contentstore.django import contentstore
@@ -20,6 +21,7 @@ from xmodule.exceptions import NotFoundError
 from xmodule.video_module.transcripts_utils import (
     TranscriptException,
     TranscriptsGenerationException,
+    Transcript,
 )
 
 SRT_content = textwrap.dedent("""
@@ -277,6 +279,39 @@ class TestTranscriptDownloadDispatch(TestVideo):
         self.assertEqual(response.headers['Content-Type'], 'application/x-subrip; charset=utf-8')
         self.assertEqual(response.headers['Content-Disposition'], 'attachment; filename="塞.srt"')
 
+    @patch('xmodule.video_module.VideoModule.get_transcript', return_value=('Subs!', 'test_filename.srt', 'application/x-subrip; charset=utf-8'))
+    def test_download_not_modified(self, __):
+        request = Request.blank('/download')
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertIsNotNone(response.etag)
+        self.assertTrue(response.cache_control.private)
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertIsNone(response.cache_control.max_age)
+
+        request = Request.blank('/download', headers={'If-None-Match': response.headers['ETag']})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.status, '304 Not Modified')
+        self.assertEqual(response.body, '')
+
+    @patch('xmodule.video_module.VideoModule.get_transcript')
+    def test_download_after_format_switch(self, mock_get_transcript):
+        mock_get_transcript.side_effect = lambda transcript_format: (
+            'Subs in {}!'.format(transcript_format), 'test_filename.' + transcript_format, 'text/plain; charset=utf-8'
+        )
+        self.item.transcript_download_format = 'srt'
+        request = Request.blank('/download')
+        srt_response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(srt_response.body, 'Subs in srt!')
+
+        self.item.transcript_download_format = 'txt'
+        request = Request.blank('/download', headers={'If-None-Match': srt_response.headers['ETag']})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.status, '200 OK')
+        self.assertEqual(response.body, 'Subs in txt!')
+        self.assertNotEqual(srt_response.etag, response.etag)
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertIsNone(response.cache_control.max_age)
+
 
 class TestTranscriptTranslationGetDispatch(TestVideo):
     """
@@ -614,6 +649,20 @@ class TestGetTranscript(TestVideo):
         self.assertEqual(filename, self.item.sub + '.txt')
         self.assertEqual(mime_type, 'text/plain; charset=utf-8')
 
+    def test_converted_transcript_cached(self):
+        good_sjson = _create_file(content=json.dumps({'start': [270], 'end': [2720], 'text': ['Hi, welcome to Edx.']}))
+        _upload_sjson_file(good_sjson, self.item.location)
+        self.item.sub = _get_subs_id(good_sjson.name)
+
+        cache = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        with patch.object(self.item.runtime, 'cache', cache):
+            with patch.object(Transcript, 'convert', wraps=Transcript.convert) as mock_convert:
+                first = self.item.get_transcript('txt')
+                self.assertEqual(first, self.item.get_transcript('txt'))
+                self.assertEqual(1, mock_convert.call_count)
+                self.item.get_transcript('srt')
+                self.assertEqual(2, mock_convert.call_count)
+
     def test_en_with_empty_sub(self):
 
         # no self.sub, self.youttube_1_0 exist, but no file in assets
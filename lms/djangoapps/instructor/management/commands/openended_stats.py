@@ -13,7 +13,7 @@ from xmodule.open_ended_grading_classes.openendedchild import OpenEndedChild
 
 from courseware.courses import get_course
 from courseware.models import StudentModule
-from student.models import anonymous_id_for_user, CourseEnrollment
+from student.models import anonymous_id_for_user, cache_anonymous_ids_for_course, CourseEnrollment
 
 from instructor.utils import get_module_for_student
 
@@ -56,6 +56,7 @@ class Command(BaseCommand):
 
         try:
             enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
+            cache_anonymous_ids_for_course(course_id)
             print "Total students enrolled in {0}: {1}".format(course_id, enrolled_students.count())
 
             calculate_task_statistics(enrolled_students, course, location, task_number)
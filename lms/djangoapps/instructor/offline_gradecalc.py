@@ -12,6 +12,7 @@ from json import JSONEncoder
 from courseware import grades, models
 from courseware.courses import get_course_by_id
 from django.contrib.auth.models import User
+from student.models import cache_anonymous_ids_for_course
 
 from instructor.utils import DummyRequest
 
@@ -41,6 +42,7 @@ def offline_grade_calculation(course_id):
 
     print "%d enrolled students" % len(enrolled_students)
     course = get_course_by_id(course_id)
+    cache_anonymous_ids_for_course(course_id)
 
     for student in enrolled_students:
         request = DummyRequest()
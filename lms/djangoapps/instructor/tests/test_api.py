@@ -17,6 +17,7 @@ from django.http import HttpRequest, HttpResponse
 from django_comment_common.models import FORUM_ROLE_COMMUNITY_TA, Role
 from django_comment_common.utils import seed_permissions_roles
 from django.core import mail
+from django.core.cache import cache
 from django.utils.timezone import utc
 
 from django.contrib.auth.models import User
@@ -1088,6 +1089,9 @@ class TestInstructorAPILevelsDataDump(ModuleStoreTestCase, LoginEnrollmentTestCa
         for student in self.students:
             CourseEnrollment.enroll(student, self.course.id)
 
+        # distributions are cached per course, so start each test afresh:
+        cache.clear()
+
     def test_get_students_features(self):
         """
         Test that some minimum of information is formatted
@@ -1212,6 +1216,22 @@ class TestInstructorAPILevelsDataDump(ModuleStoreTestCase, LoginEnrollmentTestCa
         self.assertEqual(res_json['feature_results']['data']['no_data'], 0)
         self.assertEqual(res_json['feature_results']['choices_display_names']['no_data'], 'No Data')
 
+    def test_get_distribution_several_features(self):
+        """
+        Test that get_distribution returns results for each
+            of several requested features.
+        """
+        url = reverse('get_distribution', kwargs={'course_id': self.course.id})
+        response = self.client.get(url, {'features': 'gender,year_of_birth'})
+        self.assertEqual(response.status_code, 200)
+        res_json = json.loads(response.content)
+        self.assertEqual(set(res_json['features_results'].keys()), set(['gender', 'year_of_birth']))
+        self.assertEqual(res_json['features_results']['gender']['data']['m'], 6)
+        self.assertEqual(res_json['features_results']['year_of_birth']['type'], 'OPEN_CHOICE')
+
+        response = self.client.get(url, {'features': 'gender,robot-not-a-real-feature'})
+        self.assertEqual(response.status_code, 400)
+
     def test_get_student_progress_url(self):
         """ Test that progress_url is in the successful response. """
         url = reverse('get_student_progress_url', kwargs={'course_id': self.course.id})
@@ -20,6 +20,7 @@ from django.utils.translation import ugettext as _
 from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.utils.html import strip_tags
 from util.json_request import JsonResponse
+from util.query import read_from_replica
 
 from courseware.access import has_access
 from courseware.courses import get_course_with_access, get_course_by_id
@@ -522,6 +523,7 @@ def get_grading_config(request, course_id):
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
+@read_from_replica()
 def get_students_features(request, course_id, csv=False):  # pylint: disable=W0613, W0621
     """
     Respond with json which contains a summary of all enrolled students profile information.
@@ -537,8 +539,6 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
         'gender', 'level_of_education', 'mailing_address', 'goals'
     ]
 
-    student_data = analytics.basic.enrolled_students_features(course_id, query_features)
-
     # Scrape the query features for i18n - can't translate here because it breaks further queries
     # and how the coffeescript works. The actual translation will be done in data_download.coffee
     query_features_names = {
@@ -555,6 +555,7 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
     }
 
     if not csv:
+        student_data = analytics.basic.enrolled_students_features(course_id, query_features)
         response_payload = {
             'course_id': course_id,
             'students': student_data,
@@ -565,8 +566,9 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
         }
         return JsonResponse(response_payload)
     else:
-        header, datarows = analytics.csvs.format_dictlist(student_data, query_features)
-        return analytics.csvs.create_csv_response("enrolled_profiles.csv", header, datarows)
+        # Stream the rows, rather than building the whole roster in memory.
+        datarows = analytics.basic.iter_enrolled_students_features(course_id, query_features)
+        return analytics.csvs.create_streaming_csv_response("enrolled_profiles.csv", query_features, datarows)
 
 
 @ensure_csrf_cookie
@@ -604,6 +606,7 @@ def get_anon_ids(request, course_id):  # pylint: disable=W0613
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
+@read_from_replica()
 def get_distribution(request, course_id):
     """
     Respond with json of the distribution of students over selected features which have choices.
@@ -611,6 +614,9 @@ def get_distribution(request, course_id):
     Ask for a feature through the `feature` query parameter.
     If no `feature` is supplied, will return response with an
         empty response['feature_results'] object.
+    Several features can be asked for at once through the `features` query parameter,
+        as a comma-separated list.  Their results are returned in
+        response['features_results'], keyed by feature.
     A list of available will be available in the response['available_features']
     """
     feature = request.GET.get('feature')
@@ -619,13 +625,15 @@ def get_distribution(request, course_id):
         feature = None
     else:
         feature = str(feature)
+    features = [str(name) for name in request.GET.get('features', '').split(',') if name]
 
     available_features = analytics.distributions.AVAILABLE_PROFILE_FEATURES
     # allow None so that requests for no feature can list available features
-    if not feature in available_features + (None,):
-        return HttpResponseBadRequest(strip_tags(
-            "feature '{}' not available.".format(feature)
-        ))
+    for requested_feature in [feature] + features:
+        if not requested_feature in available_features + (None,):
+            return HttpResponseBadRequest(strip_tags(
+                "feature '{}' not available.".format(requested_feature)
+            ))
 
     response_payload = {
         'course_id': course_id,
@@ -634,22 +642,36 @@ def get_distribution(request, course_id):
         'feature_display_names': analytics.distributions.DISPLAY_NAMES,
     }
 
-    p_dist = None
-    if not feature is None:
-        p_dist = analytics.distributions.profile_distribution(course_id, feature)
-        response_payload['feature_results'] = {
-            'feature': p_dist.feature,
-            'feature_display_name': p_dist.feature_display_name,
-            'data': p_dist.data,
-            'type': p_dist.type,
-        }
-
-        if p_dist.type == 'EASY_CHOICE':
-            response_payload['feature_results']['choices_display_names'] = p_dist.choices_display_names
+    queried_features = features + ([feature] if feature is not None and feature not in features else [])
+    if queried_features:
+        p_dists = analytics.distributions.profile_distributions(course_id, queried_features)
+        if not feature is None:
+            response_payload['feature_results'] = _distribution_results(p_dists[feature])
+        if features:
+            response_payload['features_results'] = dict(
+                (name, _distribution_results(p_dists[name])) for name in features
+            )
 
     return JsonResponse(response_payload)
 
 
+def _distribution_results(p_dist):
+    """
+    Build the json-ready results for a ProfileDistribution.
+    """
+    results = {
+        'feature': p_dist.feature,
+        'feature_display_name': p_dist.feature_display_name,
+        'data': p_dist.data,
+        'type': p_dist.type,
+    }
+
+    if p_dist.type == 'EASY_CHOICE':
+        results['choices_display_names'] = p_dist.choices_display_names
+
+    return results
+
+
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @common_exceptions_400
@@ -1200,6 +1222,7 @@ def reset_due_date(request, course_id):
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
 @require_query_params('url')
+@read_from_replica()
 def show_unit_extensions(request, course_id):
     """
     Shows all of the students which have due date extensions for the given unit.
@@ -1214,6 +1237,7 @@ def show_unit_extensions(request, course_id):
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
 @require_query_params('student')
+@read_from_replica()
 def show_student_extensions(request, course_id):
     """
     Shows all of the due date extensions granted to a particular student in a
@@ -58,6 +58,7 @@ from class_dashboard import dashboard_data
 from psychometrics import psychoanalyze
 from student.models import CourseEnrollment, CourseEnrollmentAllowed, unique_id_for_user
 from student.views import course_from_id
+from util.query import read_from_replica
 import track.views
 from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
@@ -1229,6 +1230,7 @@ class GradeTable(object):
         return self.components.keys()
 
 
+@read_from_replica()
 def get_student_grade_summary_data(request, course, course_id, get_grades=True, get_raw_scores=False, use_offline=False):
     '''
     Return data arrays with student identity and grades for specified course.
@@ -1301,6 +1303,7 @@ def get_student_grade_summary_data(request, course, course_id, get_grades=True,
 
 
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
+@read_from_replica()
 def gradebook(request, course_id):
     """
     Show the gradebook for this course:
@@ -122,6 +122,9 @@ class SubtaskStatus(object):
       'retried_withmax' : number of times the subtask has been retried for conditions that
           should have a maximum count applied
       'state' : celery state of the subtask (e.g. QUEUING, PROGRESS, RETRY, FAILURE, SUCCESS)
+      'connections' : list of throughput counters, one for each concurrent connection used
+          by the subtask to process items.  Each is a dict with 'succeeded', 'failed' and
+          'duration_ms' keys, accumulated across retries.
 
     Object is not JSON-serializable, so to_dict and from_dict methods are provided so that
     it can be passed as a serializable argument to tasks (and be reconstituted within such tasks).
@@ -131,7 +134,7 @@ class SubtaskStatus(object):
     Also, we should count up "not attempted" separately from attempted/failed.
     """
 
-    def __init__(self, task_id, attempted=None, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0, state=None):
+    def __init__(self, task_id, attempted=None, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0, state=None, connections=None):
         """Construct a SubtaskStatus object."""
         self.task_id = task_id
         if attempted is not None:
@@ -144,6 +147,7 @@ class SubtaskStatus(object):
         self.retried_nomax = retried_nomax
         self.retried_withmax = retried_withmax
         self.state = state if state is not None else QUEUING
+        self.connections = connections if connections is not None else []
 
     @classmethod
     def from_dict(self, d):
@@ -182,6 +186,20 @@ class SubtaskStatus(object):
         if state is not None:
             self.state = state
 
+    def increment_connection(self, connection_index, succeeded=0, failed=0, duration_ms=0):
+        """
+        Update the throughput counters for the connection numbered `connection_index`.
+
+        Counters for a connection are created as needed, so that a subtask that is
+        retried with a different number of connections keeps its earlier counts.
+        """
+        while len(self.connections) <= connection_index:
+            self.connections.append({'succeeded': 0, 'failed': 0, 'duration_ms': 0})
+        stats = self.connections[connection_index]
+        stats['succeeded'] += succeeded
+        stats['failed'] += failed
+        stats['duration_ms'] += duration_ms
+
     def get_retry_count(self):
         """Returns the number of retries of any kind."""
         return self.retried_nomax + self.retried_withmax
@@ -240,6 +240,15 @@ FEATURES = {
 
     # Prevent concurrent logins per user
     'PREVENT_CONCURRENT_LOGINS': False,
+
+    # List courses from their summaries instead of loading every course from the modulestore.
+    # Run the refresh_course_summaries command before turning this on.
+    'ENABLE_COURSE_SUMMARIES': False,
+
+    # Do the heavy initialization of the application (XBlock classes, mako templates, modulestores)
+    # in the wsgi module, for a server which loads the application before forking its workers.
+    # See util/prefork.py for the gunicorn settings to run with.
+    'PREFORK_STARTUP': False,
 }
 
 # Used for A/B testing
@@ -491,6 +500,11 @@ SITE_NAME = "edx.org"
 HTTPS = 'on'
 ROOT_URLCONF = 'lms.urls'
 IGNORABLE_404_ENDS = ('favicon.ico')
+
+# Routes the reads done inside util.query.read_from_replica to the 'read_replica' database, if there is one
+DATABASE_ROUTERS = ['util.query.ReadReplicaRouter']
+# How many seconds the read replica may lag behind the primary before reads fall back to the primary
+READ_REPLICA_MAX_LAG = 60
 # NOTE: Please set ALLOWED_HOSTS to some sane value, as we do not allow the default '*'
 
 # Platform Email
@@ -1064,6 +1078,11 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of connections to the mail server that each bulk email subtask opens,
+# to send messages concurrently.  A subtask that has been retried for
+# rate-related reasons falls back to a single connection.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 1
+
 
 ############################## Video ##########################################
 
@@ -1112,6 +1131,7 @@ INSTALLED_APPS = (
     # Our courseware
     'circuit',
     'courseware',
+    'course_summaries',
     'student',
     'static_template_view',
     'staticbook',
@@ -47,7 +47,7 @@ LOGGING = get_logger_config(ENV_ROOT / "log",
                             debug=True)
 
 # If there is a database called 'read_replica', you can use the use_read_replica_if_available
-# function in util/query.py, which is useful for very large database reads
+# function or read_from_replica in util/query.py, which is useful for very large database reads
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -5,6 +5,7 @@ Module implementing `xblock.runtime.Runtime` functionality for the LMS
 import re
 
 from django.core.urlresolvers import reverse
+from django.utils.translation import get_language
 
 from user_api import user_service
 from xmodule.modulestore.django import modulestore
@@ -61,6 +62,11 @@ def unquote_slashes(text):
     return re.sub(r'(;;|;_)', _unquote_slashes, text)
 
 
+# How long the renderings of blocks are cached for, in seconds. They are keyed on the version
+# of the blocks, so this only bounds how long changes to course-wide settings take to show.
+RENDER_CACHE_TIMEOUT = 60 * 60
+
+
 class LmsHandlerUrls(object):
     """
     A runtime mixin that provides a handler_url function that routes
@@ -176,7 +182,12 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
     """
     ModuleSystem specialized to the LMS
     """
-    def __init__(self, **kwargs):
+    def __init__(self, render_cache_key_prefix=None, **kwargs):
+        """
+        render_cache_key_prefix identifies everything besides the block which the renderings
+        of this runtime depend on, such as its wrappers. Renderings are only cached if it is given.
+        """
+        self.render_cache_key_prefix = render_cache_key_prefix
         services = kwargs.setdefault('services', {})
         services['user_tags'] = UserTagsService(self)
         services['partitions'] = LmsPartitionService(
@@ -185,3 +196,41 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
             track_function=kwargs.get('track_function', None),
         )
         super(LmsModuleSystem, self).__init__(**kwargs)
+
+    def render(self, block, view_name, context=None):
+        """
+        Renders the view of block, reusing the cached rendering of the student_view of
+        blocks which declare it doesn't depend on the user (see
+        XModule.student_view_cache_version). The rendering is cached once all the
+        wrappers have been applied.
+        """
+        cache_key = self._render_cache_key(block, view_name, context)
+        if cache_key is None:
+            return super(LmsModuleSystem, self).render(block, view_name, context)
+
+        frag = self.cache.get(cache_key)
+        if frag is None:
+            frag = super(LmsModuleSystem, self).render(block, view_name, context)
+            self.cache.set(cache_key, frag, RENDER_CACHE_TIMEOUT)
+        return frag
+
+    def _render_cache_key(self, block, view_name, context):
+        """
+        Returns the key the rendering of view_name of block is cached under, or None
+        if it mustn't be cached.
+        """
+        if self.render_cache_key_prefix is None:
+            return None
+
+        # Staff get debugging information added to the rendering
+        if view_name != 'student_view' or context or self.get('user_is_staff'):
+            return None
+
+        cache_version = getattr(block, 'student_view_cache_version', None)
+        version = cache_version() if cache_version is not None else None
+        if version is None:
+            return None
+
+        return u'lms.render.{}.{}.{}.{}'.format(
+            self.render_cache_key_prefix, block.scope_ids.usage_id, version, get_language()
+        )
@@ -4,7 +4,7 @@ Tests of the LMS XBlock Runtime and associated utilities
 
 from django.contrib.auth.models import User
 from ddt import ddt, data
-from mock import Mock
+from mock import Mock, patch
 from unittest import TestCase
 from urlparse import urlparse
 from lms.lib.xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem
@@ -136,3 +136,56 @@ class TestUserServiceAPI(TestCase):
         # Try to get tag in wrong scope
         with self.assertRaises(ValueError):
             self.runtime.service(self.mock_block, 'user_tags').get_tag('fake_scope', self.key)
+
+
+class DictCache(object):
+    """A minimal cache, keeping values in a dict"""
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        self.values[key] = value
+
+
+class TestRenderCache(TestCase):
+    """Test the caching of renderings by the LMS runtime"""
+
+    def setUp(self):
+        self.runtime = LmsModuleSystem(
+            static_url='/static',
+            track_function=Mock(),
+            get_module=Mock(),
+            render_template=Mock(),
+            replace_urls=str,
+            course_id="org/course/run",
+            descriptor_runtime=Mock(),
+            cache=DictCache(),
+            render_cache_key_prefix='prefix',
+        )
+        self.block = Mock()
+        self.block.student_view_cache_version.return_value = 'version'
+
+    def _render_twice(self, block, view_name='student_view', context=None):
+        """Render block twice, returning the mock used to render it"""
+        with patch('xblock.runtime.Runtime.render', return_value='rendered') as mock_render:
+            for _ in range(2):
+                self.assertEqual('rendered', self.runtime.render(block, view_name, context))
+        return mock_render
+
+    def test_cached(self):
+        self.assertEqual(1, self._render_twice(self.block).call_count)
+
+    def test_not_cacheable(self):
+        self.block.student_view_cache_version.return_value = None
+        self.assertEqual(2, self._render_twice(self.block).call_count)
+
+    def test_other_views_and_contexts(self):
+        self.assertEqual(2, self._render_twice(self.block, view_name='studio_view').call_count)
+        self.assertEqual(2, self._render_twice(self.block, context={'foo': 'bar'}).call_count)
+
+    def test_not_cached_for_staff(self):
+        self.runtime.set('user_is_staff', True)
+        self.assertEqual(2, self._render_twice(self.block).call_count)
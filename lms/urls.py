@@ -203,6 +203,9 @@ if settings.COURSEWARE_ENABLED:
         url(r'^courses/(?P<course_id>[^/]+/[^/]+/[^/]+)/xqueue/(?P<userid>[^/]*)/(?P<mod_id>.*?)/(?P<dispatch>[^/]*)$',
             'courseware.module_render.xqueue_callback',
             name='xqueue_callback'),
+        url(r'^courses/(?P<course_id>[^/]+/[^/]+/[^/]+)/xqueue_bulk$',
+            'courseware.module_render.xqueue_bulk_callback',
+            name='xqueue_bulk_callback'),
         url(r'^change_setting$', 'student.views.change_setting',
             name='change_setting'),
 
@@ -6,16 +6,27 @@ import lms.startup as startup
 startup.run()
 
 from django.conf import settings
-from xmodule.modulestore.django import modulestore
+from django_startup import startup_step, log_startup_report
 
-# Trigger a forced initialization of our modulestores since this can take a
-# while to complete and we want this done before HTTP requests are accepted.
-for store_name in settings.MODULESTORE:
-    modulestore(store_name)
+if settings.FEATURES.get('PREFORK_STARTUP'):
+    # Do the heavy initialization here, once in the master process of a server which loads the
+    # application before forking its workers (see util.prefork)
+    from util.prefork import preload
+    preload()
+else:
+    from xmodule.modulestore.django import modulestore
+
+    # Trigger a forced initialization of our modulestores since this can take a
+    # while to complete and we want this done before HTTP requests are accepted.
+    for store_name in settings.MODULESTORE:
+        with startup_step(u'modulestore {}'.format(store_name)):
+            modulestore(store_name)
 
 
 # This application object is used by the development server
 # as well as any WSGI server configured to use this file.
 from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
+with startup_step('wsgi application'):
+    application = get_wsgi_application()
 
+log_startup_report()